@@ -1,5 +1,7 @@
 extends CharacterBody3D
 
+const GestureDecoder = preload("res://Scripts/gesture_decoder.gd")
+
 # Drone movement parameters
 @export var fly_speed: float = 5.0
 @export var down_speed: float = 3.0
@@ -16,25 +18,63 @@ extends CharacterBody3D
 @export var gravity: float = 9.8
 @export var hover_force: float = 10.0
 
+# Analog hand control (python main.py --stream)
+# Left hand wrist = forward/back + strafe, right hand wrist = up/down,
+# right hand tilt = rotation, pinch = hold position
+@export var hand_control: bool = true
+@export var hand_stream_port: int = 9999
+@export var hand_deadzone: float = 0.05  # Wrist offset from image center with no effect
+@export var hand_range: float = 0.25  # Wrist offset for full speed
+@export var hand_tilt_deadzone: float = 0.03
+@export var hand_tilt_range: float = 0.15  # Tilt for full rotation speed
+@export var pinch_hold: float = 0.35  # Pinch distance (palm lengths) below which a hand is ignored
+@export var hand_timeout: float = 0.25  # Release hand input after this long without packets
+@export var hand_camera_id: int = -1  # Only follow hands from this camera (-1 = any)
+
 # State
 var is_flying: bool = false
 var current_height: float = 0.0
 var target_velocity: Vector3 = Vector3.ZERO
 
+# Hand stream state
+var hand_udp: PacketPeerUDP
+var hand_decoder := GestureDecoder.new()
+var hand_listening: bool = false
+var hand_input: Vector3 = Vector3.ZERO  # x: forward, y: vertical, z: right; each -1..1
+var hand_yaw: float = 0.0  # -1..1, positive = rotate left
+var last_hand_packet_time: float = 0.0
+
 func _ready():
 	# Initialize position
 	current_height = global_position.y
+	
+	if hand_control:
+		hand_decoder.camera_id = hand_camera_id
+		hand_udp = PacketPeerUDP.new()
+		var err = hand_udp.bind(hand_stream_port)
+		if err != OK:
+			push_warning("⚠️ Hand stream disabled, cannot bind UDP port %d: %s" % [hand_stream_port, error_string(err)])
+		else:
+			hand_listening = true
+			print("✅ Listening for hand stream on UDP port: ", hand_stream_port)
 
 func _physics_process(delta: float):
 	# Check current height
 	current_height = global_position.y
 	
+	receive_hand_stream()
+	
 	# Handle vertical movement
 	if Input.is_action_pressed("Up"):
 		velocity.y = fly_speed
 		is_flying = true
 	elif Input.is_action_pressed("Down"):
 		velocity.y = -down_speed
+	elif hand_input.y > 0:
+		velocity.y = fly_speed * hand_input.y
+		is_flying = true
+	elif hand_input.y < 0:
+		velocity.y = down_speed * hand_input.y
 	else:
 		# Apply slight gravity when not pressing up
 		if is_flying:
@@ -53,6 +93,7 @@ func _physics_process(delta: float):
 		rotation.y += rotation_speed * delta
 	if Input.is_action_pressed("Rotate_Right"):
 		rotation.y -= rotation_speed * delta
+	rotation.y += rotation_speed * hand_yaw * delta
 	
 	# Handle horizontal movement only if flying
 	var input_dir := Vector3.ZERO
@@ -71,6 +112,9 @@ func _physics_process(delta: float):
 		# Normalize input direction
 		if input_dir.length() > 0:
 			input_dir = input_dir.normalized()
+		elif hand_input.x != 0 or hand_input.z != 0:
+			# Analog hand input: magnitude is the fraction of full speed
+			input_dir = Vector3(hand_input.x, 0, hand_input.z).limit_length(1.0)
 	
 	# Transform input direction to drone's local space (relative to rotation)
 	var direction := transform.basis * input_dir
@@ -105,6 +149,47 @@ func _physics_process(delta: float):
 		global_position.y = 0
 		velocity.y = 0
 
+func receive_hand_stream():
+	"""Apply the newest hand pose packet; release the input when the stream stops"""
+	if not hand_listening:
+		return
+	
+	var now := Time.get_ticks_msec() / 1000.0
+	var latest: Dictionary = {}
+	while hand_udp.get_available_packet_count() > 0:
+		var data = hand_decoder.decode(hand_udp.get_packet())
+		if not data.is_empty() and data["type"] == "landmarks":
+			latest = data
+	
+	if not latest.is_empty():
+		last_hand_packet_time = now
+		hand_input = Vector3.ZERO
+		hand_yaw = 0.0
+		for hand in latest["hands"]:
+			if hand["pinch"] < pinch_hold:
+				continue  # pinch = hold position
+			var wrist: Vector3 = hand["wrist"]
+			if hand["hand"] == "Left":
+				hand_input.x = -hand_axis(wrist.y - 0.5, hand_deadzone, hand_range)
+				hand_input.z = hand_axis(wrist.x - 0.5, hand_deadzone, hand_range)
+			elif hand["hand"] == "Right":
+				hand_input.y = -hand_axis(wrist.y - 0.5, hand_deadzone, hand_range)
+				hand_yaw = -hand_axis(hand["tilt"], hand_tilt_deadzone, hand_tilt_range)
+	elif now - last_hand_packet_time > hand_timeout:
+		hand_input = Vector3.ZERO
+		hand_yaw = 0.0
+
+func hand_axis(value: float, deadzone: float, full_range: float) -> float:
+	"""Map an offset to -1..1 with a deadzone around zero"""
+	var magnitude: float = abs(value) - deadzone
+	if magnitude <= 0:
+		return 0.0
+	return sign(value) * clamp(magnitude / (full_range - deadzone), 0.0, 1.0)
+
+func _notification(what):
+	if what == NOTIFICATION_PREDELETE and hand_udp:
+		hand_udp.close()
+
 func _process(_delta: float):
 	# Optional: Add visual feedback for flight status
 	if is_flying:
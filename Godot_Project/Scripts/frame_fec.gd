@@ -0,0 +1,75 @@
+extends RefCounted
+
+# Helpers for the fragmented video protocol (mediapipe_app/src/udp_sender.py)
+# Fragment: [sequence_number:4][total_packets:4][packet_index:4][JPEG data...] (big-endian)
+# FEC mode: bit 31 of total_packets is set and one extra fragment with
+# packet_index == total_packets carries the XOR parity:
+# [frame_size:4][xor of all data fragments, zero-padded to the first fragment's length]
+# A frame missing any single data fragment is rebuilt from the parity.
+
+const FEC_FLAG := 0x80000000
+const COUNT_MASK := 0x7FFFFFFF
+
+static func has_parity(total_field: int) -> bool:
+	return (total_field & FEC_FLAG) != 0
+
+static func data_count(total_field: int) -> int:
+	"""Number of data fragments (without the parity fragment)"""
+	return total_field & COUNT_MASK
+
+static func is_valid_index(packet_index: int, total_field: int) -> bool:
+	var total_packets = data_count(total_field)
+	if packet_index == total_packets:
+		return has_parity(total_field)
+	return packet_index >= 0 and packet_index < total_packets
+
+static func is_stale(sequence_number: int, last_completed: int) -> bool:
+	"""Frame already completed or older (16-bit sequence numbers wrap around)"""
+	if last_completed <= 0:
+		return false
+	return ((last_completed - sequence_number) & 0xFFFF) < 0x8000
+
+static func recover_missing(data_parts: Dictionary, total_packets: int) -> bool:
+	"""
+	Rebuild the one missing data fragment in data_parts (index -> bytes) from
+	the parity fragment stored at index total_packets.
+	"""
+	if not data_parts.has(total_packets):
+		return false
+	var parity: PackedByteArray = data_parts[total_packets]
+	if parity.size() <= 4:
+		return false
+	var frame_size = (parity[0] << 24) | (parity[1] << 16) | (parity[2] << 8) | parity[3]
+	var chunk_size = parity.size() - 4
+	var padded_size = (chunk_size + 7) / 8 * 8  # XOR 8 bytes at a time
+
+	var missing = -1
+	var xor_words := _padded(parity.slice(4), padded_size).to_int64_array()
+	for i in range(total_packets):
+		if not data_parts.has(i):
+			if missing != -1:
+				return false  # more than one fragment lost
+			missing = i
+			continue
+		var words := _padded(data_parts[i], padded_size).to_int64_array()
+		for w in range(words.size()):
+			xor_words[w] ^= words[w]
+	if missing == -1:
+		return true
+
+	var missing_size = chunk_size
+	if missing == total_packets - 1:
+		missing_size = frame_size - chunk_size * (total_packets - 1)
+	if missing_size <= 0 or missing_size > chunk_size:
+		return false
+	data_parts[missing] = xor_words.to_byte_array().slice(0, missing_size)
+	return true
+
+static func _padded(bytes: PackedByteArray, size: int) -> PackedByteArray:
+	var out := bytes.duplicate()
+	if out.size() < size:
+		var padding := PackedByteArray()
+		padding.resize(size - out.size())
+		padding.fill(0)
+		out.append_array(padding)
+	return out
@@ -0,0 +1,193 @@
+extends RefCounted
+
+# Decoder for messages from Python (mediapipe_app/src/gesture_protocol.py)
+# Gesture, binary (13 bytes, big-endian):
+# [magic:2 "HG"][version:1][hand:1][seq:2][timestamp_us:4][gesture:1][confidence:1][camera:1]
+# Landmark stream (big-endian):
+# [magic:2 "HL"][version:1][hand_count:1][seq:2][capture_timestamp_us:4][camera:1]
+# + per hand [hand:1][confidence:1][8 x float32: wrist xyz, palm normal xyz, pinch, tilt]
+# Face metadata, one per video frame (big-endian, seq = frame sequence of the video):
+# [magic:2 "HF"][version:1][face_count:1][seq:2][capture_timestamp_us:4][camera:1]
+# + per face [score:1][xmin, ymin, width, height: float32, relative to the frame]
+# Anything else is parsed as the JSON message {"type": "gesture", "gesture": ..., "seq": ...}
+
+const MAGIC_0 := 0x48  # 'H'
+const GESTURE_MAGIC_1 := 0x47  # 'G'
+const STREAM_MAGIC_1 := 0x4C  # 'L'
+const FACE_MAGIC_1 := 0x46  # 'F'
+const FACE_VERSION := 1
+const FACE_HEADER_SIZE := 11
+const FACE_SIZE := 17
+const VERSION := 2
+const PACKET_SIZE := 13
+const STREAM_HEADER_SIZE := 11
+const STREAM_HAND_SIZE := 34
+
+# Index is the wire code - keep in sync with GESTURES in gesture_protocol.py
+const GESTURES := [
+	"NONE", "NO_HAND", "CENTER",
+	"FORWARD", "BACKWARD", "LEFT", "RIGHT",
+	"UP", "DOWN", "ROTATE_LEFT", "ROTATE_RIGHT",
+]
+const HANDS := ["Left", "Right"]
+
+# Only messages from this camera are returned (-1 = every camera)
+var camera_id: int = -1
+
+# Sequence tracking (gestures and landmark stream of each camera are numbered separately)
+var last_sequence := {}  # "type:camera" -> last accepted seq
+var packets_received: int = 0
+var packets_dropped: int = 0
+var packets_reordered: int = 0
+var packets_invalid: int = 0
+var _consecutive_stale := {}
+const RESYNC_AFTER := 8  # stale packets in a row = sender restarted
+
+func decode(packet: PackedByteArray) -> Dictionary:
+	"""
+	Decode one packet. Returns {} for invalid, duplicate or late (reordered) packets,
+	otherwise a Dictionary whose "type" is "gesture", "landmarks" or "faces"
+	"""
+	var data: Dictionary
+	if packet.size() >= 2 and packet[0] == MAGIC_0 and packet[1] == GESTURE_MAGIC_1:
+		data = _decode_binary(packet)
+	elif packet.size() >= 2 and packet[0] == MAGIC_0 and packet[1] == STREAM_MAGIC_1:
+		data = _decode_stream(packet)
+	elif packet.size() >= 2 and packet[0] == MAGIC_0 and packet[1] == FACE_MAGIC_1:
+		data = _decode_faces(packet)
+	else:
+		data = _decode_json(packet)
+
+	if data.is_empty():
+		packets_invalid += 1
+		return {}
+
+	var camera: int = int(data.get("camera", 0))
+	if camera_id >= 0 and camera != camera_id:
+		return {}
+
+	# JSON from older senders has no sequence number
+	if data.has("seq") and not _accept_sequence("%s:%d" % [data["type"], camera], int(data["seq"])):
+		return {}
+
+	packets_received += 1
+	return data
+
+func _decode_binary(packet: PackedByteArray) -> Dictionary:
+	if packet.size() < PACKET_SIZE or packet[2] != VERSION or packet[10] >= GESTURES.size():
+		return {}
+	return {
+		"type": "gesture",
+		"gesture": GESTURES[packet[10]],
+		"hand": _hand_label(packet[3]),
+		"seq": _u16(packet, 4),
+		"timestamp_us": _u32(packet, 6),
+		"confidence": packet[11] / 255.0,
+		"camera": packet[12],
+	}
+
+func _decode_stream(packet: PackedByteArray) -> Dictionary:
+	if packet.size() < STREAM_HEADER_SIZE or packet[2] != VERSION:
+		return {}
+	var count: int = packet[3]
+	if packet.size() < STREAM_HEADER_SIZE + count * STREAM_HAND_SIZE:
+		return {}
+
+	var hands := []
+	var offset := STREAM_HEADER_SIZE
+	for i in count:
+		hands.append({
+			"hand": _hand_label(packet[offset]),
+			"confidence": packet[offset + 1] / 255.0,
+			"wrist": Vector3(_f32(packet, offset + 2), _f32(packet, offset + 6), _f32(packet, offset + 10)),
+			"normal": Vector3(_f32(packet, offset + 14), _f32(packet, offset + 18), _f32(packet, offset + 22)),
+			"pinch": _f32(packet, offset + 26),
+			"tilt": _f32(packet, offset + 30),
+		})
+		offset += STREAM_HAND_SIZE
+
+	return {
+		"type": "landmarks",
+		"seq": _u16(packet, 4),
+		"timestamp_us": _u32(packet, 6),
+		"camera": packet[10],
+		"hands": hands,
+	}
+
+func _decode_faces(packet: PackedByteArray) -> Dictionary:
+	if packet.size() < FACE_HEADER_SIZE or packet[2] != FACE_VERSION:
+		return {}
+	var count: int = packet[3]
+	if packet.size() < FACE_HEADER_SIZE + count * FACE_SIZE:
+		return {}
+
+	var faces := []
+	var offset := FACE_HEADER_SIZE
+	for i in count:
+		faces.append({
+			"score": packet[offset] / 255.0,
+			"box": Rect2(_f32(packet, offset + 1), _f32(packet, offset + 5),
+					_f32(packet, offset + 9), _f32(packet, offset + 13)),
+		})
+		offset += FACE_SIZE
+
+	return {
+		"type": "faces",
+		"seq": _u16(packet, 4),
+		"timestamp_us": _u32(packet, 6),
+		"camera": packet[10],
+		"faces": faces,
+	}
+
+func is_message(packet: PackedByteArray) -> bool:
+	"""True for binary messages ("HG", "HL", "HF"); video fragments never start with 'H'"""
+	return packet.size() >= 2 and packet[0] == MAGIC_0 \
+			and packet[1] in [GESTURE_MAGIC_1, STREAM_MAGIC_1, FACE_MAGIC_1]
+
+func _decode_json(packet: PackedByteArray) -> Dictionary:
+	var json = JSON.new()
+	if json.parse(packet.get_string_from_utf8()) != OK:
+		return {}
+	var data = json.data
+	if typeof(data) == TYPE_DICTIONARY and data.get("type") == "gesture" and data.has("gesture"):
+		return data
+	return {}
+
+func _hand_label(hand_id: int) -> String:
+	return HANDS[hand_id] if hand_id < HANDS.size() else ""
+
+func _u16(packet: PackedByteArray, offset: int) -> int:
+	return (packet[offset] << 8) | packet[offset + 1]
+
+func _u32(packet: PackedByteArray, offset: int) -> int:
+	return (packet[offset] << 24) | (packet[offset + 1] << 16) | (packet[offset + 2] << 8) | packet[offset + 3]
+
+func _f32(packet: PackedByteArray, offset: int) -> float:
+	# decode_float is little-endian; the wire format is big-endian
+	var bytes := packet.slice(offset, offset + 4)
+	bytes.reverse()
+	return bytes.decode_float(0)
+
+func _accept_sequence(kind: String, seq: int) -> bool:
+	"""16-bit wrapping sequence check; counts gaps as drops and rejects older packets"""
+	if not last_sequence.has(kind):
+		last_sequence[kind] = seq
+		_consecutive_stale[kind] = 0
+		return true
+	var diff: int = (seq - last_sequence[kind]) & 0xFFFF
+	if diff == 0:
+		return false  # duplicate
+	if diff >= 0x8000:
+		_consecutive_stale[kind] += 1
+		if _consecutive_stale[kind] < RESYNC_AFTER:
+			packets_reordered += 1
+			return false  # arrived after a newer message
+		diff = 1  # sender restarted its sequence, follow it
+	_consecutive_stale[kind] = 0
+	packets_dropped += diff - 1
+	last_sequence[kind] = seq
+	return true
+
+func reset():
+	last_sequence.clear()
+	_consecutive_stale.clear()
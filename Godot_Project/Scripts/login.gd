@@ -1,8 +1,13 @@
 extends Control
 
+const FrameFec = preload("res://Scripts/frame_fec.gd")
+const GestureDecoder = preload("res://Scripts/gesture_decoder.gd")
+
 # UDP Settings
 var udp_socket := PacketPeerUDP.new()
 var udp_port := 5000
+@export var camera_id := 0  # Camera shown here (upper 16 bits of the sequence number)
+@export var decode_video := true  # false = login from the face metadata only, video is not decoded
 var is_connected := false
 var last_received_time := 0.0
 var timeout_duration := 3.0
@@ -35,11 +40,13 @@ var is_processing_login := false
 var current_image := Image.new()
 var current_texture := ImageTexture.new()
 var receiving_video := false
+var metadata_decoder := GestureDecoder.new()  # face metadata ("HF") sent with every frame
 
 # Frame reassembly (for fragmented UDP packets)
 var frame_buffers: Dictionary = {}  # seq_num -> {total_packets, received_packets, data_parts}
 var last_completed_sequence: int = 0
 var frame_timeout: float = 1.0  # 1 second timeout for incomplete frames
+var frames_recovered: int = 0  # rebuilt from the FEC parity fragment
 
 func _ready():
 	# Setup initial UI state
@@ -99,6 +106,8 @@ func _start_udp_connection():
 	
 	is_connected = true
 	camera_connected = true
+	metadata_decoder.camera_id = camera_id
+	metadata_decoder.reset()
 	_update_status("📸 Silahkan tunjukkan wajah Anda ke kamera", Color.ORANGE)
 	connection_label.text = "📡 UDP Port: %d | Status: Listening" % udp_port
 	print("UDP Server started on port: ", udp_port)
@@ -157,19 +166,35 @@ func _process_packet(packet: PackedByteArray):
 	
 	Packet Format (video):
 	[sequence_number:4][total_packets:4][packet_index:4][JPEG_data...]
+	sequence_number = (camera_id << 16) | frame_seq
+	total_packets bit 31 = FEC: fragment index total_packets is XOR parity (frame_fec.gd)
+	Face metadata ("HF", see gesture_decoder.gd) carries the detection result of each frame.
 	"""
+	# Detection result: drives the login without looking at the video
+	if metadata_decoder.is_message(packet):
+		var data = metadata_decoder.decode(packet)
+		if not data.is_empty() and data["type"] == "faces":
+			_on_face_metadata(data)
+		return
+	
 	# Check if this is a fragmented video packet (at least 12 bytes for header)
 	if packet.size() >= 12:
 		# Try to parse as fragmented packet
 		var sequence_number = _bytes_to_int(packet.slice(0, 4))
-		var total_packets = _bytes_to_int(packet.slice(4, 8))
+		var packet_camera = (sequence_number >> 16) & 0xFF
+		sequence_number &= 0xFFFF
+		var total_field = _bytes_to_int(packet.slice(4, 8))
+		var total_packets = FrameFec.data_count(total_field)
 		var packet_index = _bytes_to_int(packet.slice(8, 12))
 		
 		# Validate header
-		if sequence_number > 0 and total_packets > 0 and packet_index >= 0 and packet_index < total_packets:
-			# Valid fragmented packet
+		if sequence_number > 0 and total_packets > 0 and FrameFec.is_valid_index(packet_index, total_field):
+			# Valid fragmented packet; frames from other cameras are ignored
+			if packet_camera != camera_id or not decode_video:
+				return
 			var packet_data = packet.slice(12)
-			_handle_fragmented_packet(sequence_number, total_packets, packet_index, packet_data)
+			_handle_fragmented_packet(sequence_number, total_packets, packet_index, packet_data,
+					FrameFec.has_parity(total_field))
 			return
 	
 	# If not a valid fragmented packet, try as text message or single-packet image
@@ -181,16 +206,17 @@ func _process_packet(packet: PackedByteArray):
 		# Try as single-packet JPEG (fallback)
 		_try_display_image(packet)
 
-func _handle_fragmented_packet(sequence_number: int, total_packets: int, packet_index: int, packet_data: PackedByteArray):
+func _handle_fragmented_packet(sequence_number: int, total_packets: int, packet_index: int, packet_data: PackedByteArray, fec: bool = false):
 	"""Handle reassembly of fragmented video frames"""
-	# Skip old frames
-	if sequence_number < last_completed_sequence - 2:
+	# Skip old or already completed frames (e.g. parity arriving after the frame)
+	if FrameFec.is_stale(sequence_number, last_completed_sequence):
 		return
 	
 	# Initialize buffer for new frame
 	if sequence_number not in frame_buffers:
 		frame_buffers[sequence_number] = {
 			"total_packets": total_packets,
+			"fec": fec,
 			"received_packets": 0,
 			"data_parts": {},
 			"timestamp": Time.get_ticks_msec() / 1000.0
@@ -201,11 +227,18 @@ func _handle_fragmented_packet(sequence_number: int, total_packets: int, packet_
 	# Add packet to frame buffer (if not already received)
 	if packet_index not in frame_buffer.data_parts:
 		frame_buffer.data_parts[packet_index] = packet_data
-		frame_buffer.received_packets += 1
+		if packet_index < frame_buffer.total_packets:
+			frame_buffer.received_packets += 1
 	
 	# Check if frame is complete
 	if frame_buffer.received_packets >= frame_buffer.total_packets:
 		_assemble_and_display_frame(sequence_number)
+	elif frame_buffer.fec and frame_buffer.received_packets == frame_buffer.total_packets - 1 \
+			and FrameFec.recover_missing(frame_buffer.data_parts, frame_buffer.total_packets):
+		# One fragment lost, rebuilt from the parity fragment
+		frame_buffer.received_packets += 1
+		frames_recovered += 1
+		_assemble_and_display_frame(sequence_number)
 
 func _assemble_and_display_frame(sequence_number: int):
 	"""Assemble fragmented packets into complete frame and display"""
@@ -253,10 +286,6 @@ func _try_display_image(image_data: PackedByteArray):
 		
 		# Update connection status
 		connection_label.text = "📡 UDP Port: %d | Video: Active | FPS: %.1f" % [udp_port, Engine.get_frames_per_second()]
-		
-		# ✅ FACE DETECTION IN GODOT (not in Python!)
-		if camera_connected and not login_successful:
-			_detect_face_in_frame(image)
 	else:
 		# Try PNG if JPEG failed
 		error = image.load_png_from_buffer(image_data)
@@ -265,10 +294,6 @@ func _try_display_image(image_data: PackedByteArray):
 			placeholder_label.visible = false
 			current_texture = ImageTexture.create_from_image(image)
 			video_rect.texture = current_texture
-			
-			# ✅ FACE DETECTION IN GODOT
-			if camera_connected and not login_successful:
-				_detect_face_in_frame(image)
 
 func _handle_received_data(data: String):
 	print("Received text data: ", data)
@@ -369,60 +394,22 @@ func _exit_tree():
 	if udp_socket:
 		udp_socket.close()
 
-func _detect_face_in_frame(image: Image):
-	"""Detect face by analyzing the text and colors from MediaPipe output"""
-	if is_processing_login:
+func _on_face_metadata(data: Dictionary):
+	"""Count frames with a face from the detection metadata Python sends with every frame"""
+	if not camera_connected or login_successful or is_processing_login:
 		return
+	if not decode_video:
+		receiving_video = true
 	
-	# Get image data
-	var width = image.get_width()
-	var height = image.get_height()
-	
-	# Strategy 1: Look for bright GREEN text "FACE_DETECTED" in top-left corner
-	# Strategy 2: Look for bright RED text "NO_FACE_DETECTED"
-	# Strategy 3: Look for green MediaPipe bounding box lines
-	
-	var green_score = 0
-	var red_score = 0
-	
-	# Check top-left corner (where text is drawn)
-	# Sample area: 0-500 width, 0-60 height
-	var text_width = min(500, width)
-	var text_height = min(60, height)
-	
-	for y in range(10, text_height):
-		for x in range(0, text_width):
-			if x < width and y < height:
-				var pixel = image.get_pixel(x, y)
-				
-				# Bright green (FACE_DETECTED text) - RGB(0, 255, 0)
-				if pixel.g > 0.7 and pixel.r < 0.3 and pixel.b < 0.3:
-					green_score += 1
-				
-				# Bright red (NO_FACE_DETECTED text) - RGB(255, 0, 0)
-				if pixel.r > 0.7 and pixel.g < 0.3 and pixel.b < 0.3:
-					red_score += 1
-	
-	# Also check for green bounding box lines (MediaPipe detection)
-	var bbox_green = 0
-	var sample_step = 15
-	for y in range(text_height, height, sample_step):
-		for x in range(0, width, sample_step):
-			if x < width and y < height:
-				var pixel = image.get_pixel(x, y)
-				# Green lines from MediaPipe
-				if pixel.g > 0.6 and pixel.g > pixel.r * 1.3 and pixel.g > pixel.b * 1.3:
-					bbox_green += 1
-	
-	# Decision logic:
-	# - If we see significant green text OR green bbox, face is detected
-	# - If we see red text, no face
-	# - Green text needs to be substantial (at least 50 pixels)
-	var has_face = (green_score >= 50 or bbox_green >= 10) and red_score < green_score
+	var faces: Array = data["faces"]
+	var has_face = faces.size() > 0
 	
 	# Debug info (optional, remove in production)
 	if face_detected_frames % 30 == 0:  # Print every 30 frames
-		print("Detection scores - Green: %d, Red: %d, BBox: %d, Has Face: %s" % [green_score, red_score, bbox_green, has_face])
+		var best_score = 0.0
+		for face in faces:
+			best_score = max(best_score, face["score"])
+		print("Face metadata - frame %d: %d face(s), best score %.2f" % [data["seq"], faces.size(), best_score])
 	
 	# Update face detection counter
 	if has_face:
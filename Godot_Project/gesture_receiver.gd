@@ -1,9 +1,12 @@
 extends Node
 
+const GestureDecoder = preload("res://Scripts/gesture_decoder.gd")
+
 # UDP Configuration
 var udp := PacketPeerUDP.new()
 var listen_port := 9999  # Port untuk menerima gesture dari Python
 var is_listening := false
+var decoder := GestureDecoder.new()  # JSON or binary gesture messages
 
 # Gesture state
 var current_gesture := "NO_HAND"
@@ -19,9 +22,11 @@ var last_gesture_time := 0.0
 
 # Debug
 @export var show_debug := true
+@export var camera_id := -1  # Only react to gestures from this camera (-1 = any)
 
 func _ready():
 	print("🎮 Gesture Receiver Initialized")
+	decoder.camera_id = camera_id
 	
 	# Start listening for UDP gestures
 	var err = udp.bind(listen_port)
@@ -48,19 +53,14 @@ func _process(delta):
 	# Check for incoming packets
 	while udp.get_available_packet_count() > 0:
 		var packet = udp.get_packet()
-		var message = packet.get_string_from_utf8()
-		
-		# Parse JSON
-		var json = JSON.new()
-		var error = json.parse(message)
 		
-		if error == OK:
-			var data = json.data
-			if typeof(data) == TYPE_DICTIONARY and data.has("type") and data["type"] == "gesture":
+		# Decode binary or JSON message (late/duplicate packets are dropped)
+		var data = decoder.decode(packet)
+		if not data.is_empty():
+			if data["type"] == "gesture":
 				handle_gesture(data["gesture"])
-		else:
-			if show_debug:
-				print("⚠️ Failed to parse JSON: ", message)
+		elif show_debug:
+			print("⚠️ Ignored gesture packet (%d bytes, invalid or out of order)" % packet.size())
 
 func handle_gesture(gesture: String):
 	"""Handle incoming gesture and move the controlled object"""
@@ -117,3 +117,11 @@ func set_move_speed(speed: float):
 
 func get_time_since_last_gesture() -> float:
 	return (Time.get_ticks_msec() / 1000.0) - last_gesture_time
+
+func get_packet_stats() -> Dictionary:
+	return {
+		"received": decoder.packets_received,
+		"dropped": decoder.packets_dropped,
+		"reordered": decoder.packets_reordered,
+		"invalid": decoder.packets_invalid,
+	}
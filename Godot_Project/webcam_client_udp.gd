@@ -1,5 +1,8 @@
 extends Control
 
+const GestureDecoder = preload("res://Scripts/gesture_decoder.gd")
+const FrameFec = preload("res://Scripts/frame_fec.gd")
+
 @onready var texture_rect: TextureRect = $VideoContainer/TextureRect
 @onready var status_label: Label = $StatusLabel
 @onready var connect_button: Button = $ControlPanel/ConnectButton
@@ -13,12 +16,16 @@ var udp_client: PacketPeerUDP
 var is_connected: bool = false
 var server_host: String = "127.0.0.1"
 var server_port: int = 8888
+@export var camera_id: int = 0  # Kamera yang ditampilkan (16 bit atas sequence number)
+var heartbeat_interval: float = 1.0  # Server menghapus client yang diam > 5 detik
+var heartbeat_elapsed: float = 0.0
 
 # Gesture UDP receiver
 var gesture_udp: PacketPeerUDP
 var gesture_port: int = 9999
 var gesture_listening: bool = false
 var current_gesture: String = "NO_HAND"
+var gesture_decoder := GestureDecoder.new()  # JSON or binary gesture messages
 
 # 3D Object control
 @export var controlled_object: Node3D
@@ -43,13 +50,15 @@ var current_data_rate: float = 0.0
 var packets_received: int = 0
 var frames_completed: int = 0
 var frames_dropped: int = 0
+var frames_recovered: int = 0  # rebuilt from the FEC parity fragment
 
 func _ready():
 	# Inisialisasi UDP client untuk webcam
 	udp_client = PacketPeerUDP.new()
 	
-	# Inisialisasi UDP untuk gesture
+	# Inisialisasi UDP untuk gesture (hanya dari kamera yang ditampilkan)
 	gesture_udp = PacketPeerUDP.new()
+	gesture_decoder.camera_id = camera_id
 	var err = gesture_udp.bind(gesture_port)
 	if err != OK:
 		push_error("❌ Failed to bind gesture UDP port %d: %s" % [gesture_port, error_string(err)])
@@ -101,6 +110,7 @@ func _on_quit_button_pressed():
 func _process(delta):
 	if is_connected:
 		receive_packets()
+		send_heartbeat(delta)
 		cleanup_old_frames()
 		update_performance_metrics(delta)
 	
@@ -171,6 +181,10 @@ func connect_to_server():
 			elif message == "SERVER_SHUTDOWN":
 				update_status("Server is shutting down")
 				return
+			elif message == "SERVER_FULL":
+				update_status("Server full - too many clients")
+				udp_client.close()
+				return
 	
 	if confirmed:
 		is_connected = true
@@ -179,9 +193,12 @@ func connect_to_server():
 		print("🎥 Ready to receive video streams!")
 		
 		# Reset statistics
+		heartbeat_elapsed = 0.0
 		packets_received = 0
 		frames_completed = 0
 		frames_dropped = 0
+		frames_recovered = 0
+		last_completed_sequence = 0
 		frame_buffers.clear()
 	else:
 		update_status("Registration timeout - Server tidak merespon")
@@ -214,11 +231,26 @@ func disconnect_from_server():
 	current_data_rate = 0.0
 	update_info_display()
 
+func send_heartbeat(delta: float):
+	# Keep the registration alive; the server expires silent clients
+	heartbeat_elapsed += delta
+	if heartbeat_elapsed >= heartbeat_interval:
+		heartbeat_elapsed = 0.0
+		udp_client.put_packet("HEARTBEAT".to_utf8_buffer())
+
 func receive_packets():
 	var packet_count = udp_client.get_available_packet_count()
 	
 	for i in range(packet_count):
 		var packet = udp_client.get_packet()
+		if packet.size() == 15 and packet.get_string_from_utf8() == "SERVER_SHUTDOWN":
+			print("🔌 Server shut down")
+			is_connected = false  # no UNREGISTER to a server that is gone
+			disconnect_from_server()
+			update_status("Server shut down")
+			return
+		if gesture_decoder.is_message(packet):
+			continue  # frame metadata (e.g. faces from login.py --serve), not video
 		if packet.size() >= 12:  # Minimal header size
 			packets_received += 1
 			bytes_received += packet.size()
@@ -226,27 +258,37 @@ func receive_packets():
 
 func process_packet(packet: PackedByteArray):
 	# Parse header: [sequence_number:4][total_packets:4][packet_index:4][data...]
+	# sequence_number = (camera_id << 16) | frame_seq
+	# total_packets bit 31 = FEC: fragment index total_packets is XOR parity (frame_fec.gd)
 	if packet.size() < 12:
 		return
 	
 	var sequence_number = bytes_to_int(packet.slice(0, 4))
-	var total_packets = bytes_to_int(packet.slice(4, 8))
+	var packet_camera = (sequence_number >> 16) & 0xFF
+	sequence_number &= 0xFFFF
+	var total_field = bytes_to_int(packet.slice(4, 8))
+	var total_packets = FrameFec.data_count(total_field)
 	var packet_index = bytes_to_int(packet.slice(8, 12))
 	var packet_data = packet.slice(12)
 	
 	# Validasi data
-	if total_packets <= 0 or packet_index >= total_packets or sequence_number <= 0:
+	if total_packets <= 0 or not FrameFec.is_valid_index(packet_index, total_field) or sequence_number <= 0:
 		print("⚠️  Invalid packet header: seq=", sequence_number, " total=", total_packets, " index=", packet_index)
 		return
 	
-	# Skip frame lama (lebih dari 2 frame di belakang)
-	if sequence_number < last_completed_sequence - 2:
+	# Frame dari kamera lain diabaikan
+	if packet_camera != camera_id:
+		return
+	
+	# Skip frame lama / yang sudah selesai (mis. parity yang datang setelah frame lengkap)
+	if FrameFec.is_stale(sequence_number, last_completed_sequence):
 		return
 	
 	# Inisialisasi buffer untuk frame baru
 	if sequence_number not in frame_buffers:
 		frame_buffers[sequence_number] = {
 			"total_packets": total_packets,
+			"fec": FrameFec.has_parity(total_field),
 			"received_packets": 0,
 			"data_parts": {},
 			"timestamp": Time.get_ticks_msec() / 1000.0
@@ -257,11 +299,18 @@ func process_packet(packet: PackedByteArray):
 	# Tambahkan packet ke frame buffer (jika belum ada)
 	if packet_index not in frame_buffer.data_parts:
 		frame_buffer.data_parts[packet_index] = packet_data
-		frame_buffer.received_packets += 1
+		if packet_index < frame_buffer.total_packets:
+			frame_buffer.received_packets += 1
 		
 		# Cek apakah frame sudah lengkap
 		if frame_buffer.received_packets == frame_buffer.total_packets:
 			assemble_and_display_frame(sequence_number)
+		elif frame_buffer.fec and frame_buffer.received_packets == frame_buffer.total_packets - 1 \
+				and FrameFec.recover_missing(frame_buffer.data_parts, frame_buffer.total_packets):
+			# Satu packet hilang, dibangun ulang dari parity
+			frame_buffer.received_packets += 1
+			frames_recovered += 1
+			assemble_and_display_frame(sequence_number)
 
 func assemble_and_display_frame(sequence_number: int):
 	if sequence_number not in frame_buffers:
@@ -291,7 +340,7 @@ func assemble_and_display_frame(sequence_number: int):
 	# Debug info setiap 30 frame
 	if frames_completed % 30 == 0:
 		var drop_rate = float(frames_dropped) / float(frames_completed + frames_dropped) * 100.0
-		print("📊 Frame ", sequence_number, " completed. Drop rate: %.1f%%" % drop_rate)
+		print("📊 Frame ", sequence_number, " completed. Drop rate: %.1f%%, recovered: %d" % [drop_rate, frames_recovered])
 
 func cleanup_old_frames():
 	var current_time = Time.get_ticks_msec() / 1000.0
@@ -388,19 +437,14 @@ func receive_gesture_packets():
 	"""Receive and process gesture packets from Python"""
 	while gesture_udp.get_available_packet_count() > 0:
 		var packet = gesture_udp.get_packet()
-		var message = packet.get_string_from_utf8()
-		
-		# Parse JSON
-		var json = JSON.new()
-		var error = json.parse(message)
 		
-		if error == OK:
-			var data = json.data
-			if typeof(data) == TYPE_DICTIONARY and data.has("type") and data["type"] == "gesture":
-				var gesture = data["gesture"]
-				if gesture != current_gesture:
-					current_gesture = gesture
-					print("👋 Gesture received: ", gesture)
+		# Decode binary or JSON message (late/duplicate packets are dropped)
+		var data = gesture_decoder.decode(packet)
+		if not data.is_empty() and data["type"] == "gesture":
+			var gesture = data["gesture"]
+			if gesture != current_gesture:
+				current_gesture = gesture
+				print("👋 Gesture received: ", gesture)
 
 func handle_gesture_movement(delta: float):
 	"""Move the controlled object based on current gesture"""
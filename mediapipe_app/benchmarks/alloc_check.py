@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Per-frame allocation check for the capture hot path
+
+Drives the per-frame steps of the real streaming loops under tracemalloc and
+reports how much memory each steady-state frame allocates:
+
+    login   FaceLoginSystem.stream_video's stages one after another: read into
+            the FrameFreeList, face detection (RGB view), then
+            stream_detected_frame (overlay, adaptive downscale, JPEG encode,
+            metadata and video datagrams)
+    video   GodotUDPServer.stream_frame (read into the FramePool, encode,
+            fan-out to one registered client)
+
+The datagrams go to a local socket nobody reads. NumPy and OpenCV arrays are
+allocated through NumPy, so tracemalloc sees every frame-sized buffer. Exits
+with code 1 when a frame allocates more than --limit-kb (default: a tenth of
+one frame, i.e. no frame-sized buffer per frame), so it can run next to
+benchmarks/compare.py in CI; tests/test_alloc_check.py asserts the same limit.
+
+What remains is small Python objects and, with the OpenCV encoder, the JPEG
+itself: cv2.imencode has no output buffer argument (TurboJPEG encodes into a
+reused one).
+
+Usage:
+    python benchmarks/alloc_check.py
+    python benchmarks/alloc_check.py --loop video --source synthetic:1920x1080
+    python benchmarks/alloc_check.py --source rekaman.mp4
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# Add project root and src directory to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.append(os.path.join(project_root, 'src'))
+
+from src.fanout_server import MSG_REGISTER
+from src.frame import Frame, FrameBuffers, FrameFreeList, FramePool
+from src.frame_source import open_source
+
+LOOPS = ('login', 'video')
+
+
+class LoginPath:
+    def __init__(self, source, encoder, receiver):
+        """
+        One frame through login.py's capture, inference and send stages per step()
+
+        Args:
+            source: FrameSource to read from
+            encoder: JPEG encoder backend
+            receiver: Bound UDP socket the stream is sent to
+        """
+        from login import FaceLoginSystem
+        host, port = receiver.getsockname()
+        self.source = source
+        self.system = FaceLoginSystem(udp_host=host, udp_port=port, max_bitrate=0, encoder=encoder)
+        controller = self.system.quality_controller
+        # Exercise the downscale at a fixed scale: a scale change reallocates
+        # the downscale buffer once, which is not a per-frame allocation
+        controller.scales = controller.scales[-1:]
+        controller.scale_index = 0
+        self.encoder_name = self.system.jpeg_encoder.name
+        self.pool = FrameFreeList(6)
+        self.buffers = FrameBuffers()
+        self.receiver = receiver
+        self.seq = 0
+
+    def step(self):
+        """Returns: False when the source has no more frames"""
+        ret, image = self.pool.read(self.source)
+        if not ret:
+            return False
+        self.seq += 1
+        frame = Frame(image, self.seq, time.monotonic(), self.buffers)
+        _, annotations, faces = self.system.detect_faces(frame)
+        self.system.stream_detected_frame(frame.bgr, annotations, faces, frame.timestamp)
+        self.pool.release(image)
+        return True
+
+    def close(self):
+        self.system.close_udp()
+        self.receiver.close()
+
+
+class VideoServerPath:
+    def __init__(self, source, encoder, receiver):
+        """
+        One GodotUDPServer.stream_frame per step(), with receiver registered
+
+        Args:
+            source: FrameSource to read from
+            encoder: JPEG encoder backend
+            receiver: Bound UDP socket registered as the only client
+        """
+        from godot_udp_server import GodotUDPServer
+        self.source = source
+        self.server = GodotUDPServer(port=0, encoder=encoder)
+        self.server.server.start()
+        self.server.server.handle_message(MSG_REGISTER, receiver.getsockname())
+        self.encoder_name = self.server.jpeg_encoder.name
+        self.pool = FramePool(1)
+        self.receiver = receiver
+
+    def step(self):
+        """Returns: False when the source has no more frames"""
+        return self.server.stream_frame(self.source, self.pool)
+
+    def close(self):
+        self.server.server.close()
+        self.receiver.close()
+
+
+def create_path(loop, source, encoder='auto'):
+    """
+    Per-frame step of the given loop ('login' or 'video'), streaming to a local socket
+    Returns: path with step(), frame_bytes (one BGR frame) and close()
+    """
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    path = (LoginPath if loop == 'login' else VideoServerPath)(source, encoder, receiver)
+    path.frame_bytes = int(source.get(cv2.CAP_PROP_FRAME_WIDTH)) * int(source.get(cv2.CAP_PROP_FRAME_HEIGHT)) * 3
+    return path
+
+
+def measure(path, frames, warmup):
+    """
+    Returns: (per-frame allocated bytes, per-frame retained bytes) for the steady-state frames
+    """
+    for _ in range(warmup):
+        if not path.step():
+            return None, None
+    allocated = []
+    retained = []
+    tracemalloc.start()
+    try:
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            if not path.step():
+                break
+            current, peak = tracemalloc.get_traced_memory()
+            allocated.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+    return np.array(allocated), np.array(retained)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check per-frame allocations of the capture hot path')
+    parser.add_argument('--loop', choices=LOOPS, default='login',
+                        help='Loop whose per-frame step is measured (default: login)')
+    parser.add_argument('--source', type=str, default='synthetic:640x480',
+                        help='Frame source: video file or synthetic[:WxH] (default: synthetic:640x480)')
+    parser.add_argument('--frames', type=int, default=120, help='Measured frames (default: 120)')
+    parser.add_argument('--warmup', type=int, default=10,
+                        help='Frames before measuring, while buffers are adopted (default: 10)')
+    parser.add_argument('--encoder', choices=['auto', 'turbojpeg', 'opencv'], default='auto',
+                        help='JPEG encoder backend (default: auto)')
+    parser.add_argument('--limit-kb', type=float, default=None,
+                        help='Largest allowed allocation per frame in KiB (default: a tenth of a frame)')
+    args = parser.parse_args()
+
+    source = open_source(args.source, realtime=False)
+    if not source.isOpened():
+        print(f"❌ Cannot open {args.source}")
+        return 1
+    path = create_path(args.loop, source, args.encoder)
+    start = time.perf_counter()
+    try:
+        allocated, retained = measure(path, args.frames, args.warmup)
+    finally:
+        path.close()
+        source.release()
+    elapsed = time.perf_counter() - start
+    if allocated is None or not len(allocated):
+        print("❌ Source ended before the measurement")
+        return 1
+
+    print(f"🧪 {len(allocated)} frames from {args.source} ({args.loop} loop, {path.encoder_name} encoder, "
+          f"{elapsed:.1f} s)")
+    print(f"   allocated per frame: median {np.median(allocated) / 1024:.1f} KiB | "
+          f"p95 {np.percentile(allocated, 95) / 1024:.1f} KiB | max {allocated.max() / 1024:.1f} KiB")
+    print(f"   retained over the run: {retained.sum() / 1024:.1f} KiB")
+
+    limit_kb = args.limit_kb
+    if limit_kb is None:
+        limit_kb = round(path.frame_bytes / 10 / 1024, 1)
+    worst = allocated.max() / 1024
+    if worst > limit_kb:
+        print(f"❌ A frame allocated {worst:.1f} KiB (limit {limit_kb:g} KiB)")
+        return 1
+    print(f"✅ Per-frame allocations within {limit_kb:g} KiB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+JPEG encoder benchmark
+
+Compares the available JPEG encoders (TurboJPEG, OpenCV) across
+resolutions and quality levels on recorded frames.
+
+Usage:
+    python benchmarks/bench_jpeg_encoders.py --video recording.mp4
+    python benchmarks/bench_jpeg_encoders.py            # synthetic frames
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add project root and src directory to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.append(os.path.join(project_root, 'src'))
+
+from src.jpeg_encoder import available_encoders, create_encoder
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+QUALITIES = [60, 80, 95]
+
+
+def load_frames(video_path, max_frames):
+    """Read up to max_frames frames from a video file"""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def synthetic_frames(count):
+    """Camera-like frames: smooth gradients plus sensor noise"""
+    rng = np.random.default_rng(0)
+    h, w = 1080, 1920
+    yy, xx = np.mgrid[0:h, 0:w]
+    frames = []
+    for i in range(count):
+        base = np.stack([
+            (xx + i * 7) % 256,
+            (yy + i * 3) % 256,
+            ((xx + yy) // 2) % 256
+        ], axis=-1).astype(np.int16)
+        noise = rng.integers(-12, 12, size=base.shape, dtype=np.int16)
+        frames.append(np.clip(base + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def bench_encoder(encoder, frames, quality, repeats):
+    """Returns (ms per frame, average encoded KB)"""
+    encoder.encode(frames[0], quality)  # warm-up (buffer allocation)
+    sizes = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for frame in frames:
+            sizes.append(len(encoder.encode(frame, quality)))
+    elapsed = time.perf_counter() - start
+    return elapsed / len(sizes) * 1000, sum(sizes) / len(sizes) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JPEG encoders')
+    parser.add_argument('--video', type=str, help='Recorded video to take frames from (default: synthetic)')
+    parser.add_argument('--frames', type=int, default=30, help='Number of frames to encode (default: 30)')
+    parser.add_argument('--repeats', type=int, default=3, help='Passes over the frames (default: 3)')
+    parser.add_argument('--json', type=str, help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    source_frames = load_frames(args.video, args.frames) if args.video else synthetic_frames(args.frames)
+    if not source_frames:
+        print(f"❌ No frames could be read from {args.video}")
+        return 1
+
+    encoders = available_encoders()
+    print(f"🧪 Encoders: {', '.join(encoders)} | frames: {len(source_frames)} x {args.repeats}")
+    print(f"{'resolution':>11} {'quality':>7} " + " ".join(f"{name:>22}" for name in encoders))
+
+    results = []
+    for width, height in RESOLUTIONS:
+        frames = [cv2.resize(f, (width, height), interpolation=cv2.INTER_AREA) for f in source_frames]
+        for quality in QUALITIES:
+            row = []
+            for name in encoders:
+                ms, kb = bench_encoder(create_encoder(name), frames, quality, args.repeats)
+                row.append(f"{ms:8.2f} ms {kb:8.1f} KB")
+                results.append({
+                    'encoder': name, 'width': width, 'height': height, 'quality': quality,
+                    'ms_per_frame': round(ms, 3), 'avg_kb': round(kb, 1)
+                })
+            print(f"{width:>5}x{height:<5} {quality:>7} " + " ".join(f"{cell:>22}" for cell in row))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files
+
+Prints per-stage fps and latency changes between a baseline and a new
+run of benchmarks/run_benchmarks.py, and exits non-zero when any stage
+regressed by more than the threshold.
+
+Usage:
+    python benchmarks/compare.py baseline.json results.json
+    python benchmarks/compare.py baseline.json results.json --threshold 5 --metric p95_ms
+"""
+
+import argparse
+import json
+import sys
+
+# Metric -> True when higher is better
+METRICS = {
+    'fps': True,
+    'mean_ms': False,
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'cpu_percent': False,
+}
+
+
+def load(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def change_percent(old, new):
+    """Relative change from old to new in percent"""
+    return (new - old) / old * 100 if old else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('baseline', help='Baseline results JSON')
+    parser.add_argument('results', help='New results JSON')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Regression threshold in percent (default: 10)')
+    parser.add_argument('--metric', action='append', choices=list(METRICS),
+                        help='Metric(s) checked against the threshold (default: fps and p95_ms)')
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    results = load(args.results)
+    checked = args.metric or ['fps', 'p95_ms']
+
+    base_meta = baseline.get('meta', {})
+    new_meta = results.get('meta', {})
+    print(f"📊 {base_meta.get('commit') or args.baseline} -> {new_meta.get('commit') or args.results}")
+    if base_meta.get('source') != new_meta.get('source') or base_meta.get('resolution') != new_meta.get('resolution'):
+        print(f"⚠️ Different inputs: {base_meta.get('source')} {base_meta.get('resolution')} vs "
+              f"{new_meta.get('source')} {new_meta.get('resolution')}")
+
+    regressions = []
+    print(f"{'stage':>15} {'metric':>12} {'baseline':>10} {'new':>10} {'change':>9}")
+    for stage, new_stats in results.get('stages', {}).items():
+        old_stats = baseline.get('stages', {}).get(stage)
+        if not old_stats:
+            print(f"{stage:>15} {'(new stage)':>12}")
+            continue
+        for metric in checked:
+            if metric not in old_stats or metric not in new_stats:
+                continue
+            if metric == 'cpu_percent' and old_stats.get('cpu_scope', 'process') != new_stats.get('cpu_scope', 'process'):
+                print(f"{stage:>15} {metric:>12} {'(measured differently, skipped)':>31}")
+                continue
+            old, new = old_stats[metric], new_stats[metric]
+            change = change_percent(old, new)
+            worse = -change if METRICS[metric] else change
+            marker = ""
+            if worse > args.threshold:
+                marker = " ❌"
+                regressions.append(f"{stage} {metric}")
+            elif worse < -args.threshold:
+                marker = " ✅"
+            print(f"{stage:>15} {metric:>12} {old:>10.2f} {new:>10.2f} {change:>+8.1f}%{marker}")
+
+    if regressions:
+        print(f"\n❌ Regressions over {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    print(f"\n✅ No regressions over {args.threshold:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
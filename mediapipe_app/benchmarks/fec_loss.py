@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Video FEC loss simulation
+
+Fragments JPEG frames with FragmentedFrameSender, drops datagrams at random
+and reassembles the rest with FrameReassembler, with and without the XOR
+parity fragment. Shows how many frames survive and what the parity costs.
+
+Usage:
+    python benchmarks/fec_loss.py --video recording.mp4
+    python benchmarks/fec_loss.py --loss 1,2,5 --max-payload 16000   # synthetic frames
+"""
+
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+# Add project root and src directory to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.append(os.path.join(project_root, 'src'))
+
+from src.udp_sender import FragmentedFrameSender, FrameReassembler
+from src.jpeg_encoder import create_encoder
+from benchmarks.bench_jpeg_encoders import load_frames, synthetic_frames
+
+
+class CapturingSocket:
+    """Socket stand-in that keeps the datagrams instead of sending them"""
+
+    def __init__(self):
+        self.packets = []
+
+    def sendmsg(self, buffers, ancdata, flags, address):
+        self.packets.append(b''.join(bytes(buffer) for buffer in buffers))
+
+
+def encode_frames(frames, quality):
+    encoder = create_encoder('auto')
+    return [bytes(encoder.encode(frame, quality)) for frame in frames]
+
+
+def simulate(jpeg_frames, loss, fec, max_payload, rng):
+    """
+    Send every frame through a lossy channel.
+    Returns: (frames delivered, frames recovered by FEC, datagrams sent, bytes sent)
+    """
+    channel = CapturingSocket()
+    sender = FragmentedFrameSender(channel, ('127.0.0.1', 0), max_payload=max_payload, fec=fec)
+    reassembler = FrameReassembler()
+    delivered = 0
+    for seq, jpeg in enumerate(jpeg_frames, start=1):
+        channel.packets.clear()
+        sender.send_frame(jpeg, seq)
+        for packet in channel.packets:
+            if rng.random() < loss:
+                continue
+            result = reassembler.add(packet)
+            if result is not None and result[1] == jpeg:
+                delivered += 1
+        reassembler.discard_before(seq + 1)
+    return delivered, reassembler.frames_recovered, sender.packets_sent, sender.bytes_sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate video packet loss with and without FEC')
+    parser.add_argument('--video', type=str, help='Video file (default: synthetic frames)')
+    parser.add_argument('--frames', type=int, default=300, help='Frames to send (default: 300)')
+    parser.add_argument('--quality', type=int, default=80, help='JPEG quality (default: 80)')
+    parser.add_argument('--max-payload', type=int, default=60000,
+                        help='JPEG bytes per datagram (default: 60000, as FaceLoginSystem)')
+    parser.add_argument('--loss', type=str, default='0.5,1,2,5',
+                        help='Comma-separated datagram loss rates in percent (default: 0.5,1,2,5)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+
+    if args.video:
+        frames = load_frames(args.video, args.frames)
+    else:
+        frames = [cv2.resize(frame, (640, 480)) for frame in synthetic_frames(min(args.frames, 60))]
+        frames = [frames[i % len(frames)] for i in range(args.frames)]
+    if not frames:
+        print("❌ No frames to send")
+        return 1
+
+    jpeg_frames = encode_frames(frames, args.quality)
+    average = sum(len(jpeg) for jpeg in jpeg_frames) / len(jpeg_frames)
+    print(f"🎞️  {len(jpeg_frames)} frames, {average / 1024:.1f} KB average, "
+          f"{args.max_payload} byte fragments")
+    print(f"{'loss':>6} | {'plain':>8} | {'fec':>8} | {'recovered':>9} | {'fec overhead':>12}")
+    for loss in [float(value) for value in args.loss.split(',')]:
+        plain, _, _, plain_bytes = simulate(jpeg_frames, loss / 100, False, args.max_payload,
+                                            np.random.default_rng(args.seed))
+        fec, recovered, _, fec_bytes = simulate(jpeg_frames, loss / 100, True, args.max_payload,
+                                                np.random.default_rng(args.seed))
+        total = len(jpeg_frames)
+        print(f"{loss:5.1f}% | {plain / total * 100:7.1f}% | {fec / total * 100:7.1f}% | "
+              f"{recovered:9d} | {(fec_bytes / plain_bytes - 1) * 100:11.1f}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency harness
+
+Replays a recorded video through HandTracker (detect -> classify -> UDP send)
+with a monotonic capture timestamp on every frame. Landmark stream and binary
+gesture messages go to an echo receiver standing in for Godot, which stamps
+the arrival time and sends each packet back. Reports latency histograms per
+stage and end to end. Runs headless; the receiver must be on the same host
+(it shares the monotonic clock).
+
+Usage:
+    python benchmarks/latency_harness.py --video recording.mp4
+    python benchmarks/latency_harness.py --video recording.mp4 --realtime --json latency.json
+    python benchmarks/latency_harness.py --echo-only --port 9999     # receiver in its own process
+    python benchmarks/latency_harness.py --video recording.mp4 --receiver 127.0.0.1:9999
+"""
+
+import argparse
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+import cv2
+
+# Add project root and src directory to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.append(os.path.join(project_root, 'src'))
+
+from src.hand_tracking import HandTracker
+from src.gesture_protocol import (
+    GESTURE_MAGIC, STREAM_MAGIC, GestureMessageEncoder, decode_gesture_message,
+    decode_landmark_message, elapsed_us, monotonic_us
+)
+from src.frame_scheduler import FrameScheduler
+from src.frame import Frame, FrameBuffers, FramePool
+from src.pipeline import LatencyHistogram
+
+# Echo = original packet + [receive_timestamp_us:4]
+ECHO_SUFFIX = struct.Struct('>I')
+
+STAGES = ['read', 'detect', 'classify', 'send', 'network', 'end_to_end', 'round_trip', 'gesture_e2e']
+
+
+class EchoReceiver:
+    def __init__(self, host='127.0.0.1', port=0):
+        """
+        Stand-in for the Godot receiver: stamps every packet with its monotonic
+        arrival time and sends it back to the sender.
+
+        Args:
+            host: Address to bind
+            port: Port to bind (0 = any free port)
+        """
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.settimeout(0.2)
+        self.address = self.socket.getsockname()
+        self.packets = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def serve(self):
+        """Echo packets until stop() is called"""
+        self.running = True
+        while self.running:
+            try:
+                data, sender = self.socket.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            receive_us = monotonic_us()
+            self.packets += 1
+            self.socket.sendto(data + ECHO_SUFFIX.pack(receive_us), sender)
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        self.socket.close()
+
+
+class LatencyHarness:
+    def __init__(self, receiver_address, inference_interval=1, roi_tracking=False):
+        """
+        Args:
+            receiver_address: (host, port) of the echo receiver
+            inference_interval: Passed to HandTracker
+            roi_tracking: Passed to HandTracker
+        """
+        self.tracker = HandTracker(inference_interval, roi_tracking=roi_tracking, stream_landmarks=True)
+        self.tracker.gesture_encoder = GestureMessageEncoder('binary')
+
+        # Send from our own socket so the echoes come back here
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.settimeout(0.1)
+        self.tracker.udp_socket = self.socket
+        self.tracker.udp_host, self.tracker.udp_port = receiver_address
+
+        self.stats = {name: LatencyHistogram(name) for name in STAGES}
+        self.pending = {}  # stream seq -> send time (monotonic)
+        self.buffers = FrameBuffers()
+        self.frames = 0
+        self.echoes = 0
+        self._lock = threading.Lock()
+        self._running = False
+
+    def process_frame(self, frame, read_start, capture_time):
+        """Run one frame through detect -> classify -> send"""
+        self.stats['read'].record(capture_time - read_start)
+        frame = Frame(frame, timestamp=capture_time, buffers=self.buffers).mirrored()
+
+        results, _ = self.tracker.detect_hands(frame)
+        detect_done = time.monotonic()
+        self.stats['detect'].record(detect_done - capture_time)
+
+        hands = self.tracker.analyze_hands(results)
+        classify_done = time.monotonic()
+        self.stats['classify'].record(classify_done - detect_done)
+
+        with self._lock:
+            self.pending[self.tracker.stream_encoder.sequence_number] = classify_done
+        self.tracker.send_landmarks_to_godot(hands, capture_time)
+        for hand in hands:
+            if hand.gesture:
+                self.tracker.send_gesture_to_godot(hand.gesture, hand.label, hand.score, capture_time)
+        self.stats['send'].record(time.monotonic() - classify_done)
+        self.frames += 1
+
+    def receive_echoes(self):
+        """Reader thread: stamps echoes on arrival so round trips exclude frame processing"""
+        while self._running:
+            try:
+                data = self.socket.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.record_echo(data, time.monotonic())
+
+    def wait_for_echoes(self, timeout=0.5):
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def record_echo(self, data, arrival):
+        packet = data[:-ECHO_SUFFIX.size]
+        (receive_us,) = ECHO_SUFFIX.unpack_from(data, len(data) - ECHO_SUFFIX.size)
+        self.echoes += 1
+
+        if packet[:2] == STREAM_MAGIC:
+            message = decode_landmark_message(packet)
+            with self._lock:
+                sent = self.pending.pop(message['seq'], None) if message else None
+            if sent is None:
+                return
+            self.stats['end_to_end'].record(elapsed_us(message['timestamp_us'], receive_us) / 1e6)
+            self.stats['network'].record(elapsed_us(monotonic_us(sent), receive_us) / 1e6)
+            self.stats['round_trip'].record(arrival - sent)
+        elif packet[:2] == GESTURE_MAGIC:
+            message = decode_gesture_message(packet)
+            if message:
+                self.stats['gesture_e2e'].record(elapsed_us(message['timestamp_us'], receive_us) / 1e6)
+
+    def run(self, video_path, max_frames=0, realtime=False):
+        """Replay the video; realtime paces reads at the file's frame rate"""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            print(f"❌ Cannot open video: {video_path}")
+            return False
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._running = True
+        reader = threading.Thread(target=self.receive_echoes, daemon=True)
+        reader.start()
+        # Every frame is measured, so late frames are not skipped
+        scheduler = FrameScheduler(fps, pace=realtime, skip_stale=False)
+        pool = FramePool(1)
+        while not max_frames or self.frames < max_frames:
+            scheduler.wait()
+            read_start = time.monotonic()
+            ret, frame = pool.read(cap)
+            capture_time = time.monotonic()
+            if not ret:
+                break
+            self.process_frame(frame, read_start, capture_time)
+            if self.frames % 100 == 0:
+                print(f"  ... {self.frames} frames")
+        cap.release()
+
+        # Wait for the last echoes
+        self.wait_for_echoes()
+        self._running = False
+        reader.join(timeout=1.0)
+        return True
+
+    def report(self):
+        print(f"\n📊 Frames: {self.frames} | echoes: {self.echoes} | stream packets lost: {len(self.pending)}")
+        for name in STAGES:
+            print(self.stats[name].summary())
+        print("\nEnd to end (capture -> receiver):")
+        for line in self.stats['end_to_end'].histogram():
+            print("  " + line)
+
+    def as_dict(self):
+        return {
+            'frames': self.frames,
+            'echoes': self.echoes,
+            'lost': len(self.pending),
+            'stages': {name: self.stats[name].as_dict() for name in STAGES}
+        }
+
+
+def parse_address(value):
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end latency harness (camera -> Godot stand-in)')
+    parser.add_argument('--video', type=str, help='Recorded video to replay')
+    parser.add_argument('--frames', type=int, default=0, help='Stop after N frames (default: whole video)')
+    parser.add_argument('--realtime', action='store_true', help='Pace reads at the video frame rate')
+    parser.add_argument('--infer-every', type=int, default=1, help='Run hand inference every N frames')
+    parser.add_argument('--roi', action='store_true', help='ROI-cropped hand inference')
+    parser.add_argument('--receiver', type=str, help='host:port of an external echo receiver (default: in-process)')
+    parser.add_argument('--echo-only', action='store_true', help='Only run the echo receiver')
+    parser.add_argument('--port', type=int, default=9999, help='Echo receiver port for --echo-only (default: 9999)')
+    parser.add_argument('--json', type=str, help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    if args.echo_only:
+        receiver = EchoReceiver('0.0.0.0', args.port)
+        print(f"🔁 Echo receiver on {receiver.address[0]}:{receiver.address[1]} (Ctrl+C to stop)")
+        try:
+            receiver.serve()
+        except KeyboardInterrupt:
+            pass
+        receiver.stop()
+        print(f"✅ Echoed {receiver.packets} packets")
+        return 0
+
+    if not args.video:
+        parser.error('--video is required (or use --echo-only)')
+
+    receiver = None
+    if args.receiver:
+        address = parse_address(args.receiver)
+    else:
+        receiver = EchoReceiver().start()
+        address = receiver.address
+
+    print(f"🧪 Replaying {args.video} -> echo receiver {address[0]}:{address[1]}")
+    harness = LatencyHarness(address, args.infer_every, args.roi)
+    try:
+        ok = harness.run(args.video, args.frames, args.realtime)
+    finally:
+        if receiver:
+            receiver.stop()
+    if not ok:
+        return 1
+
+    harness.report()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(harness.as_dict(), f, indent=2)
+        print(f"💾 Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
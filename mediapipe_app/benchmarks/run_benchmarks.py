@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Pipeline stage benchmarks
+
+Runs each pipeline stage on the same recorded frames and reports
+frames/sec, p50/p95/p99 latency and process CPU% per stage:
+
+    face_detector     FaceDetector.detect_face
+    face_login        FaceLoginSystem.detect_face
+    annotate          FrameAnnotations.draw of the face_login overlay (render cost only)
+    hand_tracking     HandTracker.detect_hands
+    detect_gesture    HandTracker.detect_gesture
+    face_hand         FaceDetector.detect_face + HandTracker.detect_hands on one Frame (one RGB conversion)
+    face_hand_concurrent  CombinedDetector.detect (both graphs on their own thread, latency max(face, hand))
+    jpeg_encode       FaceLoginSystem.encode_frame
+    send_frame_udp    FaceLoginSystem.send_frame_udp (encode + fragment + send)
+    hand_pool         HandTracker.detect_hands_pipelined (--workers processes)
+    face_pool         FaceDetector.detect_face_pipelined (--workers processes)
+
+The pool stages report throughput; their per-frame latency is the time
+to submit a frame and collect whatever finished, and their CPU% includes
+the worker processes (read from /proc; marked 'process only' elsewhere).
+
+Results are written as JSON so runs can be compared between commits
+with benchmarks/compare.py.
+
+Usage:
+    python benchmarks/run_benchmarks.py --source recording.mp4 --json results.json
+    python benchmarks/run_benchmarks.py --stages hand_tracking,detect_gesture
+    python benchmarks/run_benchmarks.py --stages hand_tracking,hand_pool --workers 4
+    python benchmarks/compare.py baseline.json results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add project root and src directory to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.append(os.path.join(project_root, 'src'))
+
+from src.frame_source import open_source
+from src.pipeline import LatencyHistogram
+
+STAGES = ['face_detector', 'face_login', 'annotate', 'hand_tracking', 'detect_gesture', 'face_hand', 'face_hand_concurrent', 'jpeg_encode', 'send_frame_udp',
+          'hand_pool', 'face_pool']
+
+
+def load_frames(spec, count):
+    """Read up to count frames from a frame source into memory"""
+    source = open_source(spec, realtime=False)
+    frames = []
+    while len(frames) < count:
+        ret, frame = source.read()
+        if not ret:
+            break
+        frames.append(frame)
+    source.release()
+    return frames
+
+
+def process_cpu_time(pid):
+    """CPU seconds (user + system) of another process, None where /proc is not available"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def workers_cpu_time(pids):
+    """Summed CPU seconds of the worker processes, None if any cannot be read"""
+    times = [process_cpu_time(pid) for pid in pids]
+    return None if None in times else sum(times)
+
+
+def run_stage(name, fn, inputs, repeats, warmup=5, worker_pids=None):
+    """
+    Time fn(item) for every input, repeats times.
+
+    Args:
+        fn: Callable taking one input
+        inputs: List of inputs, prepared up front (reused across repeats)
+        worker_pids: Callable returning the pids of worker processes doing the
+            stage's work (asked after the warmup); their CPU time is added to
+            cpu_percent
+    Returns: result dict (fps, percentiles, cpu_percent, cpu_scope: 'process',
+        'process+workers', or 'process only' when the worker CPU time could not be read)
+    """
+    for item in inputs[:warmup]:
+        fn(item)
+
+    pids = worker_pids() if worker_pids else []
+    histogram = LatencyHistogram(name)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    workers_start = workers_cpu_time(pids)
+    for _ in range(repeats):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            histogram.record(time.perf_counter() - start)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    workers_end = workers_cpu_time(pids)
+
+    cpu_scope = 'process'
+    if pids:
+        if workers_start is None or workers_end is None:
+            cpu_scope = 'process only'
+        else:
+            cpu += workers_end - workers_start
+            cpu_scope = 'process+workers'
+
+    result = histogram.as_dict()
+    result['fps'] = round(histogram.count / wall, 2) if wall > 0 else 0.0
+    result['cpu_percent'] = round(cpu / wall * 100, 1) if wall > 0 else 0.0
+    result['cpu_scope'] = cpu_scope
+    return result
+
+
+def bench_face_detector(frames, repeats):
+    from src.face_detection import FaceDetector
+    detector = FaceDetector()
+    return run_stage('face_detector', detector.detect_face, [f.copy() for f in frames], repeats)
+
+
+def bench_face_login(frames, repeats, login_system):
+    return run_stage('face_login', login_system.detect_face, [f.copy() for f in frames], repeats)
+
+
+def bench_annotate(frames, repeats, login_system):
+    """Drawing only: the overlays are detected up front, each frame gets its own copy to draw on"""
+    inputs = [(login_system.detect_faces(frame)[1], frame.copy()) for frame in frames]
+    return run_stage('annotate', lambda item: item[0].draw(item[1]), inputs, repeats)
+
+
+def bench_hand_tracking(frames, repeats):
+    from src.hand_tracking import HandTracker
+    tracker = HandTracker()
+    return run_stage('hand_tracking', tracker.detect_hands, [f.copy() for f in frames], repeats)
+
+
+def bench_detect_gesture(frames, repeats):
+    """Gesture classification on the landmarks found in the frames (random hands if none)"""
+    from src.hand_tracking import HandTracker
+    tracker = HandTracker()
+    hands = []
+    for frame in frames:
+        results, _ = tracker.detect_hands(frame.copy())
+        if results.multi_hand_landmarks and results.multi_handedness:
+            for landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                hands.append((landmarks.landmark, handedness.classification[0].label))
+    if not hands:
+        rng = np.random.default_rng(0)
+        hands = [(rng.random((21, 3), dtype=np.float32), ("Left", "Right")[i % 2]) for i in range(len(frames))]
+    return run_stage('detect_gesture', lambda hand: tracker.detect_gesture(*hand), hands, repeats)
+
+
+def bench_face_hand(frames, repeats):
+    """Both detectors on the same frame, sharing the Frame's cached RGB view"""
+    from src.face_detection import FaceDetector
+    from src.hand_tracking import HandTracker
+    from src.frame import Frame, FrameBuffers
+    detector = FaceDetector()
+    tracker = HandTracker()
+    buffers = FrameBuffers()
+
+    def step(frame):
+        shared = Frame(frame, buffers=buffers)
+        detector.detect_face(shared)
+        tracker.detect_hands(shared)
+
+    return run_stage('face_hand', step, frames, repeats)
+
+
+def bench_face_hand_concurrent(frames, repeats):
+    """Same work as face_hand, with the two graphs running concurrently (no deadline)"""
+    from src.combined_detection import CombinedDetector
+    detector = CombinedDetector()
+    try:
+        return run_stage('face_hand_concurrent', detector.detect, frames, repeats)
+    finally:
+        detector.close()
+
+
+def bench_pool(name, pool, pipelined, frames, repeats):
+    """Pipelined stage: the outstanding frames are drained inside the timed call of the last frame"""
+    last = len(frames) - 1
+
+    def step(item):
+        index, frame = item
+        pipelined(frame)
+        if index == last:
+            pool.drain()
+
+    try:
+        return run_stage(name, step, [(i, f.copy()) for i, f in enumerate(frames)], repeats,
+                         worker_pids=lambda: pool.worker_pids)
+    finally:
+        pool.close()
+
+
+def bench_hand_pool(frames, repeats, workers):
+    from src.hand_tracking import HandTracker
+    tracker = HandTracker(inference_workers=workers)
+    return bench_pool('hand_pool', tracker.inference_pool, tracker.detect_hands_pipelined, frames, repeats)
+
+
+def bench_face_pool(frames, repeats, workers):
+    from src.face_detection import FaceDetector
+    detector = FaceDetector(inference_workers=workers)
+    return bench_pool('face_pool', detector.inference_pool, detector.detect_face_pipelined, frames, repeats)
+
+
+def bench_jpeg_encode(frames, repeats, login_system):
+    return run_stage('jpeg_encode', login_system.encode_frame, frames, repeats)
+
+
+def bench_send_frame_udp(frames, repeats, login_system):
+    return run_stage('send_frame_udp', login_system.send_frame_udp, frames, repeats)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pipeline stages on recorded frames')
+    parser.add_argument('--source', type=str, default='synthetic:640x480',
+                        help='Frame source: video file, image directory or synthetic[:WxH] (default: synthetic:640x480)')
+    parser.add_argument('--frames', type=int, default=60, help='Frames loaded from the source (default: 60)')
+    parser.add_argument('--repeats', type=int, default=3, help='Passes over the frames per stage (default: 3)')
+    parser.add_argument('--stages', type=str, default=','.join(STAGES),
+                        help=f'Comma-separated stages to run (default: all: {",".join(STAGES)})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for the pool stages (default: CPU count)')
+    parser.add_argument('--json', type=str, help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    frames = load_frames(args.source, args.frames)
+    if not frames:
+        print(f"❌ No frames could be read from {args.source}")
+        return 1
+    height, width = frames[0].shape[:2]
+    print(f"🧪 {len(frames)} frames ({width}x{height}) from {args.source} x {args.repeats} repeats")
+
+    # Login system shared by face_login / annotate / jpeg_encode / send_frame_udp.
+    # Frames go to a local socket nobody reads; no bitrate limit, fixed quality.
+    login_system = None
+    sink = None
+    if {'face_login', 'annotate', 'jpeg_encode', 'send_frame_udp'} & set(stages):
+        from login import FaceLoginSystem
+        sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sink.bind(('127.0.0.1', 0))
+        login_system = FaceLoginSystem(send_udp=True, udp_host='127.0.0.1', udp_port=sink.getsockname()[1],
+                                       max_bitrate=0, adaptive_quality=False)
+
+    runners = {
+        'face_detector': lambda: bench_face_detector(frames, args.repeats),
+        'face_login': lambda: bench_face_login(frames, args.repeats, login_system),
+        'annotate': lambda: bench_annotate(frames, args.repeats, login_system),
+        'hand_tracking': lambda: bench_hand_tracking(frames, args.repeats),
+        'detect_gesture': lambda: bench_detect_gesture(frames, args.repeats),
+        'face_hand': lambda: bench_face_hand(frames, args.repeats),
+        'face_hand_concurrent': lambda: bench_face_hand_concurrent(frames, args.repeats),
+        'jpeg_encode': lambda: bench_jpeg_encode(frames, args.repeats, login_system),
+        'send_frame_udp': lambda: bench_send_frame_udp(frames, args.repeats, login_system),
+        'hand_pool': lambda: bench_hand_pool(frames, args.repeats, args.workers),
+        'face_pool': lambda: bench_face_pool(frames, args.repeats, args.workers),
+    }
+
+    results = {}
+    for name in stages:
+        print(f"⏱️  {name}...")
+        results[name] = runners[name]()
+
+    print(f"\n{'stage':>20} {'fps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'cpu %':>7}")
+    for name, r in results.items():
+        print(f"{name:>20} {r['fps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['cpu_percent']:>7.1f}"
+              f"{' (without workers)' if r['cpu_scope'] == 'process only' else ''}")
+
+    if login_system and login_system.udp_socket:
+        login_system.udp_socket.close()
+    if sink:
+        sink.close()
+
+    if args.json:
+        report = {
+            'meta': {
+                'commit': git_commit(),
+                'source': args.source,
+                'frames': len(frames),
+                'resolution': f"{width}x{height}",
+                'repeats': args.repeats,
+                'python': platform.python_version(),
+                'opencv': cv2.__version__,
+                'machine': platform.machine(),
+                'cpu_count': os.cpu_count(),
+                'workers': args.workers,
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'stages': results
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
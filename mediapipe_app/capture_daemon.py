@@ -0,0 +1,38 @@
+import sys
+import os
+import signal
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.frame_source import add_source_arguments, open_source_from_args
+from src.shared_frames import DEFAULT_RING_NAME, CaptureDaemon
+
+# Main entry point
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Capture daemon: owns the camera and shares its frames through shared memory')
+    add_source_arguments(parser)
+    parser.add_argument('--name', type=str, default=DEFAULT_RING_NAME,
+                        help=f'Shared memory ring name; readers use --source shm:<name> (default: {DEFAULT_RING_NAME})')
+    parser.add_argument('--slots', type=int, default=8, help='Frames kept in the ring (default: 8)')
+    parser.add_argument('--replace', action='store_true',
+                        help='Take over a ring still marked running (only after the previous daemon crashed)')
+
+    args = parser.parse_args()
+
+    cap = open_source_from_args(args)
+    if not cap.isOpened():
+        print("❌ Error: Tidak dapat mengakses kamera")
+        sys.exit(1)
+
+    # Stop cleanly (and remove the ring) on kill as well as Ctrl+C
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+
+    print("Tekan Ctrl+C untuk berhenti")
+    daemon = CaptureDaemon(cap, args.name, args.slots, args.replace)
+    sys.exit(0 if daemon.run() else 1)
@@ -8,9 +8,14 @@ import struct
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.face_detection import FaceDetector
+from src.jpeg_encoder import create_encoder
+from src.frame_source import add_source_arguments, open_source, open_source_from_args
+from src.frame_scheduler import scheduler_for_source
+from src.annotations import FrameAnnotations, GREEN, RED, WHITE, YELLOW
+from src.frame import Frame, FrameBuffers, FramePool
 
 class FaceDetectionSystem:
-    def __init__(self, send_udp=False, udp_host='127.0.0.1', udp_port=5000):
+    def __init__(self, send_udp=False, udp_host='127.0.0.1', udp_port=5000, encoder='auto', source=None):
         """
         Initialize Face Detection System
         
@@ -18,8 +23,12 @@ class FaceDetectionSystem:
             send_udp: If True, send video frames via UDP
             udp_host: UDP destination host
             udp_port: UDP destination port
+            encoder: JPEG encoder backend ('auto', 'turbojpeg' or 'opencv')
+            source: FrameSource or source spec (default: camera 0)
         """
+        self.source = source
         self.face_detector = FaceDetector()
+        self.jpeg_encoder = create_encoder(encoder)
         self.send_udp = send_udp
         self.udp_host = udp_host
         self.udp_port = udp_port
@@ -44,11 +53,12 @@ class FaceDetectionSystem:
         
         try:
             # Encode frame as JPEG
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-            data = buffer.tobytes()
+            jpeg_buffer = self.jpeg_encoder.encode(frame, 80)
+            if jpeg_buffer is None:
+                return
             
             # Send frame data
-            self.udp_socket.sendto(data, (self.udp_host, self.udp_port))
+            self.udp_socket.sendto(jpeg_buffer, (self.udp_host, self.udp_port))
         except Exception as e:
             print(f"Error sending frame via UDP: {e}")
     
@@ -65,7 +75,7 @@ class FaceDetectionSystem:
     
     def detection_process(self):
         """Run continuous face detection"""
-        cap = cv2.VideoCapture(0)
+        cap = open_source(self.source)
         
         if not cap.isOpened():
             print("❌ Error: Tidak dapat mengakses kamera")
@@ -77,10 +87,13 @@ class FaceDetectionSystem:
         
         frame_count = 0
         face_count = 0
+        scheduler = scheduler_for_source(cap)
+        pool = FramePool(1)
+        buffers = FrameBuffers()
         
         try:
             while True:
-                ret, frame = cap.read()
+                ret, frame = pool.read(cap, scheduler)
                 if not ret:
                     print("Error: Tidak dapat membaca frame dari kamera")
                     break
@@ -88,31 +101,29 @@ class FaceDetectionSystem:
                 frame_count += 1
                 
                 # Detect face
-                has_face, processed_frame = self.face_detector.detect_face(frame)
+                has_face, annotations = self.face_detector.detect_face(Frame(frame, frame_count, buffers=buffers))
                 
                 if has_face:
                     face_count += 1
                 
                 # Display statistics
                 detection_rate = (face_count / frame_count * 100) if frame_count > 0 else 0
-                cv2.putText(processed_frame, f"Frames: {frame_count} | Detections: {face_count}", 
-                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                cv2.putText(processed_frame, f"Detection Rate: {detection_rate:.1f}%", 
-                           (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                annotations.text(f"Frames: {frame_count} | Detections: {face_count}", (10, 30), WHITE)
+                annotations.text(f"Detection Rate: {detection_rate:.1f}%", (10, 60), WHITE)
                 
                 if has_face:
-                    cv2.putText(processed_frame, "WAJAH TERDETEKSI", 
-                               (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                    annotations.text("WAJAH TERDETEKSI", (10, 90), GREEN, 0.8)
                 else:
-                    cv2.putText(processed_frame, "Tidak ada wajah", 
-                               (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+                    annotations.text("Tidak ada wajah", (10, 90), RED, 0.8)
                 
-                # Send frame via UDP if enabled
+                processed_frame = annotations.draw(frame)
+                
+                # Send frame via UDP if enabled (without the local UDP status line)
                 if self.send_udp:
                     self.send_frame_udp(processed_frame)
-                    cv2.putText(processed_frame, f"UDP: {self.udp_host}:{self.udp_port}", 
-                               (10, processed_frame.shape[0] - 10), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+                    FrameAnnotations().text(f"UDP: {self.udp_host}:{self.udp_port}",
+                                            (10, processed_frame.shape[0] - 10), YELLOW, 0.5, 1
+                                            ).draw(processed_frame)
                 
                 cv2.imshow('Face Detection System', processed_frame)
                 
@@ -130,6 +141,7 @@ class FaceDetectionSystem:
             print("\n\nDeteksi dihentikan oleh user.")
         finally:
             cap.release()
+            print(f"⏱️  {scheduler.summary()}")
             cv2.destroyAllWindows()
             if self.udp_socket:
                 self.udp_socket.close()
@@ -161,12 +173,17 @@ if __name__ == "__main__":
     parser.add_argument('--udp', action='store_true', help='Enable UDP streaming')
     parser.add_argument('--host', type=str, default='127.0.0.1', help='UDP host (default: 127.0.0.1)')
     parser.add_argument('--port', type=int, default=5000, help='UDP port (default: 5000)')
+    parser.add_argument('--encoder', choices=['auto', 'turbojpeg', 'opencv'], default='auto',
+                        help='JPEG encoder backend (default: auto = TurboJPEG if installed)')
+    add_source_arguments(parser)
     
     args = parser.parse_args()
     
     detection_system = FaceDetectionSystem(
         send_udp=args.udp,
         udp_host=args.host,
-        udp_port=args.port
+        udp_port=args.port,
+        encoder=args.encoder,
+        source=open_source_from_args(args)
     )
     detection_system.run()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Godot UDP Video Server
+Streaming kamera ke banyak client Godot (webcam_client_udp.gd) sekaligus.
+Client mendaftar lewat REGISTER ke port 8888; setiap frame di-encode sekali.
+"""
+
+import sys
+import os
+import signal
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.fanout_server import FanoutServer
+from src.frame_scheduler import scheduler_for_source
+from src.frame import FramePool
+from src.frame_source import add_source_arguments, open_source, open_source_from_args
+from src.gesture_protocol import video_sequence
+from src.jpeg_encoder import create_encoder
+
+
+class GodotUDPServer:
+    def __init__(self, source=None, port=8888, jpeg_quality=80, encoder='auto', camera_id=0,
+                 client_timeout=5.0, max_clients=16, max_bitrate=0, fec=False):
+        """
+        Initialize the video server
+
+        Args:
+            source: FrameSource or source spec (default: camera 0)
+            port: Port clients register with and receive video from
+            jpeg_quality: JPEG quality (0-100)
+            encoder: JPEG encoder backend ('auto', 'turbojpeg' or 'opencv')
+            camera_id: Camera id sent in the upper bits of the frame sequence number
+            client_timeout: Seconds without a heartbeat before a client is dropped
+            max_clients: Maximum registered clients
+            max_bitrate: Per-client bitrate limit in bits per second (0 = unlimited)
+            fec: Send an XOR parity fragment per frame (survives one lost packet)
+        """
+        self.source = source
+        self.camera_id = camera_id
+        self.jpeg_quality = jpeg_quality
+        self.jpeg_encoder = create_encoder(encoder)
+        self.server = FanoutServer(port, client_timeout=client_timeout, max_clients=max_clients,
+                                   bitrate=max_bitrate, fec=fec)
+        self.sequence_number = 1  # webcam_client_udp.gd ignores sequence 0
+        self.frames_encoded = 0
+
+    def stream_frame(self, cap, pool, scheduler=None):
+        """
+        One iteration of run(): read a frame and, while clients are
+        registered, encode it once and send it to all of them
+
+        Args:
+            cap: FrameSource to read from
+            pool: FramePool the frame is read into
+            scheduler: FrameScheduler of the loop
+        Returns: False when the source has no more frames
+        """
+        ret, frame = pool.read(cap, scheduler)
+        if not ret:
+            return False
+
+        # Nobody watching: keep the camera running but skip the encode
+        if self.server.client_count:
+            jpeg_buffer = self.jpeg_encoder.encode(frame, self.jpeg_quality)
+            if jpeg_buffer is not None:
+                self.frames_encoded += 1
+                self.server.send_frame(jpeg_buffer, video_sequence(self.camera_id, self.sequence_number))
+                self.sequence_number = self.sequence_number % 65535 + 1
+        return True
+
+    def run(self, report_interval=5.0):
+        """Stream until the source ends or Ctrl+C"""
+        cap = open_source(self.source)
+        if not cap.isOpened():
+            print("❌ Error: Tidak dapat mengakses kamera")
+            return False
+
+        self.server.start()
+        print(f"🎨 JPEG quality: {self.jpeg_quality}% ({self.jpeg_encoder.name} encoder)")
+        print("📡 Menunggu client Godot (klik 'Connect to Server')...")
+        print("Tekan Ctrl+C untuk berhenti")
+
+        scheduler = scheduler_for_source(cap)
+        pool = FramePool(1)
+        last_report = time.monotonic()
+        try:
+            while True:
+                if not self.stream_frame(cap, pool, scheduler):
+                    print("❌ Error: Tidak dapat membaca frame dari kamera")
+                    break
+
+                now = time.monotonic()
+                if now - last_report >= report_interval:
+                    print(f"📹 {scheduler.summary()} | encoded {self.frames_encoded}")
+                    print(self.server.describe())
+                    last_report = now
+        except KeyboardInterrupt:
+            print("\n⚠️  Server dihentikan oleh user")
+        finally:
+            cap.release()
+            print(self.server.describe())
+            self.server.close()
+            print("🔌 Camera dan UDP server closed")
+        return True
+
+
+# Main entry point
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='UDP video server for several Godot clients')
+    parser.add_argument('--port', type=int, default=8888, help='Registration and video port (default: 8888)')
+    parser.add_argument('--quality', type=int, default=80, help='JPEG quality 0-100 (default: 80)')
+    parser.add_argument('--encoder', choices=['auto', 'turbojpeg', 'opencv'], default='auto',
+                        help='JPEG encoder backend (default: auto = TurboJPEG if installed)')
+    parser.add_argument('--camera-id', type=int, default=0, help='Camera id in the video header (default: 0)')
+    parser.add_argument('--client-timeout', type=float, default=5.0,
+                        help='Seconds without heartbeat before a client is dropped (default: 5)')
+    parser.add_argument('--max-clients', type=int, default=16, help='Maximum registered clients (default: 16)')
+    parser.add_argument('--max-bitrate', type=float, default=0.0,
+                        help='Per-client bitrate limit in Mbit/s, 0 = unlimited (default: 0)')
+    parser.add_argument('--fec', action='store_true',
+                        help='Add an XOR parity packet per frame so one lost packet does not drop the frame')
+    add_source_arguments(parser)
+
+    args = parser.parse_args()
+
+    # Notify clients (SERVER_SHUTDOWN) on kill as well as Ctrl+C
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+
+    server = GodotUDPServer(
+        source=open_source_from_args(args),
+        port=args.port,
+        jpeg_quality=args.quality,
+        encoder=args.encoder,
+        camera_id=args.camera_id,
+        client_timeout=args.client_timeout,
+        max_clients=args.max_clients,
+        max_bitrate=int(args.max_bitrate * 1_000_000),
+        fec=args.fec
+    )
+    sys.exit(0 if server.run() else 1)
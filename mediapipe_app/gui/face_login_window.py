@@ -1,15 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import cv2
 import threading
 import time
-from PIL import Image, ImageTk
 import sys
 import os
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
 from face_detection import FaceDetector
+from frame_source import CameraSource, open_source
+from frame_scheduler import scheduler_for_source
+from annotations import FrameAnnotations
+from frame import Frame, FrameBuffers, FramePool
+from .preview import FramePreview
 
 class FaceLoginWindow:
     def __init__(self, parent_app):
@@ -35,6 +38,7 @@ class FaceLoginWindow:
         
         # Create interface
         self.create_interface()
+        self.preview = FramePreview(self.camera_label)
         
         # Handle window close
         self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -180,13 +184,19 @@ class FaceLoginWindow:
     def start_login(self):
         """Start face detection login process"""
         try:
-            # Try multiple camera indices
-            camera_indices = [0, 1, -1]  # Try default, secondary, and any available
             self.cap = None
+            source = getattr(self.parent_app, 'source', None)
+            if source is not None:
+                # Recorded video / image directory / synthetic source, looped for the preview
+                self.cap = open_source(source, getattr(self.parent_app, 'source_realtime', True), loop=True)
+                print(f"🎞️ Frame source: {self.cap.describe()}")
+            
+            # No source given: try multiple camera indices
+            camera_indices = [0, 1, -1] if source is None else []  # Try default, secondary, and any available
             
             for index in camera_indices:
                 print(f"Trying camera index {index}...")
-                test_cap = cv2.VideoCapture(index)
+                test_cap = CameraSource(index)
                 if test_cap.isOpened():
                     # Test if we can actually read a frame
                     ret, frame = test_cap.read()
@@ -237,6 +247,7 @@ Solusi:
             self.camera_thread = threading.Thread(target=self.camera_loop)
             self.camera_thread.daemon = True
             self.camera_thread.start()
+            self.preview.start()
             
         except Exception as e:
             error_msg = f"""Gagal memulai login: {str(e)}
@@ -280,6 +291,8 @@ Tips troubleshooting:
             )
         if hasattr(self, 'progress_var'):
             self.progress_var.set(0)
+        if hasattr(self, 'preview'):
+            self.preview.stop()
         if hasattr(self, 'camera_label'):
             self.camera_label.config(
                 image='',
@@ -287,14 +300,17 @@ Tips troubleshooting:
             )
     
     def camera_loop(self):
-        """Main camera processing loop"""
+        """Main camera processing loop, at the source's rate or the --fps target"""
+        self.scheduler = scheduler_for_source(self.cap, getattr(self.parent_app, 'target_fps', None))
+        buffers = FrameBuffers()
+        pool = FramePool(1)
         frame_count = 0
         consecutive_failures = 0
         max_failures = 10
         
         try:
             while self.is_running and self.cap and self.cap.isOpened():
-                ret, frame = self.cap.read()
+                ret, frame = pool.read(self.cap, self.scheduler)
                 if not ret:
                     consecutive_failures += 1
                     print(f"Failed to read frame {consecutive_failures}/{max_failures}")
@@ -311,16 +327,16 @@ Tips troubleshooting:
                 frame_count += 1
                 
                 # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
+                frame = Frame(frame, frame_count, buffers=buffers).mirrored()
                 
                 # Detect face
                 try:
-                    has_face, processed_frame = self.face_detector.detect_face(frame)
+                    has_face, annotations = self.face_detector.detect_face(frame)
                 except Exception as e:
                     print(f"Face detection error: {e}")
                     # Continue with original frame if face detection fails
                     has_face = False
-                    processed_frame = frame
+                    annotations = FrameAnnotations()
                 
                 # Update login progress
                 if has_face:
@@ -339,21 +355,13 @@ Tips troubleshooting:
                     progress = (self.face_detected_time / self.required_detection_time) * 100
                     self.window.after(0, self.update_progress, progress, "🔴 Wajah tidak terdeteksi")
                 
-                # Convert frame for tkinter
+                # Newest frame for the preview; the Tk thread pulls it at display rate
                 try:
-                    frame_rgb = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-                    frame_resized = cv2.resize(frame_rgb, (640, 480))
-                    image = Image.fromarray(frame_resized)
-                    photo = ImageTk.PhotoImage(image=image)
-                    
-                    # Update camera display in main thread
-                    self.window.after(0, self.update_camera_display, photo)
+                    self.preview.publish(annotations.draw(frame.bgr))
                 except Exception as e:
                     print(f"Frame processing error: {e}")
                     # Continue without updating display if frame processing fails
                 
-                time.sleep(0.033)  # ~30 FPS
-                
         except Exception as e:
             print(f"Camera loop error: {e}")
             self.window.after(0, self.camera_error_callback, f"Error kamera: {str(e)}")
@@ -365,12 +373,7 @@ Tips troubleshooting:
                     self.cap.release()
                 except:
                     pass
-    
-    def update_camera_display(self, photo):
-        """Update camera display in main thread"""
-        if self.camera_label.winfo_exists():
-            self.camera_label.config(image=photo, text='')
-            self.camera_label.image = photo  # Keep reference
+            print(f"⏱️  Camera loop: {self.scheduler.summary()}")
     
     def update_progress(self, progress, status_text):
         """Update progress bar and status in main thread"""
@@ -1,15 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import cv2
 import threading
 import time
-from PIL import Image, ImageTk
 import sys
 import os
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
 from hand_tracking import HandTracker
+from frame_source import CameraSource, open_source
+from frame_scheduler import scheduler_for_source
+from annotations import FrameAnnotations, CYAN, GREEN, RED, WHITE
+from frame import Frame, FrameBuffers, FramePool
+from .preview import FramePreview
 
 class HandGestureWindow:
     def __init__(self, parent_app):
@@ -35,6 +38,7 @@ class HandGestureWindow:
         
         # Create interface
         self.create_interface()
+        self.preview = FramePreview(self.camera_label)
         
         # Handle window close
         self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -272,13 +276,19 @@ class HandGestureWindow:
     def start_tracking(self):
         """Start hand gesture tracking"""
         try:
-            # Try multiple camera indices
-            camera_indices = [0, 1, -1]
             self.cap = None
+            source = getattr(self.parent_app, 'source', None)
+            if source is not None:
+                # Recorded video / image directory / synthetic source, looped for the preview
+                self.cap = open_source(source, getattr(self.parent_app, 'source_realtime', True), loop=True)
+                print(f"🎞️ Frame source: {self.cap.describe()}")
+            
+            # No source given: try multiple camera indices
+            camera_indices = [0, 1, -1] if source is None else []
             
             for index in camera_indices:
                 print(f"Trying camera index {index}...")
-                test_cap = cv2.VideoCapture(index)
+                test_cap = CameraSource(index)
                 if test_cap.isOpened():
                     ret, frame = test_cap.read()
                     if ret:
@@ -316,6 +326,7 @@ Solusi:
             self.camera_thread = threading.Thread(target=self.camera_loop)
             self.camera_thread.daemon = True
             self.camera_thread.start()
+            self.preview.start()
             
         except Exception as e:
             error_msg = f"""Gagal memulai tracking: {str(e)}
@@ -356,6 +367,8 @@ Tips troubleshooting:
             self.start_btn.config(state='normal')
         if hasattr(self, 'stop_btn'):
             self.stop_btn.config(state='disabled')
+        if hasattr(self, 'preview'):
+            self.preview.stop()
         if hasattr(self, 'camera_label'):
             self.camera_label.config(
                 image='',
@@ -364,13 +377,16 @@ Tips troubleshooting:
         self.update_gesture_display("NO_HAND")
     
     def camera_loop(self):
-        """Main camera processing loop"""
+        """Main camera processing loop, at the source's rate or the --fps target"""
+        self.scheduler = scheduler_for_source(self.cap, getattr(self.parent_app, 'target_fps', None))
+        buffers = FrameBuffers()
+        pool = FramePool(1)
         consecutive_failures = 0
         max_failures = 10
         
         try:
             while self.is_running and self.cap and self.cap.isOpened():
-                ret, frame = self.cap.read()
+                ret, frame = pool.read(self.cap, self.scheduler)
                 if not ret:
                     consecutive_failures += 1
                     print(f"Failed to read frame {consecutive_failures}/{max_failures}")
@@ -386,18 +402,18 @@ Tips troubleshooting:
                 consecutive_failures = 0
                 
                 # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
+                frame = Frame(frame, buffers=buffers).mirrored()
                 frame_height, frame_width = frame.shape[:2]
                 
                 # Detect hands and get gesture
                 try:
-                    landmarks, processed_frame = self.hand_tracker.detect_hands(frame)
+                    landmarks, annotations = self.hand_tracker.detect_hands(frame)
                     direction = self.hand_tracker.get_gesture_direction(landmarks, frame_width, frame_height)
                 except Exception as e:
                     print(f"Hand tracking error: {e}")
                     # Continue with original frame if hand tracking fails
                     direction = "NO_HAND"
-                    processed_frame = frame
+                    annotations = FrameAnnotations()
                 
                 # Update gesture in main thread
                 if direction != self.current_gesture:
@@ -410,35 +426,23 @@ Tips troubleshooting:
                         print(f"Warning: failed to send gesture to Godot: {e}")
                     self.window.after(0, self.update_gesture_display, direction)
                 
-                # Draw direction on frame
+                # Direction on frame
                 if direction != "NO_HAND":
-                    color = (0, 255, 0) if direction != "CENTER" else (255, 255, 0)
-                    cv2.putText(processed_frame, f"ARAH: {direction}", 
-                               (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+                    color = GREEN if direction != "CENTER" else CYAN
+                    annotations.text(f"ARAH: {direction}", (10, 50), color, 1)
                 else:
-                    cv2.putText(processed_frame, "Tidak ada tangan terdeteksi", 
-                               (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                    annotations.text("Tidak ada tangan terdeteksi", (10, 50), RED, 0.7)
                 
-                # Draw reference lines
-                cv2.line(processed_frame, (frame_width//2, 0), 
-                        (frame_width//2, frame_height), (255, 255, 255), 1)
-                cv2.line(processed_frame, (0, frame_height//2), 
-                        (frame_width, frame_height//2), (255, 255, 255), 1)
+                # Reference lines
+                annotations.line((frame_width//2, 0), (frame_width//2, frame_height), WHITE)
+                annotations.line((0, frame_height//2), (frame_width, frame_height//2), WHITE)
                 
-                # Convert frame for tkinter
+                # Newest frame for the preview; the Tk thread pulls it at display rate
                 try:
-                    frame_rgb = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-                    frame_resized = cv2.resize(frame_rgb, (640, 480))
-                    image = Image.fromarray(frame_resized)
-                    photo = ImageTk.PhotoImage(image=image)
-                    
-                    # Update camera display in main thread
-                    self.window.after(0, self.update_camera_display, photo)
+                    self.preview.publish(annotations.draw(frame.bgr))
                 except Exception as e:
                     print(f"Frame processing error: {e}")
                 
-                time.sleep(0.033)  # ~30 FPS
-                
         except Exception as e:
             print(f"Camera loop error: {e}")
             self.window.after(0, self.camera_error_callback, f"Error kamera: {str(e)}")
@@ -450,12 +454,7 @@ Tips troubleshooting:
                     self.cap.release()
                 except:
                     pass
-    
-    def update_camera_display(self, photo):
-        """Update camera display in main thread"""
-        if self.camera_label.winfo_exists():
-            self.camera_label.config(image=photo, text='')
-            self.camera_label.image = photo  # Keep reference
+            print(f"⏱️  Camera loop: {self.scheduler.summary()}")
     
     def update_gesture_display(self, gesture):
         """Update gesture display and indicators"""
@@ -7,8 +7,18 @@ import sys
 import os
 
 class MainWindow:
-    def __init__(self):
-        """Initialize main window application"""
+    def __init__(self, source=None, source_realtime=True, target_fps=None):
+        """
+        Initialize main window application
+        
+        Args:
+            source: Frame source spec for the camera windows (None = first working camera)
+            source_realtime: Pace file sources at their frame rate
+            target_fps: Frame rate the camera loops process frames at (None = every frame)
+        """
+        self.source = source
+        self.source_realtime = source_realtime
+        self.target_fps = target_fps
         self.root = tk.Tk()
         self.root.title("MediaPipe Face & Hand Tracking App")
         self.root.geometry("600x500")
@@ -0,0 +1,92 @@
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class FramePreview:
+    def __init__(self, label, size=(640, 480), fps=30):
+        """
+        Camera preview for a Tk label with a latest-frame slot.
+
+        The camera thread publishes frames (resized into a back buffer, newest
+        wins, nothing queues up); the Tk thread pulls the newest one at display
+        rate and pastes it into a single PhotoImage. The BGR -> RGB swap is done
+        by PIL while reading the buffer, so there is no separate cvtColor.
+
+        Args:
+            label: tk.Label showing the preview
+            size: (width, height) of the preview
+            fps: Display refresh rate
+        """
+        self.label = label
+        self.size = size
+        self.interval_ms = max(1, int(1000 / fps))
+        width, height = size
+        # Triple buffering: camera thread fills _back, _pending is the newest
+        # complete frame, the Tk thread reads _front
+        self._back = np.empty((height, width, 3), dtype=np.uint8)
+        self._pending = np.empty_like(self._back)
+        self._front = np.empty_like(self._back)
+        self._lock = threading.Lock()
+        self._new_frame = False
+        self._after_id = None
+        self.photo = None
+        self.frames_published = 0
+        self.frames_shown = 0
+
+    @property
+    def frames_dropped(self):
+        """Frames replaced by a newer one before the display got to them"""
+        return self.frames_published - self.frames_shown
+
+    def publish(self, frame):
+        """Camera thread: offer a BGR frame for display (never blocks on Tk)"""
+        height, width = frame.shape[:2]
+        if (width, height) == self.size:
+            np.copyto(self._back, frame)
+        else:
+            cv2.resize(frame, self.size, dst=self._back)
+        with self._lock:
+            self._back, self._pending = self._pending, self._back
+            self._new_frame = True
+            self.frames_published += 1
+
+    def start(self):
+        """Tk thread: start pulling frames"""
+        if self._after_id is None:
+            self._refresh()
+
+    def stop(self):
+        """Tk thread: stop pulling frames"""
+        if self._after_id is not None:
+            try:
+                self.label.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _refresh(self):
+        self._after_id = None
+        if not self.label.winfo_exists():
+            return
+        with self._lock:
+            new_frame = self._new_frame
+            if new_frame:
+                self._front, self._pending = self._pending, self._front
+                self._new_frame = False
+        if new_frame:
+            self.show(self._front)
+        self._after_id = self.label.after(self.interval_ms, self._refresh)
+
+    def show(self, frame):
+        """Tk thread: paste a BGR frame of the preview size into the PhotoImage"""
+        image = Image.frombuffer('RGB', self.size, frame, 'raw', 'BGR', 0, 1)
+        if self.photo is None:
+            self.photo = ImageTk.PhotoImage(image=image)
+        else:
+            self.photo.paste(image)
+        if self.label.cget('image') != str(self.photo):
+            self.label.config(image=self.photo, text='')
+        self.frames_shown += 1
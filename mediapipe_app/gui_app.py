@@ -81,9 +81,17 @@ pip install -r requirements.txt"""
     try:
         # Create and run GUI application
         print("✅ All dependencies found")
+        
+        # Frame source for the camera windows (default: first working camera)
+        import argparse
+        from src.frame_source import add_source_arguments
+        parser = argparse.ArgumentParser(description='MediaPipe Face & Hand Tracking GUI')
+        add_source_arguments(parser, default=None)
+        args = parser.parse_args()
+        
         print("🎨 Launching GUI interface...")
         
-        app = MainWindow()
+        app = MainWindow(args.source, source_realtime=not args.fast, target_fps=args.fps)
         app.run()
         
         print("👋 Application closed successfully")
@@ -6,16 +6,35 @@ Langsung kirim gesture ke Godot tanpa GUI
 
 import cv2
 import mediapipe as mp
+import os
 import socket
-import json
+import sys
 import time
 
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.gesture_protocol import GestureMessageEncoder
+from src.frame_source import add_source_arguments, open_source, open_source_from_args
+from src.frame_scheduler import scheduler_for_source
+from src.annotations import FrameAnnotations, GRAY, GREEN
+from src.frame import Frame, FrameBuffers, FramePool
+
 class SimpleHandGesture:
-    def __init__(self):
-        """Initialize hand tracking and UDP sender"""
+    def __init__(self, source=None, show_preview=True):
+        """
+        Initialize hand tracking and UDP sender
+        
+        Args:
+            source: FrameSource or source spec (default: camera 0)
+            show_preview: Show the annotated preview window (False = headless,
+                nothing is drawn)
+        """
+        self.source = source
+        self.show_preview = show_preview
+        
         # MediaPipe setup
         self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=1,
@@ -25,16 +44,17 @@ class SimpleHandGesture:
         
         # UDP setup for Godot
         self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.udp_host = '127.0.0.1'
-        self.udp_port = 9999
+        self.udp_host = os.getenv('GESTURE_UDP_HOST', '127.0.0.1')
+        self.udp_port = int(os.getenv('GESTURE_UDP_PORT', '9999'))
+        self.gesture_encoder = GestureMessageEncoder()  # $GESTURE_UDP_FORMAT: json | binary
         
         # Rate limiting
         self.last_gesture = None
         self.last_time = 0.0
         
         print("🚀 Hand Gesture Tracker Started")
-        print(f"📡 Sending to Godot: {self.udp_host}:{self.udp_port}")
-        print("❌ Press 'q' to quit")
+        print(f"📡 Sending to Godot: {self.udp_host}:{self.udp_port} ({self.gesture_encoder.format})")
+        print("❌ Press 'q' to quit" if show_preview else "❌ Press Ctrl+C to quit")
         print("=" * 50)
     
     def get_gesture(self, landmarks, width, height):
@@ -63,7 +83,7 @@ class SimpleHandGesture:
         else:
             return "CENTER"
     
-    def send_to_godot(self, gesture):
+    def send_to_godot(self, gesture, hand_label=None, confidence=1.0):
         """Send gesture via UDP to Godot"""
         current_time = time.time()
         
@@ -72,13 +92,7 @@ class SimpleHandGesture:
             return
         
         try:
-            message = {
-                "type": "gesture",
-                "gesture": gesture,
-                "timestamp": current_time
-            }
-            
-            data = json.dumps(message).encode('utf-8')
+            data = self.gesture_encoder.encode(gesture, hand_label, confidence)
             self.udp_socket.sendto(data, (self.udp_host, self.udp_port))
             
             self.last_gesture = gesture
@@ -93,58 +107,80 @@ class SimpleHandGesture:
     
     def run(self):
         """Main loop"""
-        cap = cv2.VideoCapture(0)
+        cap = open_source(self.source)
         
         if not cap.isOpened():
             print("❌ Cannot access camera")
             return
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Mirror effect
-            frame = cv2.flip(frame, 1)
-            h, w = frame.shape[:2]
-            
-            # Process frame
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb)
-            
-            # Detect gesture
-            landmarks = None
-            if results.multi_hand_landmarks:
-                landmarks = results.multi_hand_landmarks[0]
-                self.mp_drawing.draw_landmarks(
-                    frame, landmarks, self.mp_hands.HAND_CONNECTIONS
-                )
-            
-            gesture = self.get_gesture(landmarks, w, h)
-            
-            # Send to Godot
-            self.send_to_godot(gesture)
-            
-            # Display
-            color = (0, 255, 0) if gesture not in ["NO_HAND", "CENTER"] else (128, 128, 128)
-            cv2.putText(frame, f"GESTURE: {gesture}", 
-                       (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
-            
-            # Draw reference lines
-            cv2.line(frame, (w//2, 0), (w//2, h), (200, 200, 200), 1)
-            cv2.line(frame, (0, h//2), (w, h//2), (200, 200, 200), 1)
-            
-            cv2.imshow('Hand Gesture -> Godot', frame)
-            
-            # Quit on 'q'
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+        scheduler = scheduler_for_source(cap)
+        buffers = FrameBuffers()
+        pool = FramePool(1)
+        try:
+            while True:
+                ret, frame = pool.read(cap, scheduler)
+                if not ret:
+                    break
+                
+                # Mirror effect (flipped and converted into reused buffers)
+                frame = Frame(frame, buffers=buffers).mirrored()
+                h, w = frame.shape[:2]
+                
+                # Process frame
+                results = self.hands.process(frame.rgb)
+                
+                # Detect gesture
+                landmarks = None
+                hand_label = None
+                confidence = 1.0
+                if results.multi_hand_landmarks:
+                    landmarks = results.multi_hand_landmarks[0]
+                    if results.multi_handedness:
+                        hand_label = results.multi_handedness[0].classification[0].label
+                        confidence = results.multi_handedness[0].classification[0].score
+                
+                gesture = self.get_gesture(landmarks, w, h)
+                
+                # Send to Godot
+                self.send_to_godot(gesture, hand_label, confidence)
+                
+                if not self.show_preview:
+                    continue
+                
+                # Display
+                annotations = FrameAnnotations()
+                if landmarks:
+                    annotations.hand_landmarks(landmarks)
+                color = GREEN if gesture not in ["NO_HAND", "CENTER"] else (128, 128, 128)
+                annotations.text(f"GESTURE: {gesture}", (10, 50), color, 1)
+                
+                # Reference lines
+                annotations.line((w//2, 0), (w//2, h), GRAY)
+                annotations.line((0, h//2), (w, h//2), GRAY)
+                
+                cv2.imshow('Hand Gesture -> Godot', annotations.draw(frame.bgr))
+                
+                # Quit on 'q'
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+        except KeyboardInterrupt:
+            pass
         
         cap.release()
-        cv2.destroyAllWindows()
+        print(f"⏱️  {scheduler.summary()}")
+        if self.show_preview:
+            cv2.destroyAllWindows()
         self.udp_socket.close()
         print("\n✅ Stopped")
 
 if __name__ == "__main__":
-    tracker = SimpleHandGesture()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Simple Hand Gesture Tracking for Godot')
+    parser.add_argument('--headless', action='store_true',
+                        help='No preview window: only send gestures, skip all drawing')
+    add_source_arguments(parser)
+    args = parser.parse_args()
+    
+    tracker = SimpleHandGesture(open_source_from_args(args), show_preview=not args.headless)
     tracker.run()
@@ -1,16 +1,28 @@
 import cv2
 import sys
 import os
-import socket
-import struct
 import time
+import threading
 import mediapipe as mp
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+from src.pipeline import LatestFrameQueue, StageStats, format_stage_report
+from src.udp_sender import FragmentedFrameSender, create_udp_socket
+from src.fanout_server import FanoutServer
+from src.adaptive_quality import AdaptiveQualityController
+from src.jpeg_encoder import create_encoder
+from src.frame_source import add_source_arguments, open_source, open_source_from_args
+from src.gesture_protocol import FaceMetadataEncoder, video_sequence
+from src.frame_scheduler import scheduler_for_source
+from src.annotations import FrameAnnotations, GREEN, RED
+from src.frame import Frame, FrameBuffers, FrameFreeList, as_frame
+
 class FaceLoginSystem:
-    def __init__(self, send_udp=True, udp_host='127.0.0.1', udp_port=5000):
+    def __init__(self, send_udp=True, udp_host='127.0.0.1', udp_port=5000, max_bitrate=40_000_000,
+                 adaptive_quality=True, target_bitrate=12_000_000, target_fragments=1, encoder='auto',
+                 source=None, camera_id=0, serve_port=None, fec=False, annotate_video=True):
         """
         Initialize Face Login System
         
@@ -18,10 +30,26 @@ class FaceLoginSystem:
             send_udp: If True, send video frames via UDP to Godot
             udp_host: UDP destination host
             udp_port: UDP destination port
+            max_bitrate: Video bitrate limit in bits per second (0 = unlimited)
+            adaptive_quality: If True, adapt JPEG quality/resolution to the stream
+            target_bitrate: Bitrate the adaptive controller aims for
+            target_fragments: Datagrams per frame the adaptive controller aims for
+            encoder: JPEG encoder backend ('auto', 'turbojpeg' or 'opencv')
+            source: FrameSource or source spec (default: camera 0)
+            camera_id: Camera id sent in the upper bits of the frame sequence number
+            serve_port: Serve registered clients from this port (webcam_client_udp.gd)
+                instead of sending to udp_host:udp_port
+            fec: Send an XOR parity fragment per frame so a single lost
+                fragment does not drop the frame (login.gd / webcam_client_udp.gd rebuild it)
+            annotate_video: Draw the face boxes and status text into the streamed
+                video. Without it clean frames are sent and receivers draw from
+                the face metadata themselves.
         """
+        self.source = source
+        self.camera_id = camera_id
+        
         # MediaPipe Face Detection
         self.mp_face_detection = mp.solutions.face_detection
-        self.mp_drawing = mp.solutions.drawing_utils
         self.face_detection = self.mp_face_detection.FaceDetection(
             model_selection=0, min_detection_confidence=0.7)  # Increased from 0.5 to 0.7 for stricter detection
         
@@ -30,11 +58,37 @@ class FaceLoginSystem:
         self.udp_host = udp_host
         self.udp_port = udp_port
         self.udp_socket = None
+        self.frame_sender = None
+        self.serve_port = serve_port
+        self.fanout = None
+        self.fec = fec
+        self.annotate_video = annotate_video
+        self.max_bitrate = max_bitrate
         
         # UDP streaming settings (matching godot_udp_server.py)
         self.sequence_number = 0
         self.max_packet_size = 60000  # 60KB per packet (safe for UDP)
         self.jpeg_quality = 80  # JPEG quality (0-100)
+        self.jpeg_encoder = create_encoder(encoder)
+        
+        # Detection result per frame, sent next to the video (login.gd reads it
+        # instead of scanning the JPEG for the burnt-in annotations)
+        self.metadata_encoder = FaceMetadataEncoder(camera_id)
+        
+        # Adaptive JPEG quality / downscale controller (None = fixed quality)
+        self.quality_controller = None
+        if adaptive_quality:
+            self.quality_controller = AdaptiveQualityController(
+                target_bitrate=target_bitrate,
+                target_fragments=target_fragments,
+                max_payload=self.max_packet_size,
+                initial_quality=self.jpeg_quality
+            )
+        
+        # Per-stage timing for the capture -> inference -> encode/send pipeline
+        self.stage_stats = {
+            name: StageStats(name) for name in ('capture', 'inference', 'encode', 'send')
+        }
         
         if self.send_udp:
             self.setup_udp()
@@ -42,16 +96,46 @@ class FaceLoginSystem:
     def setup_udp(self):
         """Setup UDP socket for sending video frames to Godot"""
         try:
-            self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            # Set larger send buffer to handle fragmented packets
-            self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)  # 64KB send buffer
-            print(f"✅ UDP socket created: {self.udp_host}:{self.udp_port}")
+            if self.serve_port:
+                # Encode once, send to every registered client
+                self.fanout = FanoutServer(self.serve_port, max_payload=self.max_packet_size,
+                                           bitrate=self.max_bitrate, fec=self.fec).start()
+                self.frame_sender = self.fanout
+            else:
+                # Send buffer large enough for several full-size fragments
+                self.udp_socket = create_udp_socket()
+                self.frame_sender = FragmentedFrameSender(
+                    self.udp_socket,
+                    (self.udp_host, self.udp_port),
+                    max_payload=self.max_packet_size,
+                    bitrate=self.max_bitrate,
+                    fec=self.fec
+                )
+                print(f"✅ UDP socket created: {self.udp_host}:{self.udp_port}")
             print(f"📦 Max packet size: {self.max_packet_size} bytes")
-            print(f"🎨 JPEG quality: {self.jpeg_quality}%")
+            if self.fec:
+                print("🛡️  FEC: XOR parity packet per frame")
+            if self.max_bitrate:
+                print(f"🚦 Max bitrate: {self.max_bitrate / 1_000_000:.1f} Mbit/s")
+            print(f"🎨 JPEG quality: {self.jpeg_quality}% ({self.jpeg_encoder.name} encoder)")
+            if self.quality_controller:
+                print(f"🎚️  Adaptive quality: target {self.quality_controller.target_bitrate / 1_000_000:.1f} Mbit/s, "
+                      f"{self.quality_controller.target_fragments} fragment(s) per frame")
         except Exception as e:
             print(f"❌ Error creating UDP socket: {e}")
             self.send_udp = False
     
+    def encode_frame(self, frame):
+        """
+        Encode frame as JPEG
+        Returns: flat uint8 buffer with the JPEG data (or None on failure),
+        valid until the next call
+        """
+        if self.quality_controller:
+            frame = self.quality_controller.prepare(frame)
+            self.jpeg_quality = self.quality_controller.quality
+        return self.jpeg_encoder.encode(frame, self.jpeg_quality)
+    
     def send_frame_udp(self, frame):
         """
         Send frame via UDP to Godot with packet fragmentation.
@@ -63,44 +147,33 @@ class FaceLoginSystem:
         Args:
             frame: OpenCV frame to send
         """
-        if not self.send_udp or self.udp_socket is None:
+        if not self.send_udp or self.frame_sender is None:
             return
         
         try:
-            # Encode frame as JPEG
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
-            _, jpeg_buffer = cv2.imencode('.jpg', frame, encode_param)
-            jpeg_bytes = jpeg_buffer.tobytes()
-            
-            frame_size = len(jpeg_bytes)
-            
-            # Calculate number of packets needed
-            total_packets = (frame_size + self.max_packet_size - 1) // self.max_packet_size
-            
-            # Send each fragment
-            for packet_index in range(total_packets):
-                # Calculate chunk boundaries
-                start = packet_index * self.max_packet_size
-                end = min(start + self.max_packet_size, frame_size)
-                chunk = jpeg_bytes[start:end]
-                
-                # Build packet: [seq_num:4][total_packets:4][packet_index:4][data...]
-                header = struct.pack('>III', self.sequence_number, total_packets, packet_index)
-                packet = header + chunk
-                
-                # Send packet
-                self.udp_socket.sendto(packet, (self.udp_host, self.udp_port))
-                
-                # Add minimal delay between packets to prevent UDP buffer overflow
-                if packet_index < total_packets - 1:
-                    time.sleep(0.0005)  # 0.5ms delay
-            
-            # Increment sequence number
-            self.sequence_number = (self.sequence_number + 1) % 65536
-            
+            jpeg_buffer = self.encode_frame(frame)
+            if jpeg_buffer is not None:
+                self.send_jpeg_udp(jpeg_buffer)
         except Exception as e:
             print(f"❌ Error sending frame via UDP: {e}")
     
+    def send_jpeg_udp(self, jpeg_buffer):
+        """
+        Fragment an already encoded JPEG frame and send it via UDP.
+        Fragments reference the encoded buffer directly (no per-chunk copies)
+        and are paced by the sender's token bucket.
+        
+        Args:
+            jpeg_buffer: JPEG encoded frame (bytes or uint8 array)
+        """
+        start = time.perf_counter()
+        self.frame_sender.send_frame(jpeg_buffer, video_sequence(self.camera_id, self.sequence_number))
+        if self.quality_controller:
+            self.quality_controller.update(len(jpeg_buffer), time.perf_counter() - start)
+        
+        # Increment sequence number
+        self.sequence_number = (self.sequence_number + 1) % 65536
+    
     def send_gesture_udp(self, gesture_message):
         """Send gesture/status message via UDP to Godot"""
         if not self.send_udp or self.udp_socket is None:
@@ -112,19 +185,59 @@ class FaceLoginSystem:
         except Exception as e:
             print(f"Error sending gesture via UDP: {e}")
     
+    def send_face_metadata(self, faces, capture_time=None):
+        """
+        Send the detections of the frame about to be streamed (same sequence
+        number as its video fragments).
+        
+        Args:
+            faces: List of (score, xmin, ymin, width, height) from detect_faces
+            capture_time: time.monotonic() when the frame was captured
+        """
+        if not self.send_udp:
+            return
+        message = self.metadata_encoder.encode(self.sequence_number, faces, capture_time)
+        try:
+            if self.fanout:
+                self.fanout.send_datagram(message)
+            elif self.udp_socket:
+                self.udp_socket.sendto(message, (self.udp_host, self.udp_port))
+        except OSError as e:
+            print(f"Error sending face metadata via UDP: {e}")
+    
+    def has_receivers(self):
+        """False while a fan-out server has no registered clients (nothing to encode for)"""
+        return self.fanout is None or self.fanout.client_count > 0
+    
+    def close_udp(self):
+        """Close the UDP socket / fan-out server"""
+        if self.fanout:
+            print(self.fanout.describe())
+            self.fanout.close()
+            self.fanout = None
+        if self.udp_socket:
+            self.udp_socket.close()
+            self.udp_socket = None
+    
     def detect_face(self, frame):
         """
         Detect face in frame using MediaPipe with strict validation
-        Returns: (has_face, processed_frame, face_count)
+        Returns: (has_face, annotations, face_count)
         """
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process the frame
-        results = self.face_detection.process(rgb_frame)
+        has_face, annotations, faces = self.detect_faces(frame)
+        return has_face, annotations, len(faces)
+    
+    def detect_faces(self, frame):
+        """
+        Detect faces in a BGR array or Frame; the frame itself is not modified
+        Returns: (has_face, annotations, faces) with faces a list of
+                 (score, xmin, ymin, width, height), box relative to the frame
+        """
+        frame = as_frame(frame)
+        results = self.face_detection.process(frame.rgb)
         
-        has_face = False
-        face_count = 0
+        faces = []
+        annotations = FrameAnnotations()
         
         if results.detections:
             # Validate each detection
@@ -134,35 +247,26 @@ class FaceLoginSystem:
                 
                 # Only count if confidence is high enough
                 if score >= 0.7:  # Strict threshold
-                    face_count += 1
-                    has_face = True
+                    bbox = detection.location_data.relative_bounding_box
+                    faces.append((score, bbox.xmin, bbox.ymin, bbox.width, bbox.height))
                     
-                    # Draw detection annotations on the image
-                    self.mp_drawing.draw_detection(frame, detection)
+                    # Detection box and key points
+                    annotations.detection(detection)
                     
-                    # Add confidence text
-                    bbox = detection.location_data.relative_bounding_box
-                    h, w, _ = frame.shape
+                    # Confidence percentage above the box
+                    h, w = frame.shape[:2]
                     x = int(bbox.xmin * w)
                     y = int(bbox.ymin * h)
-                    
-                    # Display confidence percentage
-                    cv2.putText(frame, f"{int(score * 100)}%", 
-                               (x, max(y - 10, 20)), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 
-                               0.6, (0, 255, 0), 2)
+                    annotations.text(f"{int(score * 100)}%", (x, max(y - 10, 20)), GREEN)
         
-        # Add status text on frame
+        # Status text
+        has_face = len(faces) > 0
         if has_face:
-            cv2.putText(frame, f"FACE_DETECTED:{face_count}", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
-                       1, (0, 255, 0), 3)
+            annotations.text(f"FACE_DETECTED:{len(faces)}", (10, 30), GREEN, 1, 3)
         else:
-            cv2.putText(frame, "NO_FACE_DETECTED", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
-                       1, (0, 0, 255), 3)
+            annotations.text("NO_FACE_DETECTED", (10, 30), RED, 1, 3)
                 
-        return has_face, frame, face_count
+        return has_face, annotations, faces
     
     def welcome_screen(self):
         """Display welcome message"""
@@ -170,7 +274,9 @@ class FaceLoginSystem:
         print("   VIDEO STREAMING TO GODOT")
         print("=" * 50)
         print("Mode: UDP Video Streamer WITH Face Detection")
-        if self.send_udp:
+        if self.send_udp and self.serve_port:
+            print(f"📡 UDP Server: port {self.serve_port} (clients register)")
+        elif self.send_udp:
             print(f"📡 UDP Target: {self.udp_host}:{self.udp_port}")
         print("✅ MediaPipe Face Detection: AKTIF")
         print("Login akan dihandle oleh Godot")
@@ -179,7 +285,7 @@ class FaceLoginSystem:
     
     def stream_video(self):
         """Stream video continuously to Godot WITH face detection visualization"""
-        cap = cv2.VideoCapture(0)
+        cap = open_source(self.source)
         
         if not cap.isOpened():
             print("❌ Error: Tidak dapat mengakses kamera")
@@ -200,45 +306,142 @@ class FaceLoginSystem:
         faces_detected = 0
         total_faces_count = 0
         
+        # Staged pipeline: capture thread -> inference thread -> encode/send (this thread)
+        # Each hand-off is a latest-frame-wins queue, so a slow stage drops stale
+        # frames instead of building up latency. A capture array goes back to
+        # the pool once its frame is sent or dropped.
+        stop_event = threading.Event()
+        pool = FrameFreeList(6)
+        captured_frames = LatestFrameQueue(maxsize=1, on_drop=lambda item: pool.release(item.bgr))
+        detected_frames = LatestFrameQueue(maxsize=1, on_drop=lambda item: pool.release(item[1]))
+        for stats in self.stage_stats.values():
+            stats.reset()
+        self.capture_scheduler = scheduler_for_source(cap)
+        
+        capture_thread = threading.Thread(
+            target=self._capture_loop, args=(cap, pool, captured_frames, stop_event), daemon=True)
+        inference_thread = threading.Thread(
+            target=self._inference_loop, args=(captured_frames, detected_frames, stop_event), daemon=True)
+        capture_thread.start()
+        inference_thread.start()
+        
         try:
             while True:
-                ret, frame = cap.read()
-                if not ret:
-                    print("❌ Error: Tidak dapat membaca frame dari kamera")
-                    break
+                item = detected_frames.get(timeout=0.5)
+                if item is None:
+                    if detected_frames.closed:
+                        break
+                    continue
                 
+                has_face, frame, annotations, faces, capture_time = item
                 frame_count += 1
                 
-                # Detect face and draw annotations
-                has_face, processed_frame, face_count = self.detect_face(frame)
-                
                 # Count faces for statistics
                 if has_face:
                     faces_detected += 1
-                    total_faces_count += face_count
+                    total_faces_count += len(faces)
                 
-                # Stream the processed frame (with face detection boxes)
-                if self.send_udp:
-                    self.send_frame_udp(processed_frame)
+                self.stream_detected_frame(frame, annotations, faces, capture_time)
+                pool.release(frame)
                 
                 # Print status every 60 frames (~2 seconds)
                 if frame_count % 60 == 0:
                     face_percentage = (faces_detected / frame_count) * 100
                     avg_faces = total_faces_count / max(faces_detected, 1)
-                    print(f"📡 Streaming... (frames: {frame_count}, face detected: {face_percentage:.1f}%, avg faces: {avg_faces:.1f})")
+                    dropped = captured_frames.dropped + detected_frames.dropped
+                    print(f"📡 Streaming... (frames: {frame_count}, face detected: {face_percentage:.1f}%, avg faces: {avg_faces:.1f}, dropped: {dropped})")
+                    print(f"⏱️  {format_stage_report(self.stage_stats.values())}")
+                    print(f"🎥 Capture: {self.capture_scheduler.summary()}")
+                    if self.quality_controller:
+                        print(f"🎚️  {self.quality_controller.describe()}")
+                    if self.fanout:
+                        print(self.fanout.describe())
             
         except KeyboardInterrupt:
             print("\n\n⚠️  Streaming dihentikan oleh user")
         except Exception as e:
             print(f"❌ Error saat streaming: {e}")
         finally:
+            stop_event.set()
+            captured_frames.close()
+            detected_frames.close()
+            capture_thread.join(timeout=1.0)
+            inference_thread.join(timeout=1.0)
             cap.release()
-            if self.udp_socket:
-                self.udp_socket.close()
+            self.close_udp()
             print("🔌 Camera dan UDP socket closed")
+            if frame_count:
+                print(f"⏱️  {format_stage_report(self.stage_stats.values())}")
         
         return True
     
+    def stream_detected_frame(self, frame, annotations, faces, capture_time=None):
+        """
+        Send stage of stream_video for one frame: face metadata first (the
+        login decision does not wait for the JPEG), then the video frame with
+        the face boxes drawn in, only when somebody receives it.
+        
+        Args:
+            frame: BGR frame the faces were detected in (drawn on in place)
+            annotations: FrameAnnotations from detect_faces
+            faces: Face list from detect_faces
+            capture_time: time.monotonic() when the frame was captured
+        """
+        frame_sequence = self.sequence_number
+        self.send_face_metadata(faces, capture_time)
+        
+        if self.send_udp and self.frame_sender is not None and self.has_receivers():
+            try:
+                with self.stage_stats['encode'].measure():
+                    if self.annotate_video:
+                        frame = annotations.draw(frame)
+                    jpeg_buffer = self.encode_frame(frame)
+                if jpeg_buffer is not None:
+                    with self.stage_stats['send'].measure():
+                        self.send_jpeg_udp(jpeg_buffer)
+            except Exception as e:
+                print(f"❌ Error sending frame via UDP: {e}")
+        if self.sequence_number == frame_sequence:
+            # Frame not sent: keep metadata sequence numbers unique
+            self.sequence_number = (self.sequence_number + 1) % 65536
+    
+    def _capture_loop(self, cap, pool, out_queue, stop_event):
+        """Capture stage: read frames as the source delivers them (at most --fps)"""
+        try:
+            scheduler = self.capture_scheduler
+            # Views are only computed by the inference thread, one frame at a time
+            buffers = FrameBuffers()
+            frame_count = 0
+            while not stop_event.is_set():
+                start = time.perf_counter()
+                ret, frame = pool.read(cap, scheduler)
+                if not ret:
+                    print("❌ Error: Tidak dapat membaca frame dari kamera")
+                    break
+                self.stage_stats['capture'].record(time.perf_counter() - start)
+                frame_count += 1
+                out_queue.put(Frame(frame, frame_count, time.monotonic(), buffers))
+        finally:
+            stop_event.set()
+            out_queue.close()
+    
+    def _inference_loop(self, in_queue, out_queue, stop_event):
+        """Inference stage: run face detection on the newest captured frame"""
+        try:
+            while not stop_event.is_set():
+                item = in_queue.get(timeout=0.5)
+                if item is None:
+                    if in_queue.closed:
+                        break
+                    continue
+                with self.stage_stats['inference'].measure():
+                    has_face, annotations, faces = self.detect_faces(item)
+                out_queue.put((has_face, item.bgr, annotations, faces, item.timestamp))
+        except Exception as e:
+            print(f"❌ Error saat deteksi wajah: {e}")
+        finally:
+            out_queue.close()
+    
     def run(self):
         """Run the video streaming system - just stream, don't handle login"""
         try:
@@ -251,8 +454,8 @@ class FaceLoginSystem:
         except Exception as e:
             print(f"❌ Error tidak terduga: {e}")
         finally:
-            if self.udp_socket:
-                self.udp_socket.close()
+            if self.udp_socket or self.fanout:
+                self.close_udp()
                 print("🔌 UDP socket closed")
 
 # Main entry point
@@ -263,12 +466,37 @@ if __name__ == "__main__":
     parser.add_argument('--no-udp', action='store_true', help='Disable UDP streaming')
     parser.add_argument('--host', type=str, default='127.0.0.1', help='UDP host (default: 127.0.0.1)')
     parser.add_argument('--port', type=int, default=5000, help='UDP port (default: 5000)')
+    parser.add_argument('--serve', type=int, metavar='PORT', nargs='?', const=8888,
+                        help='Serve every client that registers on PORT (default 8888) instead of --host/--port')
+    parser.add_argument('--fec', action='store_true',
+                        help='Add an XOR parity packet per frame so one lost packet does not drop the frame')
+    parser.add_argument('--clean-video', action='store_true',
+                        help='Stream frames without the drawn face boxes (receivers use the face metadata)')
+    parser.add_argument('--max-bitrate', type=float, default=40.0,
+                        help='Video bitrate limit in Mbit/s, 0 = unlimited (default: 40)')
+    parser.add_argument('--no-adaptive', action='store_true', help='Use fixed JPEG quality and full resolution')
+    parser.add_argument('--target-bitrate', type=float, default=12.0,
+                        help='Adaptive quality target bitrate in Mbit/s (default: 12)')
+    parser.add_argument('--target-fragments', type=int, default=1,
+                        help='Adaptive quality target datagrams per frame (default: 1)')
+    parser.add_argument('--encoder', choices=['auto', 'turbojpeg', 'opencv'], default='auto',
+                        help='JPEG encoder backend (default: auto = TurboJPEG if installed)')
+    add_source_arguments(parser)
     
     args = parser.parse_args()
     
     login_system = FaceLoginSystem(
         send_udp=not args.no_udp,
         udp_host=args.host,
-        udp_port=args.port
+        udp_port=args.port,
+        max_bitrate=int(args.max_bitrate * 1_000_000),
+        adaptive_quality=not args.no_adaptive,
+        target_bitrate=int(args.target_bitrate * 1_000_000),
+        target_fragments=args.target_fragments,
+        encoder=args.encoder,
+        source=open_source_from_args(args),
+        serve_port=args.serve,
+        fec=args.fec,
+        annotate_video=not args.clean_video
     )
     login_system.run()
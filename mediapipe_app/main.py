@@ -5,12 +5,39 @@ import os
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+from src.combined_detection import CombinedDetector, FaceLoginGate
+from src.face_detection import FaceDetector
 from src.hand_tracking import HandTracker
+from src.frame_source import add_source_arguments, open_source_from_args
 
 class MediaPipeApp:
-    def __init__(self):
-        """Initialize MediaPipe Application"""
-        self.hand_tracker = HandTracker()
+    def __init__(self, inference_interval=1, motion_threshold=None, roi_tracking=False,
+                 gesture_config=None, stream_landmarks=False, source=None, inference_workers=0,
+                 show_preview=True, face_login=False, deadline=None):
+        """
+        Initialize MediaPipe Application
+        
+        Args:
+            inference_interval: Run hand inference every N frames (1 = every frame, 0 = on motion only)
+            motion_threshold: Force inference when frame motion exceeds this value
+            roi_tracking: Run hand inference on a crop around the previous hands
+            gesture_config: Gesture mapping file (default: config/gestures.json)
+            stream_landmarks: Stream per-frame hand poses for analog drone control
+            source: FrameSource or source spec (default: camera 0)
+            inference_workers: Run hand inference in this many worker processes (0 = off)
+            show_preview: Show the annotated preview window (False = headless)
+            face_login: Only accept gestures while a face is logged in (face and
+                hand detection run concurrently on every frame)
+            deadline: Seconds a frame waits for both graphs with face_login (None = always wait)
+        """
+        self.hand_tracker = HandTracker(inference_interval, motion_threshold, roi_tracking,
+                                        gesture_config, stream_landmarks,
+                                        inference_workers=inference_workers)
+        self.face_login = None
+        if face_login:
+            self.face_login = FaceLoginGate(CombinedDetector(FaceDetector(), self.hand_tracker, deadline))
+        self.source = source
+        self.show_preview = show_preview
         
     def run(self):
         """Run the main application - directly start hand gesture control"""
@@ -24,12 +51,14 @@ class MediaPipeApp:
             print("   - BAWAH: Gerakkan tangan ke bawah layar")
             print("   - KIRI: Gerakkan tangan ke kiri layar")
             print("   - KANAN: Gerakkan tangan ke kanan layar")
+            if self.face_login:
+                print("🔐 Tunjukkan wajah Anda untuk login sebelum kontrol tangan aktif")
             print("Tekan 'q' untuk keluar")
             print("=" * 50)
             print()
             
             # Langsung jalankan gesture control
-            self.hand_tracker.gesture_control_system()
+            self.hand_tracker.gesture_control_system(self.source, self.show_preview, self.face_login)
             
         except KeyboardInterrupt:
             print("\n\n⚠️  Aplikasi dihentikan oleh user.")
@@ -38,5 +67,39 @@ class MediaPipeApp:
 
 # Main entry point
 if __name__ == "__main__":
-    app = MediaPipeApp()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Hand Gesture Control')
+    parser.add_argument('--infer-every', type=int, default=None,
+                        help='Run hand inference every N frames, extrapolating in between; 0 = only on motion '
+                             '(default: 1, or 0 with --motion-threshold)')
+    parser.add_argument('--motion-threshold', type=float, default=None,
+                        help='Run inference when mean frame motion (0-255) exceeds this value')
+    parser.add_argument('--roi', action='store_true',
+                        help='Run hand inference on a crop around the previous hand positions')
+    parser.add_argument('--gestures', type=str, default=None,
+                        help='Gesture mapping file (default: $GESTURE_CONFIG or config/gestures.json)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Also stream hand poses every frame for analog drone control')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Run hand inference in N worker processes, 0 = in-process (default: 0)')
+    parser.add_argument('--headless', action='store_true',
+                        help='No preview window: only send gestures, skip all drawing')
+    parser.add_argument('--face-login', action='store_true',
+                        help='Only accept gestures while a face is logged in (face and hand detection per frame)')
+    parser.add_argument('--deadline', type=float, default=None,
+                        help='With --face-login: ms a frame waits for both graphs, a late graph skips frames '
+                             '(default: always wait)')
+    add_source_arguments(parser)
+    
+    args = parser.parse_args()
+    if args.face_login and args.workers:
+        parser.error('--face-login runs the hand graph in-process, it cannot be combined with --workers')
+    deadline = args.deadline / 1000 if args.deadline is not None else None
+    if args.infer_every is None:
+        args.infer_every = 0 if args.motion_threshold is not None else 1
+    
+    app = MediaPipeApp(args.infer_every, args.motion_threshold, args.roi, args.gestures, args.stream,
+                       open_source_from_args(args), args.workers, not args.headless,
+                       args.face_login, deadline)
     app.run()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import sys
+import os
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.frame_source import add_source_arguments, open_source_from_args
+from src.inference_pool import TASKS
+from src.multi_camera import MultiCameraRunner
+
+# Main entry point
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Hand gesture / face detection for several cameras in one process')
+    parser.add_argument('--task', choices=TASKS, default='hands', help='Graph run per camera (default: hands)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Inference worker processes (default: one per camera, up to the CPU count)')
+    parser.add_argument('--host', type=str, default=os.getenv('GESTURE_UDP_HOST', '127.0.0.1'),
+                        help='Godot host (default: $GESTURE_UDP_HOST or 127.0.0.1)')
+    parser.add_argument('--gesture-port', type=int, default=int(os.getenv('GESTURE_UDP_PORT', '9999')),
+                        help='Gesture / landmark port (default: $GESTURE_UDP_PORT or 9999)')
+    parser.add_argument('--video-port', type=int, default=5000, help='Video port (default: 5000)')
+    parser.add_argument('--no-video', action='store_true', help='Do not encode and send video frames')
+    parser.add_argument('--quality', type=int, default=80, help='JPEG quality 0-100 (default: 80)')
+    parser.add_argument('--encoder', choices=['auto', 'turbojpeg', 'opencv'], default='auto',
+                        help='JPEG encoder backend (default: auto)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Also stream hand poses every frame for analog drone control')
+    parser.add_argument('--infer-every', type=int, default=1,
+                        help='Run hand inference every N frames, extrapolating in between (default: 1)')
+    parser.add_argument('--roi', action='store_true',
+                        help='Run hand inference on a crop around the previous hand positions')
+    parser.add_argument('--gestures', type=str, default=None,
+                        help='Gesture mapping file (default: $GESTURE_CONFIG or config/gestures.json)')
+    add_source_arguments(parser, multiple=True)
+    parser.add_argument('--duration', type=float, default=0, help='Stop after N seconds (default: run until done)')
+
+    args = parser.parse_args()
+
+    runner = MultiCameraRunner(
+        open_source_from_args(args), task=args.task, workers=args.workers, udp_host=args.host,
+        gesture_port=args.gesture_port, video_port=args.video_port, send_video=not args.no_video,
+        stream_landmarks=args.stream,
+        worker_options={
+            'inference_interval': args.infer_every,
+            'roi_tracking': args.roi,
+            'gesture_config': args.gestures,
+            'jpeg_quality': args.quality,
+            'encoder': args.encoder,
+        })
+    print("=" * 50)
+    print(f"   MULTI CAMERA ({len(args.source)} kamera, {runner.worker_count} worker)")
+    print("=" * 50)
+    print("Tekan Ctrl+C untuk keluar")
+    sys.exit(0 if runner.run(args.duration) else 1)
@@ -0,0 +1,149 @@
+import cv2
+import numpy as np
+
+
+class AdaptiveQualityController:
+    def __init__(self, target_bitrate=12_000_000, target_fps=30, target_fragments=1,
+                 max_payload=60000, initial_quality=80, min_quality=40, max_quality=90,
+                 quality_step=5, scales=(1.0, 0.75, 0.5), hold_frames=10, raise_after=30):
+        """
+        Adapts JPEG quality and downscale factor to the measured stream.
+
+        Every frame has a byte budget: the smaller of what the target bitrate
+        allows per frame and what fits in `target_fragments` datagrams. When
+        encoded frames (or their send time) exceed the budget the quality is
+        lowered, and once quality is at its floor the frame is downscaled.
+        When frames stay well under budget the controller climbs back up.
+        Fewer fragments per frame means fewer frames lost on the Godot side,
+        where losing one fragment drops the whole frame.
+
+        Args:
+            target_bitrate: Target video bitrate in bits per second
+            target_fps: Expected frame rate, used to derive the per-frame budget
+            target_fragments: Desired maximum number of datagrams per frame
+            max_payload: JPEG bytes per datagram
+            initial_quality: Starting JPEG quality
+            min_quality: Lowest JPEG quality before downscaling kicks in
+            max_quality: Highest JPEG quality used
+            quality_step: Quality change per adjustment
+            scales: Downscale factors from full resolution to smallest
+            hold_frames: Frames to wait after a change before adjusting again
+            raise_after: Consecutive under-budget frames before raising quality
+        """
+        self.target_bitrate = target_bitrate
+        self.target_fps = target_fps
+        self.target_fragments = target_fragments
+        self.max_payload = max_payload
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.quality_step = quality_step
+        self.scales = tuple(scales)
+        self.hold_frames = hold_frames
+        self.raise_after = raise_after
+
+        self.quality = max(min_quality, min(max_quality, initial_quality))
+        self.scale_index = 0
+
+        self.avg_frame_size = None
+        self.avg_send_time = 0.0
+        self._smoothing = 0.3
+        self._hold = 0
+        self._under_budget_frames = 0
+        self._scaled = None  # downscale output, reused while the size stays the same
+
+    @property
+    def scale(self):
+        return self.scales[self.scale_index]
+
+    @property
+    def frame_budget(self):
+        """Byte budget for one encoded frame"""
+        fragment_budget = self.target_fragments * self.max_payload
+        if not self.target_bitrate or not self.target_fps:
+            return fragment_budget
+        return min(fragment_budget, self.target_bitrate / 8.0 / self.target_fps)
+
+    @property
+    def send_budget(self):
+        """Seconds one frame may spend in the sender before it counts as congestion"""
+        return 0.5 / self.target_fps if self.target_fps else float('inf')
+
+    def prepare(self, frame):
+        """
+        Downscale frame according to the current scale factor.
+        The result is only valid until the next call.
+        """
+        if self.scale >= 1.0:
+            return frame
+        h, w = frame.shape[:2]
+        size = (max(1, int(w * self.scale)), max(1, int(h * self.scale)))
+        shape = (size[1], size[0]) + frame.shape[2:]
+        if self._scaled is None or self._scaled.shape != shape:
+            self._scaled = np.empty(shape, dtype=frame.dtype)
+        return cv2.resize(frame, size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+
+    def update(self, encoded_size, send_time=0.0):
+        """
+        Feed back the result of one frame and adjust quality/scale.
+
+        Args:
+            encoded_size: Size of the encoded frame in bytes
+            send_time: Seconds spent sending the frame
+        """
+        a = self._smoothing
+        if self.avg_frame_size is None:
+            self.avg_frame_size = float(encoded_size)
+            self.avg_send_time = send_time
+        else:
+            self.avg_frame_size += a * (encoded_size - self.avg_frame_size)
+            self.avg_send_time += a * (send_time - self.avg_send_time)
+
+        if self._hold > 0:
+            self._hold -= 1
+            return
+
+        budget = self.frame_budget
+        over_budget = (encoded_size > self.target_fragments * self.max_payload
+                       or self.avg_frame_size > budget
+                       or self.avg_send_time > self.send_budget)
+
+        if over_budget:
+            self._under_budget_frames = 0
+            # Far over budget: take a bigger step so the stream recovers quickly
+            self._step_down(2 if self.avg_frame_size > budget * 1.5 else 1)
+        elif self.avg_frame_size < budget * 0.6:
+            self._under_budget_frames += 1
+            if self._under_budget_frames >= self.raise_after:
+                self._under_budget_frames = 0
+                self._step_up()
+        else:
+            self._under_budget_frames = 0
+
+    def _step_down(self, steps=1):
+        if self.quality > self.min_quality:
+            self.quality = max(self.min_quality, self.quality - steps * self.quality_step)
+        elif self.scale_index < len(self.scales) - 1:
+            self.scale_index += 1
+            # Smaller frames leave room for better quality again
+            self.quality = (self.min_quality + self.max_quality) // 2
+        else:
+            return
+        self._changed()
+
+    def _step_up(self):
+        if self.quality < self.max_quality:
+            self.quality = min(self.max_quality, self.quality + self.quality_step)
+        elif self.scale_index > 0:
+            self.scale_index -= 1
+            self.quality = self.min_quality
+        else:
+            return
+        self._changed()
+
+    def _changed(self):
+        self._hold = self.hold_frames
+        # Measurements taken at the old settings no longer apply
+        self.avg_frame_size = None
+
+    def describe(self):
+        return f"q={self.quality} scale={self.scale:.2f} avg={(self.avg_frame_size or 0) / 1024:.1f}KB"
@@ -0,0 +1,93 @@
+import cv2
+import mediapipe as mp
+
+# Colors (BGR)
+GREEN = (0, 255, 0)
+RED = (0, 0, 255)
+YELLOW = (0, 255, 255)
+CYAN = (255, 255, 0)
+WHITE = (255, 255, 255)
+GRAY = (200, 200, 200)
+
+
+class FrameAnnotations:
+    def __init__(self):
+        """
+        Overlay for one frame, kept apart from the pixels.
+
+        Detectors describe what they found as a list of drawing commands
+        (text, lines, boxes, MediaPipe detections and hand landmarks) and
+        return the frame untouched. Only sinks that show the frame to a person
+        (preview window, GUI, video stream) call draw(); headless runs never
+        pay for rendering, and one clean frame can be drawn with different
+        overlays by different consumers.
+        """
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def text(self, text, position, color=WHITE, scale=0.6, thickness=2):
+        """Text at pixel position (x, y) of the text baseline"""
+        self.items.append(('text', text, position, color, scale, thickness))
+        return self
+
+    def line(self, start, end, color=GRAY, thickness=1):
+        """Line between pixel positions"""
+        self.items.append(('line', start, end, color, thickness))
+        return self
+
+    def box(self, box, color=GREEN, thickness=2):
+        """Rectangle (xmin, ymin, width, height) relative to the frame size"""
+        self.items.append(('box', box, color, thickness))
+        return self
+
+    def detection(self, detection):
+        """MediaPipe face detection (box and key points)"""
+        self.items.append(('detection', detection))
+        return self
+
+    def hand_landmarks(self, landmarks):
+        """MediaPipe hand landmarks with their connections"""
+        self.items.append(('hand', landmarks))
+        return self
+
+    def extend(self, other):
+        """Append the commands of another FrameAnnotations"""
+        self.items.extend(other.items)
+        return self
+
+    def draw(self, frame, copy=False):
+        """
+        Render the overlay.
+
+        Args:
+            frame: BGR frame the annotations were made for
+            copy: Draw on a copy and leave frame clean (always done for
+                read-only frames, e.g. shared memory views)
+        Returns: the annotated frame
+        """
+        if copy or not frame.flags.writeable:
+            frame = frame.copy()
+        height, width = frame.shape[:2]
+        for item in self.items:
+            kind = item[0]
+            if kind == 'text':
+                _, text, position, color, scale, thickness = item
+                cv2.putText(frame, text, position, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+            elif kind == 'line':
+                _, start, end, color, thickness = item
+                cv2.line(frame, start, end, color, thickness)
+            elif kind == 'box':
+                _, (xmin, ymin, box_width, box_height), color, thickness = item
+                top_left = (int(xmin * width), int(ymin * height))
+                bottom_right = (int((xmin + box_width) * width), int((ymin + box_height) * height))
+                cv2.rectangle(frame, top_left, bottom_right, color, thickness)
+            elif kind == 'detection':
+                mp.solutions.drawing_utils.draw_detection(frame, item[1])
+            elif kind == 'hand':
+                mp.solutions.drawing_utils.draw_landmarks(frame, item[1], mp.solutions.hands.HAND_CONNECTIONS)
+        return frame
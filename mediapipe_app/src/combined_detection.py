@@ -0,0 +1,215 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+
+from annotations import FrameAnnotations, GREEN, RED
+from frame import Frame, FrameBuffers, as_frame
+from inference_pool import PoolResults
+from pipeline import StageStats
+
+
+class CombinedResult:
+    def __init__(self, frame):
+        """
+        Face and hand results of one frame.
+
+        A graph that missed the frame's deadline (or was still busy with an
+        earlier frame) has no result: has_face / hand_results stay None and
+        its name is listed in missed.
+
+        Args:
+            frame: The Frame both graphs were given
+        """
+        self.frame = frame
+        self.has_face = None
+        self.hand_results = None
+        self.annotations = FrameAnnotations()
+        self.missed = []
+        self.latency = {}  # graph name -> seconds spent in the graph
+
+    @property
+    def complete(self):
+        return not self.missed
+
+
+class _Slot:
+    def __init__(self):
+        """Frame copy handed to the graphs, reused once every graph is done with it"""
+        self.buffers = FrameBuffers()
+        self.futures = []
+
+    @property
+    def free(self):
+        return all(future.done() for future in self.futures)
+
+
+class CombinedDetector:
+    def __init__(self, face_detector=None, hand_tracker=None, deadline=None):
+        """
+        Face and hand detection on the same frame, run concurrently.
+
+        Both graphs get one shared Frame (a single RGB conversion) and run on
+        their own worker thread; MediaPipe's process() releases the GIL, so a
+        frame costs max(face, hand) instead of face + hand. Each graph has
+        exactly one thread, so a graph never sees two frames at once and its
+        timestamps stay in order.
+
+        With a deadline, detect() returns once it has passed even if a graph
+        is still running. That graph finishes the old frame in the background
+        (its result is dropped) and skips the frames that arrive meanwhile.
+        The graphs read a copy of the frame owned by the detector, so a late
+        graph is not affected by the capture loop reusing its buffers.
+
+        Args:
+            face_detector: FaceDetector (default: a new one)
+            hand_tracker: HandTracker (default: a new one)
+            deadline: Seconds detect() waits for both graphs (None = always wait)
+        """
+        if face_detector is None:
+            from face_detection import FaceDetector
+            face_detector = FaceDetector()
+        if hand_tracker is None:
+            from hand_tracking import HandTracker
+            hand_tracker = HandTracker()
+        self.face_detector = face_detector
+        self.hand_tracker = hand_tracker
+        self.deadline = deadline
+        self._graphs = {
+            'face': (face_detector.detect_face, ThreadPoolExecutor(1, thread_name_prefix='face-graph')),
+            'hands': (hand_tracker.detect_hands, ThreadPoolExecutor(1, thread_name_prefix='hand-graph')),
+        }
+        self._pending = {name: None for name in self._graphs}
+        self._slots = [_Slot()]
+        self.stats = {name: StageStats(name) for name in self._graphs}
+        self.stats['combined'] = StageStats('combined')
+        self.missed = {name: 0 for name in self._graphs}
+
+    def _free_slot(self):
+        for slot in self._slots:
+            if slot.free:
+                return slot
+        # A late graph still reads every other slot
+        slot = _Slot()
+        self._slots.append(slot)
+        return slot
+
+    def _run(self, name, detect, frame):
+        start = time.perf_counter()
+        output = detect(frame)
+        duration = time.perf_counter() - start
+        self.stats[name].record(duration)
+        return output, duration
+
+    def detect(self, frame):
+        """
+        Detect faces and hands in frame (BGR array or Frame)
+        Returns: CombinedResult with the merged annotations of both graphs
+        """
+        start = time.perf_counter()
+        frame = as_frame(frame)
+        slot = self._free_slot()
+        bgr = slot.buffers.get('snapshot', frame.shape)
+        np.copyto(bgr, frame.bgr)
+        shared = Frame(bgr, frame.seq, frame.timestamp, slot.buffers)
+        shared.rgb  # Converted once here, before both threads read it
+
+        result = CombinedResult(shared)
+        futures = {}
+        for name, (detect, executor) in self._graphs.items():
+            pending = self._pending[name]
+            if pending is not None and not pending.done():
+                result.missed.append(name)
+                continue
+            futures[name] = self._pending[name] = executor.submit(self._run, name, detect, shared)
+        slot.futures = list(futures.values())
+
+        wait(slot.futures, timeout=self.deadline)
+        for name, future in futures.items():
+            if not future.done():
+                result.missed.append(name)
+                continue
+            output, result.latency[name] = future.result()
+            if name == 'face':
+                result.has_face, annotations = output
+            else:
+                result.hand_results, annotations = output
+            result.annotations.extend(annotations)
+        for name in result.missed:
+            self.missed[name] += 1
+        self.stats['combined'].record(time.perf_counter() - start)
+        return result
+
+    def summary(self):
+        """One line with the graph timings and missed frames"""
+        missed = ', '.join(f"{name} {count}" for name, count in self.missed.items())
+        return ' | '.join(stats.summary() for stats in self.stats.values()) + f" | missed: {missed}"
+
+    def close(self):
+        """Wait for running graphs and stop the worker threads"""
+        for _, executor in self._graphs.values():
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+class FaceLoginGate:
+    def __init__(self, detector, login_frames=30, logout_frames=90):
+        """
+        Login-then-control flow on a CombinedDetector: hand gestures only
+        count while a face is logged in.
+
+        A face seen on login_frames frames in a row logs in; no face for
+        logout_frames frames in a row logs out again. A frame the face graph
+        missed (deadline) leaves the counters alone.
+
+        Args:
+            detector: CombinedDetector running face and hand detection
+            login_frames: Consecutive face frames needed to log in
+            logout_frames: Consecutive frames without a face before logging out
+        """
+        self.detector = detector
+        self.login_frames = login_frames
+        self.logout_frames = logout_frames
+        self.logged_in = False
+        self.logins = 0
+        self._streak = 0  # frames in a row that argue for switching state
+
+    def update(self, has_face):
+        """
+        Feed the face result of one frame (None = no result)
+        Returns: True while logged in
+        """
+        if has_face is None:
+            return self.logged_in
+        if has_face != self.logged_in:
+            self._streak += 1
+            if self._streak >= (self.logout_frames if self.logged_in else self.login_frames):
+                self.logged_in = has_face
+                self._streak = 0
+                if has_face:
+                    self.logins += 1
+                print("🔓 Login berhasil - kontrol tangan aktif" if has_face else
+                      "🔒 Wajah hilang - kontrol tangan dikunci")
+        else:
+            self._streak = 0
+        return self.logged_in
+
+    def detect_hands(self, frame):
+        """
+        Face and hand detection on one frame, gated by the login state.
+        Same signature as HandTracker.detect_hands, so the control loop can
+        use it in its place.
+
+        Returns: (hand results, annotations); the results hold no hands while
+            logged out or when the hand graph missed the frame
+        """
+        result = self.detector.detect(frame)
+        logged_in = self.update(result.has_face)
+        if not logged_in and result.has_face is not None:
+            status = f"LOGIN: wajah {self._streak}/{self.login_frames}" if result.has_face else "LOGIN: tunjukkan wajah"
+            result.annotations.text(status, (10, 65), GREEN if result.has_face else RED, 0.8)
+        if logged_in and result.hand_results is not None:
+            return result.hand_results, result.annotations
+        return PoolResults(), result.annotations
+
+    def close(self):
+        self.detector.close()
@@ -2,40 +2,77 @@ import cv2
 import mediapipe as mp
 import time
 
+from frame_source import add_source_arguments, open_source, open_source_from_args
+from inference_pool import InferencePool
+from frame_scheduler import scheduler_for_source
+from annotations import FrameAnnotations, GREEN, RED
+from frame import Frame, FrameBuffers, FramePool, as_frame, frame_array
+
 class FaceDetector:
-    def __init__(self):
-        """Initialize MediaPipe Face Detection"""
+    def __init__(self, inference_workers=0):
+        """
+        Initialize MediaPipe Face Detection
+        
+        Args:
+            inference_workers: Run the face graph in this many worker processes
+                (0 = in this process); login_system then pipelines frames
+                through the pool. Call close() to stop the workers.
+        """
         self.mp_face_detection = mp.solutions.face_detection
-        self.mp_drawing = mp.solutions.drawing_utils
         self.face_detection = self.mp_face_detection.FaceDetection(
             model_selection=0, min_detection_confidence=0.5)
+        self.inference_pool = None
+        if inference_workers:
+            self.inference_pool = InferencePool('faces', inference_workers)
         
     def detect_face(self, frame):
         """
-        Detect face in frame
-        Returns: (has_face, processed_frame)
+        Detect face in frame (BGR array or Frame; a Frame's cached RGB view is reused)
+        Returns: (has_face, annotations) - the frame itself is not modified
         """
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.face_detection.process(as_frame(frame).rgb)
         
-        # Process the frame
-        results = self.face_detection.process(rgb_frame)
-        
-        has_face = False
-        if results.detections:
-            has_face = True
-            # Draw detection annotations on the image
-            for detection in results.detections:
-                self.mp_drawing.draw_detection(frame, detection)
-                
-        return has_face, frame
+        return bool(results.detections), self.face_annotations(results)
+    
+    def face_annotations(self, results):
+        """Face detections of results as FrameAnnotations"""
+        annotations = FrameAnnotations()
+        for detection in results.detections or ():
+            annotations.detection(detection)
+        return annotations
     
-    def login_system(self):
+    def detect_face_pipelined(self, frame):
+        """
+        Submit a frame to the inference pool and collect the frames that are done
+        Returns: list of (has_face, frame, annotations) in capture order
+        """
+        frame = frame_array(frame)
+        return [(bool(results.detections), done_frame, self.face_annotations(results))
+                for results, done_frame in self.inference_pool.pipeline(frame, frame)]
+    
+    def drain_pipelined(self):
+        """
+        Wait for the frames still in the inference pool
+        Returns: list of (has_face, frame, annotations) in capture order
+        """
+        return [(bool(results.detections), done_frame, self.face_annotations(results))
+                for results, done_frame in self.inference_pool.drain()]
+    
+    def close(self):
+        """Stop the inference pool workers (if any)"""
+        if self.inference_pool:
+            self.inference_pool.close()
+            self.inference_pool = None
+    
+    def login_system(self, source=None):
         """
         Face detection login system
         Returns True if login successful, False otherwise
+        
+        Args:
+            source: FrameSource or source spec (default: camera 0)
         """
-        cap = cv2.VideoCapture(0)
+        cap = open_source(source)
         
         if not cap.isOpened():
             print("Error: Tidak dapat mengakses kamera")
@@ -45,52 +82,79 @@ class FaceDetector:
         print("Posisikan wajah Anda di depan kamera...")
         print("Tekan 'q' untuk keluar")
         
-        login_success = False
-        face_detected_time = 0
-        required_detection_time = 2  # 2 detik deteksi wajah untuk login sukses
+        self.face_detected_time = 0
+        scheduler = scheduler_for_source(cap)
+        # Pipelined frames stay in flight for up to one capture per worker
+        # (detect_face_pipelined returns once no more are pending), so the
+        # ring has room for those plus the one being read
+        pool = FramePool(self.inference_pool.workers + 2 if self.inference_pool else 1)
+        buffers = FrameBuffers()
         
-        while True:
-            ret, frame = cap.read()
+        login_success = None
+        while login_success is None:
+            ret, frame = pool.read(cap, scheduler)
             if not ret:
                 print("Error: Tidak dapat membaca frame dari kamera")
-                break
-                
-            # Detect face
-            has_face, processed_frame = self.detect_face(frame)
-            
-            # Login logic
-            if has_face:
-                face_detected_time += 1
-                cv2.putText(processed_frame, f"Wajah Terdeteksi! {face_detected_time}/60", 
-                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                
-                # Login berhasil setelah 2 detik (60 frames pada 30 FPS)
-                if face_detected_time >= 60:
-                    cv2.putText(processed_frame, "LOGIN SUCCESS!", 
-                               (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                    cv2.imshow('Face Detection Login', processed_frame)
-                    cv2.waitKey(2000)  # Tampilkan pesan sukses selama 2 detik
-                    login_success = True
-                    break
+                # Frames still in the workers count towards the login too
+                detections = self.drain_pipelined() if self.inference_pool else []
+            elif self.inference_pool:
+                detections = self.detect_face_pipelined(frame)
             else:
-                face_detected_time = 0
-                cv2.putText(processed_frame, "Wajah tidak terdeteksi", 
-                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                has_face, annotations = self.detect_face(Frame(frame, buffers=buffers))
+                detections = [(has_face, frame, annotations)]
             
-            cv2.imshow('Face Detection Login', processed_frame)
-            
-            # Exit on 'q' key press
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            for detection in detections:
+                login_success = self._login_frame(*detection)
+                if login_success is not None:
+                    break
+            if not ret:
                 break
         
         cap.release()
         cv2.destroyAllWindows()
-        return login_success
+        return bool(login_success)
+    
+    def _login_frame(self, has_face, frame, annotations):
+        """
+        Count one processed frame towards the login and display it
+        Returns: True on login success, False when the user pressed 'q', None to go on
+        """
+        if has_face:
+            self.face_detected_time += 1
+            annotations.text(f"Wajah Terdeteksi! {self.face_detected_time}/60", (10, 30), GREEN, 1)
+            
+            # Login berhasil setelah 2 detik (60 frames pada 30 FPS)
+            if self.face_detected_time >= 60:
+                annotations.text("LOGIN SUCCESS!", (10, 80), GREEN, 1)
+                cv2.imshow('Face Detection Login', annotations.draw(frame))
+                cv2.waitKey(2000)  # Tampilkan pesan sukses selama 2 detik
+                return True
+        else:
+            self.face_detected_time = 0
+            annotations.text("Wajah tidak terdeteksi", (10, 30), RED, 1)
+        
+        cv2.imshow('Face Detection Login', annotations.draw(frame))
+        
+        # Exit on 'q' key press
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            return False
+        return None
 
 # Test function
 if __name__ == "__main__":
-    detector = FaceDetector()
-    result = detector.login_system()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Face detection login')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Run face inference in N worker processes (default: 0 = in this process)')
+    add_source_arguments(parser)
+    args = parser.parse_args()
+    
+    detector = FaceDetector(inference_workers=args.workers)
+    try:
+        result = detector.login_system(open_source_from_args(args))
+    finally:
+        detector.close()
     if result:
         print("✅ Login berhasil!")
     else:
@@ -0,0 +1,225 @@
+import socket
+import threading
+import time
+
+from udp_sender import FragmentedFrameSender
+
+# Control messages (UTF-8 datagrams) between Godot clients and the server
+MSG_REGISTER = b'REGISTER'
+MSG_REGISTERED = b'REGISTERED'
+MSG_HEARTBEAT = b'HEARTBEAT'
+MSG_UNREGISTER = b'UNREGISTER'
+MSG_SERVER_FULL = b'SERVER_FULL'
+MSG_SERVER_SHUTDOWN = b'SERVER_SHUTDOWN'
+
+
+class ClientSession:
+    def __init__(self, address, udp_socket, max_payload, bitrate, fec=False):
+        """
+        One registered client: its own fragment sender (rate limit and
+        delivery counters) on the server's shared socket. A client over its
+        bitrate budget has frames skipped; the sender never sleeps, so one
+        slow client cannot hold up the others or the capture loop.
+        """
+        self.address = address
+        self.sender = FragmentedFrameSender(udp_socket, address, max_payload=max_payload, bitrate=bitrate, fec=fec,
+                                            skip_over_budget=True)
+        self.registered_at = time.monotonic()
+        self.last_seen = self.registered_at
+        self.heartbeats = 0
+        self.send_errors = 0
+        self.consecutive_errors = 0
+
+    def summary(self):
+        host, port = self.address
+        age = time.monotonic() - self.registered_at
+        rate = self.sender.bytes_sent * 8 / age / 1_000_000 if age > 0 else 0.0
+        return (f"👤 {host}:{port} | frames {self.sender.frames_sent} | skipped {self.sender.frames_skipped} | "
+                f"packets {self.sender.packets_sent} | "
+                f"{rate:.1f} Mbit/s | errors {self.send_errors} | heartbeats {self.heartbeats}")
+
+
+class FanoutServer:
+    def __init__(self, port=8888, host='0.0.0.0', client_timeout=5.0, max_clients=16,
+                 max_payload=60000, bitrate=0, max_errors=30, fec=False):
+        """
+        UDP video server for several Godot clients (webcam_client_udp.gd).
+
+        Clients send REGISTER to the server port and get REGISTERED back, keep
+        the registration alive with HEARTBEAT (or a repeated REGISTER) and
+        leave with UNREGISTER. A client that stays silent for client_timeout
+        seconds is dropped. Each frame is encoded once by the caller and
+        send_frame() fans the same buffer out to every client, from the server
+        port, with the [seq][total][index] fragment protocol.
+
+        Args:
+            port: Control and video port clients register with
+            host: Interface to bind
+            client_timeout: Seconds without a message before a client expires
+            max_clients: Registrations beyond this get SERVER_FULL
+            max_payload: Maximum JPEG bytes per datagram
+            bitrate: Per-client bitrate limit in bits per second (0 = unlimited);
+                frames that would exceed it are skipped for that client
+            max_errors: Consecutive send errors before a client is dropped
+            fec: Add an XOR parity fragment to every frame (see udp_sender.FEC_FLAG)
+        """
+        self.port = port
+        self.host = host
+        self.client_timeout = client_timeout
+        self.max_clients = max_clients
+        self.max_payload = max_payload
+        self.bitrate = bitrate
+        self.max_errors = max_errors
+        self.fec = fec
+
+        self.udp_socket = None
+        self.clients = {}  # address -> ClientSession
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+        # Statistics
+        self.frames_sent = 0
+        self.clients_expired = 0
+
+    def start(self):
+        """Bind the server port and start handling registrations"""
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        self.udp_socket.bind((self.host, self.port))
+        self.udp_socket.settimeout(min(1.0, self.client_timeout / 2))
+        self._running = True
+        self._thread = threading.Thread(target=self._control_loop, daemon=True)
+        self._thread.start()
+        print(f"✅ Fan-out server listening on {self.host}:{self.port} "
+              f"(client timeout {self.client_timeout:g} s, max {self.max_clients} clients)")
+        return self
+
+    @property
+    def client_count(self):
+        return len(self.clients)
+
+    def _control_loop(self):
+        while self._running:
+            try:
+                data, address = self.udp_socket.recvfrom(1024)
+            except socket.timeout:
+                data = None
+            except OSError:
+                if not self._running:
+                    break
+                continue  # e.g. ICMP port unreachable reported by some platforms
+            if data:
+                self.handle_message(data.strip(), address)
+            self.expire_clients()
+
+    def handle_message(self, message, address):
+        """Apply one control message from a client"""
+        if message in (MSG_REGISTER, MSG_HEARTBEAT):
+            with self._lock:
+                client = self.clients.get(address)
+                new_client = client is None
+                if new_client:
+                    if len(self.clients) >= self.max_clients:
+                        self._reply(MSG_SERVER_FULL, address)
+                        print(f"⚠️ Client {address[0]}:{address[1]} rejected, server full")
+                        return
+                    # A heartbeat from an unknown client (server restarted) registers it again
+                    client = ClientSession(address, self.udp_socket, self.max_payload, self.bitrate, self.fec)
+                    self.clients[address] = client
+                    print(f"🔗 Client registered: {address[0]}:{address[1]} ({len(self.clients)} total)")
+                client.last_seen = time.monotonic()
+                if message == MSG_HEARTBEAT:
+                    client.heartbeats += 1
+            if message == MSG_REGISTER or new_client:
+                self._reply(MSG_REGISTERED, address)
+        elif message == MSG_UNREGISTER:
+            with self._lock:
+                client = self.clients.pop(address, None)
+            if client:
+                print(f"👋 Client unregistered: {address[0]}:{address[1]}")
+                print(client.summary())
+
+    def expire_clients(self):
+        """Drop clients that have been silent longer than client_timeout"""
+        deadline = time.monotonic() - self.client_timeout
+        with self._lock:
+            expired = [client for client in self.clients.values() if client.last_seen < deadline]
+            for client in expired:
+                del self.clients[client.address]
+        for client in expired:
+            self.clients_expired += 1
+            print(f"⌛ Client expired: {client.address[0]}:{client.address[1]}")
+
+    def _reply(self, message, address):
+        try:
+            self.udp_socket.sendto(message, address)
+        except OSError as e:
+            print(f"⚠️ Reply to {address[0]}:{address[1]} failed: {e}")
+
+    def send_frame(self, buffer, sequence_number):
+        """
+        Send one encoded frame to every registered client.
+
+        Args:
+            buffer: Encoded frame (bytes or contiguous uint8 array), shared by all clients
+            sequence_number: Frame sequence number for the fragment headers
+        Returns: number of clients the frame was sent to
+        """
+        with self._lock:
+            clients = list(self.clients.values())
+
+        delivered = 0
+        for client in clients:
+            try:
+                if not client.sender.send_frame(buffer, sequence_number):
+                    continue  # over this client's budget
+                client.consecutive_errors = 0
+                delivered += 1
+            except OSError:
+                client.send_errors += 1
+                client.consecutive_errors += 1
+                if client.consecutive_errors >= self.max_errors:
+                    with self._lock:
+                        self.clients.pop(client.address, None)
+                    print(f"❌ Client dropped after {client.consecutive_errors} send errors: "
+                          f"{client.address[0]}:{client.address[1]}")
+        if delivered:
+            self.frames_sent += 1
+        return delivered
+
+    def send_datagram(self, data):
+        """Send one small datagram (e.g. frame metadata) to every registered client"""
+        with self._lock:
+            clients = list(self.clients.values())
+        for client in clients:
+            try:
+                self.udp_socket.sendto(data, client.address)
+            except OSError:
+                client.send_errors += 1
+        return len(clients)
+
+    def describe(self):
+        """One line per client with its delivery statistics"""
+        with self._lock:
+            clients = list(self.clients.values())
+        if not clients:
+            return "👥 No clients registered"
+        return "\n".join([f"👥 {len(clients)} client(s), {self.frames_sent} frames fanned out"] +
+                         [client.summary() for client in clients])
+
+    def close(self):
+        """Tell every client the server is going away and release the port"""
+        self._running = False
+        with self._lock:
+            clients = list(self.clients.values())
+            self.clients.clear()
+        if self.udp_socket is None:
+            return
+        for client in clients:
+            self._reply(MSG_SERVER_SHUTDOWN, client.address)
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self.udp_socket.close()
+        self.udp_socket = None
@@ -0,0 +1,241 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameBuffers:
+    def __init__(self):
+        """
+        Arrays the views of one stream's frames are written into.
+
+        The RGB view of frame N goes into the same array as the RGB view of
+        frame N-1, so a stream allocates each kind of view once instead of
+        once per frame. A view therefore stays valid only until the next frame
+        of the stream computes the same view; whoever keeps it longer (another
+        thread, a queue of frames in flight) copies it or uses a Frame without
+        buffers.
+        """
+        self._arrays = {}
+
+    def get(self, key, shape):
+        """Reused uint8 array for view key with the given shape"""
+        array = self._arrays.get(key)
+        if array is None or array.shape != shape:
+            array = self._arrays[key] = np.empty(shape, dtype=np.uint8)
+        return array
+
+
+def _own_copy(frame, array):
+    """frame copied into array, or into a new array when array does not fit it"""
+    if array is None or array.shape != frame.shape or array.dtype != frame.dtype:
+        array = np.empty(frame.shape, dtype=frame.dtype)
+    np.copyto(array, frame)
+    return array
+
+
+class FramePool:
+    def __init__(self, count=2):
+        """
+        Ring of capture arrays in the camera's frame format.
+
+        read() has the capture decode into the next array of the ring instead
+        of allocating a new one per frame. The arrays are adopted from the
+        first frames the capture returns, so the pool needs no size up front
+        and follows a format change. A read-only view the source keeps
+        reusing (shared memory ring) is copied into the ring, so the loop
+        always owns its frame. A captured frame is overwritten count reads
+        later, so the ring suits loops that are done with a frame before they
+        read the next one (count 1); frames that wait in queues on other
+        threads need FrameFreeList.
+
+        Args:
+            count: Arrays in the ring
+        """
+        self.count = max(1, count)
+        self._arrays = [None] * self.count
+        self._index = 0
+        self.allocations = 0
+
+    def read(self, cap, scheduler=None):
+        """
+        Read the next frame into the ring
+
+        Args:
+            cap: cv2.VideoCapture or FrameSource
+            scheduler: FrameScheduler of the loop (None = plain cap.read())
+        Returns: (ret, frame) like cap.read()
+        """
+        array = self._arrays[self._index]
+        if scheduler is not None:
+            ret, frame = scheduler.read(cap, array)
+        else:
+            ret, frame = cap.read() if array is None else cap.read(array)
+        if ret and frame is not array:
+            if not frame.flags.writeable:
+                frame = _own_copy(frame, array)
+            # First round or a new format: a new array was allocated, keep it
+            if frame is not array:
+                self._arrays[self._index] = frame
+                self.allocations += 1
+        self._index = (self._index + 1) % self.count
+        return ret, frame
+
+
+class FrameFreeList:
+    def __init__(self, limit=6):
+        """
+        Capture arrays for pipelines that hand frames across threads.
+
+        Unlike FramePool's ring, an array is reused only after release():
+        read() decodes into a released array, lets the capture allocate a new
+        one while every array is still held (up to limit kept for reuse), and
+        past that reads into a one-off array that is not kept. A read-only view
+        the source keeps reusing (shared memory ring) is copied into a pool
+        array. A frame is therefore never overwritten while a later stage still
+        holds it; every stage that finishes or drops a frame releases it once.
+
+        Args:
+            limit: Most arrays kept for reuse
+        """
+        self.limit = max(1, limit)
+        self._owned = {}  # id -> array, so release() can tell pool arrays apart
+        self._free = []
+        self._lock = threading.Lock()
+        self.allocations = 0
+
+    def read(self, cap, scheduler=None):
+        """
+        Read the next frame into a free array
+
+        Args:
+            cap: cv2.VideoCapture or FrameSource
+            scheduler: FrameScheduler of the loop (None = plain cap.read())
+        Returns: (ret, frame) like cap.read(); release frame when done with it
+        """
+        with self._lock:
+            array = self._free.pop() if self._free else None
+        if scheduler is not None:
+            ret, frame = scheduler.read(cap, array)
+        else:
+            ret, frame = cap.read() if array is None else cap.read(array)
+        if ret and not frame.flags.writeable:
+            frame = _own_copy(frame, array)
+        with self._lock:
+            if frame is array:
+                return ret, frame
+            if not ret:
+                if array is not None:
+                    self._free.append(array)
+                return ret, frame
+            if array is not None:
+                # New format: the capture allocated, the old array is no use any more
+                del self._owned[id(array)]
+            self.allocations += 1
+            if len(self._owned) < self.limit:
+                self._owned[id(frame)] = frame
+        return ret, frame
+
+    def release(self, frame):
+        """Hand a frame read() returned back for reuse (other arrays are ignored)"""
+        with self._lock:
+            if self._owned.get(id(frame)) is frame:
+                self._free.append(frame)
+
+    @property
+    def in_use(self):
+        """Arrays kept for reuse that have not been released yet"""
+        with self._lock:
+            return len(self._owned) - len(self._free)
+
+
+class Frame:
+    def __init__(self, bgr, seq=0, timestamp=None, buffers=None):
+        """
+        One captured frame with lazily computed, cached views.
+
+        Detectors take the view they need (rgb for MediaPipe, gray or a small
+        scaled copy for motion checks); the first caller computes it and
+        everyone after that on the same frame gets the cached array, so face
+        and hand detection on one frame cost a single color conversion.
+
+        Args:
+            bgr: BGR image as captured (may be a read-only shared memory view)
+            seq: Frame sequence number of the stream
+            timestamp: time.monotonic() at capture (default: now)
+            buffers: FrameBuffers the views are written into (None = allocate
+                new arrays, safe to keep across frames)
+        """
+        self.bgr = bgr
+        self.seq = seq
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.buffers = buffers
+        self._views = {}
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    def _buffer(self, key, shape):
+        if self.buffers is None:
+            return np.empty(shape, dtype=np.uint8)
+        return self.buffers.get(key, shape)
+
+    def _view(self, key, compute):
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = compute()
+        return view
+
+    @property
+    def rgb(self):
+        """RGB copy for MediaPipe"""
+        return self._view('rgb', lambda: cv2.cvtColor(
+            self.bgr, cv2.COLOR_BGR2RGB, dst=self._buffer('rgb', self.bgr.shape)))
+
+    @property
+    def gray(self):
+        """Single channel grayscale"""
+        return self._view('gray', lambda: cv2.cvtColor(
+            self.bgr, cv2.COLOR_BGR2GRAY, dst=self._buffer('gray', self.bgr.shape[:2])))
+
+    def scaled(self, size, gray=False):
+        """
+        Downscaled view (INTER_AREA), e.g. a thumbnail for motion detection
+
+        Args:
+            size: (width, height)
+            gray: Grayscale instead of BGR (converted after scaling)
+        """
+        width, height = size
+        if gray:
+            return self._view(('gray', size), lambda: cv2.cvtColor(
+                self.scaled(size), cv2.COLOR_BGR2GRAY, dst=self._buffer(('gray', size), (height, width))))
+        return self._view(('bgr', size), lambda: cv2.resize(
+            self.bgr, size, dst=self._buffer(('bgr', size), (height, width, 3)), interpolation=cv2.INTER_AREA))
+
+    def mirrored(self):
+        """
+        Horizontally flipped frame with the same sequence number and timestamp.
+        The flip goes into a reused buffer; this frame's views must not be used
+        afterwards when they share the buffers.
+        """
+        bgr = cv2.flip(self.bgr, 1, dst=self._buffer('mirror', self.bgr.shape))
+        return Frame(bgr, self.seq, self.timestamp, self.buffers)
+
+
+# Checked against ndarray rather than Frame: entry scripts import this module
+# as src.frame and the src modules as frame, which are two different classes.
+def as_frame(frame, timestamp=None):
+    """Frame for a Frame or a plain BGR array (detectors accept both)"""
+    if isinstance(frame, np.ndarray):
+        return Frame(frame, timestamp=timestamp)
+    return frame
+
+
+def frame_array(frame):
+    """BGR array of a Frame or a plain BGR array"""
+    if isinstance(frame, np.ndarray):
+        return frame
+    return frame.bgr
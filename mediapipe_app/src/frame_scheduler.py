@@ -0,0 +1,178 @@
+import collections
+import math
+import time
+
+import cv2
+
+# A grab() that returns within this share of the source's frame period found
+# the frame already waiting in the driver buffer
+STALE_GRAB = 0.25
+# Longest time without a grab() that had to wait for the camera; after that
+# one extra frame is skipped to find out whether the backlog estimate drifted
+RESYNC_INTERVAL = 1.0
+
+
+class FrameScheduler:
+    def __init__(self, fps=30.0, pace=False, skip_stale=True, source_fps=None, max_stale=4, window=120):
+        """
+        Reads frames for a capture loop, keeping them fresh and optionally
+        holding the loop to a target frame rate.
+
+        Sources that pace themselves (camera, capture daemon ring, real-time
+        file) are read as soon as the loop is ready; sleeping first would only
+        let the frame age in the driver buffer. With pace, read() holds the
+        loop to fps: frames of a self-paced source that arrive before their
+        deadline are dropped (grabbed without decoding for a camera), and
+        sources that deliver on demand (--fast files, synthetic) are slept on
+        with monotonic deadlines.
+
+        A loop that falls behind a camera finds older frames queued in the
+        driver buffer. With skip_stale, read() estimates how many frames
+        arrived since the last read and grabs past all but the newest of them,
+        so the loop processes the latest frame instead of working through the
+        backlog, without waiting for the next one. A grab that has to wait
+        for the camera means the buffer was empty and resets the estimate;
+        when none did for RESYNC_INTERVAL, one extra frame is skipped to
+        resync. A frame that was read is never dropped.
+
+        Args:
+            fps: Target frame rate with pace, otherwise the nominal rate reported
+            pace: Hold the loop to fps (False = take frames as the source delivers them)
+            skip_stale: Skip frames queued in a camera's buffer (sources with buffered = True)
+            source_fps: The source's own frame rate (default: fps)
+            max_stale: Most frames skipped per read
+            window: Number of frame intervals the fps/jitter statistics cover
+        """
+        self.fps = fps or 30.0
+        self.period = 1.0 / self.fps
+        self.source_period = 1.0 / (source_fps or self.fps)
+        self.pace = pace
+        self.skip_stale = skip_stale
+        self.max_stale = max_stale
+        self.frames = 0
+        self.stale_frames = 0
+        self.throttled_frames = 0
+        self._backlog = 0.0  # estimated frames waiting in the camera buffer
+        self._last_read = None
+        self._synced = time.monotonic()
+        self._deadline = None
+        self._last_tick = None
+        self._intervals = collections.deque(maxlen=window)
+
+    def _tick(self):
+        """Count a frame handed to the loop and set the next deadline"""
+        now = time.monotonic()
+        if self._deadline is None or now - self._deadline > self.period:
+            # More than a frame behind: start a new schedule from here, no catch-up burst
+            self._deadline = now + self.period
+        else:
+            self._deadline += self.period
+        if self._last_tick is not None:
+            self._intervals.append(now - self._last_tick)
+        self._last_tick = now
+        self.frames += 1
+
+    def _early(self):
+        """True while the next frame is not due yet (a quarter period of slack)"""
+        return self._deadline is not None and time.monotonic() < self._deadline - self.period / 4
+
+    def wait(self):
+        """Sleep until the next deadline (only with pace), then count the frame"""
+        if self.pace and self._deadline is not None:
+            delay = self._deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self._tick()
+
+    def _grab_newest(self, cap):
+        """grab() past stale and early frames; returns False at the end of the stream"""
+        now = time.monotonic()
+        if self.skip_stale and self._last_read is not None:
+            self._backlog += (now - self._last_read) / self.source_period
+            if now - self._synced > RESYNC_INTERVAL:
+                self._backlog = max(self._backlog, 2.0)
+        skipped = -1
+        while True:
+            start = time.monotonic()
+            if not cap.grab():
+                return False
+            skipped += 1
+            if time.monotonic() - start >= self.source_period * STALE_GRAB:
+                # Had to wait for the camera: the buffer was empty, this frame is brand new
+                self._backlog = 0.0
+                self._synced = time.monotonic()
+                break
+            self._backlog = max(0.0, self._backlog - 1)
+            if not self.skip_stale or self._backlog < 1 or skipped >= self.max_stale:
+                break
+        self.stale_frames += skipped
+        while self.pace and self._early():
+            if not cap.grab():
+                return False
+            self.throttled_frames += 1
+        self._last_read = time.monotonic()
+        return True
+
+    def read(self, cap, image=None):
+        """
+        Next frame for the loop
+
+        Args:
+            cap: cv2.VideoCapture or FrameSource
+            image: Array to read the frame into (FramePool), None = let the capture allocate
+        Returns: (ret, frame)
+        """
+        if getattr(cap, 'buffered', False):
+            if not self._grab_newest(cap):
+                return False, None
+            ret, frame = cap.retrieve() if image is None else cap.retrieve(image)
+        else:
+            self_paced = getattr(cap, 'self_paced', True)
+            if self.pace and not self_paced and self._deadline is not None:
+                delay = self._deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            ret, frame = cap.read() if image is None else cap.read(image)
+            while ret and self.pace and self_paced and self._early():
+                self.throttled_frames += 1
+                ret, frame = cap.read() if image is None else cap.read(image)
+        if ret:
+            self._tick()
+        return ret, frame
+
+    @property
+    def achieved_fps(self):
+        """Frame rate over the statistics window"""
+        total = sum(self._intervals)
+        return len(self._intervals) / total if total > 0 else 0.0
+
+    @property
+    def jitter_ms(self):
+        """Standard deviation of the frame interval over the statistics window"""
+        count = len(self._intervals)
+        if count < 2:
+            return 0.0
+        mean = sum(self._intervals) / count
+        return math.sqrt(sum((i - mean) ** 2 for i in self._intervals) / count) * 1000
+
+    def summary(self):
+        text = (f"{self.achieved_fps:.1f}/{self.fps:g} FPS | jitter {self.jitter_ms:.1f} ms | "
+                f"stale skipped {self.stale_frames}")
+        if self.pace:
+            text += f" | throttled {self.throttled_frames}"
+        return text
+
+
+def scheduler_for_source(cap, fps=None, skip_stale=True):
+    """
+    Scheduler for a capture loop reading from cap.
+
+    Args:
+        cap: FrameSource or cv2.VideoCapture
+        fps: Target frame rate (default: the source's target_fps, see
+            open_source; None = every frame the source delivers)
+        skip_stale: Skip frames queued in a camera's buffer
+    """
+    source_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    fps = fps or getattr(cap, 'target_fps', None)
+    return FrameScheduler(fps or source_fps, pace=fps is not None, skip_stale=skip_stale, source_fps=source_fps)
@@ -0,0 +1,402 @@
+import glob
+import os
+
+import cv2
+import numpy as np
+
+from frame_scheduler import FrameScheduler
+from shared_frames import SharedFrameReader
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameSource:
+    def __init__(self, fps=30.0, realtime=True, loop=False):
+        """
+        Base class for everything frames can come from.
+
+        Mirrors the parts of cv2.VideoCapture the pipelines use (isOpened, read,
+        get, set, release) so a source can be used wherever a capture was opened.
+
+        Args:
+            fps: Nominal frame rate
+            realtime: Pace read() at fps (file/synthetic sources); False = as fast as possible
+            loop: Start over at the end instead of returning (False, None)
+        """
+        self.fps = fps or 30.0
+        self.realtime = realtime
+        self.loop = loop
+        self.width = 0
+        self.height = 0
+        self.frames_read = 0
+        self.target_fps = None  # rate the capture loops process frames at (None = every frame)
+        self._scheduler = None
+
+    # Frames queue up in a driver buffer while nobody reads (FrameScheduler
+    # grab()s past them); such sources implement grab() and retrieve()
+    buffered = False
+
+    @property
+    def self_paced(self):
+        """True if read() delivers frames at the source's own rate (False = as fast as asked)"""
+        return self.realtime
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        """
+        Returns: (ret, frame) like cv2.VideoCapture.read()
+
+        Args:
+            image: Array in the frame format to read into (see FramePool);
+                sources that cannot decode in place return a new array
+        """
+        frame = self._next_frame(image)
+        if frame is None and self.loop and self.frames_read > 0 and self._rewind():
+            frame = self._next_frame(image)
+        if frame is None:
+            return False, None
+        if self.realtime:
+            self._pace()
+        self.frames_read += 1
+        return True, frame
+
+    def _next_frame(self, image=None):
+        raise NotImplementedError
+
+    def _rewind(self):
+        return False
+
+    def _pace(self):
+        """Sleep until this frame is due at the nominal frame rate (no catch-up after a stall)"""
+        if self._scheduler is None:
+            self._scheduler = FrameScheduler(self.fps, pace=True, skip_stale=False)
+        self._scheduler.wait()
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+    def describe(self):
+        return self.__class__.__name__
+
+
+class CameraSource(FrameSource):
+    def __init__(self, index=0):
+        """Live camera; the device paces the frames"""
+        super().__init__(realtime=False)
+        self.index = index
+        self.cap = cv2.VideoCapture(index)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    buffered = True
+
+    @property
+    def self_paced(self):
+        return True
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if ret:
+            self.frames_read += 1
+        return ret, frame
+
+    def grab(self):
+        return self.cap.grab()
+
+    def retrieve(self, image=None):
+        ret, frame = self.cap.retrieve(image)
+        if ret:
+            self.frames_read += 1
+        return ret, frame
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+    def describe(self):
+        return f"camera {self.index}"
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, realtime=True, loop=False):
+        """Recorded video, paced at its own frame rate unless realtime is False"""
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS), realtime, loop)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _next_frame(self, image=None):
+        ret, frame = self.cap.read(image)
+        return frame if ret else None
+
+    def _rewind(self):
+        return self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+    def describe(self):
+        return f"video {self.path}"
+
+
+class ImageDirSource(FrameSource):
+    def __init__(self, path, fps=30.0, realtime=True, loop=False):
+        """Directory of images, read in file name order"""
+        super().__init__(fps, realtime, loop)
+        self.path = path
+        self.files = sorted(
+            f for f in glob.glob(os.path.join(path, '*'))
+            if f.lower().endswith(IMAGE_EXTENSIONS))
+        self._index = 0
+        if self.files:
+            first = cv2.imread(self.files[0])
+            if first is not None:
+                self.height, self.width = first.shape[:2]
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def _next_frame(self, image=None):
+        while self._index < len(self.files):
+            frame = cv2.imread(self.files[self._index])
+            self._index += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def _rewind(self):
+        self._index = 0
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.files)
+        return super().get(prop)
+
+    def describe(self):
+        return f"images {self.path} ({len(self.files)} files)"
+
+
+class SyntheticSource(FrameSource):
+    def __init__(self, width=640, height=480, fps=30.0, frames=0, realtime=True):
+        """
+        Generated frames (moving gradient, a bright square and sensor noise)
+        for throughput tests without any recording.
+
+        Args:
+            frames: Stop after this many frames (0 = endless)
+        """
+        super().__init__(fps, realtime)
+        self.width = width
+        self.height = height
+        self.frames = frames
+        yy, xx = np.mgrid[0:height, 0:width]
+        self._base = np.stack([xx % 256, yy % 256, ((xx + yy) // 2) % 256], axis=-1).astype(np.uint8)
+        self._noise = np.random.default_rng(0).integers(0, 16, size=(8, height, width, 3), dtype=np.uint8)
+
+    def _next_frame(self, image=None):
+        i = self.frames_read
+        if self.frames and i >= self.frames:
+            return None
+        frame = image if image is not None and image.shape == self._base.shape else np.empty_like(self._base)
+        # Gradient scrolled by 4 px per frame (np.roll without the temporary)
+        shift = (i * 4) % self.width
+        frame[:, shift:] = self._base[:, :self.width - shift]
+        frame[:, :shift] = self._base[:, self.width - shift:]
+        cv2.add(frame, self._noise[i % len(self._noise)], dst=frame)
+        size = max(8, min(self.width, self.height) // 5)
+        x = (i * 7) % max(1, self.width - size)
+        y = (i * 3) % max(1, self.height - size)
+        frame[y:y + size, x:x + size] = 255
+        return frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.frames
+        return super().get(prop)
+
+    def describe(self):
+        return f"synthetic {self.width}x{self.height}@{self.fps:g}"
+
+
+class SharedMemorySource(FrameSource):
+    def __init__(self, name, timeout=2.0):
+        """
+        Frames published by the capture daemon (capture_daemon.py) in a named
+        shared memory ring. Several processes can read the same camera this way
+        without opening the device again.
+
+        read() returns the newest frame as a read-only view into shared memory
+        (no copy), valid until the daemon wraps around to its slot.
+        read(image) copies the frame into image instead (FramePool and
+        FrameFreeList pass one), so loops that keep frames across stages own
+        them; a copy the daemon overwrote partway is discarded for the next
+        frame. The daemon's capture time of the frame is in last_capture_time.
+
+        Args:
+            name: Ring name given to the capture daemon
+            timeout: Seconds without a new frame before read() gives up
+        """
+        super().__init__(realtime=False)
+        self.name = name
+        self.timeout = timeout
+        self.last_capture_time = None
+        try:
+            self.reader = SharedFrameReader(name)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ Shared memory source '{name}' not available (is capture_daemon.py running?): {e}")
+            self.reader = None
+            return
+        self.fps = self.reader.fps
+        self.width = self.reader.width
+        self.height = self.reader.height
+
+    @property
+    def self_paced(self):
+        return True
+
+    def isOpened(self):
+        return self.reader is not None
+
+    def read(self, image=None):
+        if self.reader is None:
+            return False, None
+        while True:
+            item = self.reader.read(self.timeout)
+            if item is None:
+                return False, None
+            seq, capture_time, frame = item
+            if image is None:
+                break
+            if image.shape != frame.shape or image.dtype != frame.dtype:
+                image = np.empty(frame.shape, dtype=frame.dtype)
+            np.copyto(image, frame)
+            if self.reader.is_current(seq):
+                frame = image
+                break
+            # The daemon wrapped around to this slot during the copy: torn, take the next frame
+        self.last_capture_time = capture_time
+        self.frames_read += 1
+        return True, frame
+
+    def release(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    def describe(self):
+        return f"shared memory {self.name}"
+
+
+def _parse_synthetic(spec, realtime):
+    """synthetic[:WxH[@fps]]"""
+    width, height, fps = 640, 480, 30.0
+    _, _, options = spec.partition(':')
+    if options:
+        size, _, rate = options.partition('@')
+        if size:
+            width, height = (int(v) for v in size.lower().split('x'))
+        if rate:
+            fps = float(rate)
+    return SyntheticSource(width, height, fps, realtime=realtime)
+
+
+def open_source(spec=None, realtime=True, loop=False, target_fps=None):
+    """
+    Open a frame source from a spec string.
+
+    Args:
+        spec: Camera index ("0", "camera:1"), video file, image directory,
+            "synthetic[:WxH[@fps]]", "shm:<name>" (capture daemon ring), an
+            existing FrameSource, or None for camera 0
+        realtime: Pace file and synthetic sources at their frame rate
+        loop: Restart file sources at the end
+        target_fps: Frame rate the capture loops process frames at; faster
+            sources have the frames in between dropped (None = every frame)
+    """
+    if hasattr(spec, 'read'):
+        return spec  # already opened (FrameSource or cv2.VideoCapture)
+    spec = '0' if spec is None else str(spec)
+
+    if spec.startswith('camera:'):
+        source = CameraSource(int(spec.split(':', 1)[1]))
+    elif spec.lstrip('-').isdigit():
+        source = CameraSource(int(spec))
+    elif spec.startswith('synthetic'):
+        source = _parse_synthetic(spec, realtime)
+    elif spec.startswith('shm:'):
+        source = SharedMemorySource(spec.split(':', 1)[1])
+    elif os.path.isdir(spec):
+        source = ImageDirSource(spec, realtime=realtime, loop=loop)
+    else:
+        source = VideoFileSource(spec, realtime=realtime, loop=loop)
+    source.target_fps = target_fps
+    return source
+
+
+def add_source_arguments(parser, default='0', multiple=False):
+    """
+    Add the common --source/--fast/--loop/--fps options to an argparse parser
+
+    Args:
+        parser: argparse.ArgumentParser
+        default: Default --source
+        multiple: --source is required and repeated once per camera (a list)
+    """
+    if multiple:
+        parser.add_argument('--source', type=str, action='append', required=True,
+                            help='Frame source, repeat for every camera: camera index, video file, image '
+                                 'directory, synthetic[:WxH[@fps]] or shm:<name>. Camera id = order given, from 0')
+    else:
+        default_label = default or 'auto'
+        parser.add_argument('--source', type=str, default=default,
+                            help='Frame source: camera index, video file, image directory, '
+                                 f'synthetic[:WxH[@fps]] or shm:<name> (default: {default_label})')
+    parser.add_argument('--fast', action='store_true',
+                        help='Read file and synthetic sources as fast as possible instead of in real time')
+    parser.add_argument('--loop', action='store_true', help='Restart file sources at the end')
+    parser.add_argument('--fps', type=float, default=None,
+                        help='Process at most this many frames per second, dropping the rest '
+                             '(default: every frame the source delivers)')
+    return parser
+
+
+def open_source_from_args(args):
+    """
+    Open the source selected by add_source_arguments options
+    Returns: FrameSource, or a list of them for add_source_arguments(multiple=True)
+    """
+    if isinstance(args.source, list):
+        return [open_source(spec, realtime=not args.fast, loop=args.loop, target_fps=args.fps)
+                for spec in args.source]
+    return open_source(args.source, realtime=not args.fast, loop=args.loop, target_fps=args.fps)
@@ -0,0 +1,206 @@
+import numpy as np
+
+# Finger tip and PIP landmark indices: Thumb, Index, Middle, Ring, Pinky
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])
+FINGER_PIPS = np.array([3, 6, 10, 14, 18])
+FINGER_NAMES = ["Thumb", "Index", "Middle", "Ring", "Pinky"]
+
+# Bit i of a finger mask is set when finger i (thumb = bit 0) is up
+FINGER_BITS = 1 << np.arange(5)
+
+TILT_THRESHOLD = 0.05
+TILT_NAMES = np.array(["STRAIGHT", "RIGHT", "LEFT"], dtype=object)
+
+# Landmarks used for the continuous hand pose
+WRIST = 0
+THUMB_TIP = 4
+INDEX_MCP = 5
+INDEX_TIP = 8
+MIDDLE_MCP = 9
+PINKY_MCP = 17
+POSE_FIELDS = ("wrist_x", "wrist_y", "wrist_z", "normal_x", "normal_y", "normal_z", "pinch", "tilt")
+
+# Hand index used in lookup tables. Unknown labels get the left-hand finger
+# rules but never a gesture (their table row stays empty).
+HAND_LEFT = 0
+HAND_RIGHT = 1
+HAND_UNKNOWN = 2
+HAND_LABELS = {"Left": HAND_LEFT, "Right": HAND_RIGHT}
+
+# (hand label, finger mask) -> gesture
+DEFAULT_GESTURES = {
+    # Left hand = WASD
+    ("Left", 0b00000): "FORWARD",       # Fist
+    ("Left", 0b11111): "BACKWARD",      # All 5 fingers
+    ("Left", 0b00011): "RIGHT",         # Index + Thumb
+    ("Left", 0b00110): "LEFT",          # Index + Middle
+    # Right hand = Up/Down + Rotation
+    ("Right", 0b00000): "UP",           # Fist
+    ("Right", 0b11111): "DOWN",         # All 5 fingers
+    ("Right", 0b00110): "ROTATE_RIGHT", # Index + Middle
+    ("Right", 0b00011): "ROTATE_LEFT",  # Index + Thumb
+}
+
+
+def hand_index(hand_label):
+    """Lookup table row for a hand label ("Left", "Right", anything else HAND_UNKNOWN)"""
+    return HAND_LABELS.get(hand_label, HAND_UNKNOWN)
+
+
+def build_gesture_table(gestures):
+    """
+    Compile a {(hand_label, finger_mask): gesture} mapping into a 3x32 lookup table
+    indexed by [hand index, finger mask] (the HAND_UNKNOWN row is all None).
+    """
+    table = np.full((3, 32), None, dtype=object)
+    for (hand_label, mask), gesture in gestures.items():
+        if hand_label not in HAND_LABELS:
+            raise ValueError(f"Unknown hand label: {hand_label!r}")
+        table[HAND_LABELS[hand_label], mask] = gesture
+    return table
+
+
+DEFAULT_GESTURE_TABLE = build_gesture_table(DEFAULT_GESTURES)
+
+
+def landmarks_to_array(landmarks, out=None):
+    """
+    Convert 21 MediaPipe landmarks to a contiguous (21, 3) float32 array.
+
+    Args:
+        landmarks: Sequence of landmarks with x/y/z (or an existing array, returned as is)
+        out: Optional preallocated (21, 3) float32 array to fill
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    if out is None:
+        out = np.empty((21, 3), dtype=np.float32)
+    flat = out.reshape(-1)
+    for i, lm in enumerate(landmarks):
+        flat[3 * i] = lm.x
+        flat[3 * i + 1] = lm.y
+        flat[3 * i + 2] = lm.z
+    return out
+
+
+def finger_states_batch(points, hand_indices):
+    """
+    Which fingers are up, for N hands at once.
+
+    Args:
+        points: (N, 21, 3) landmark array
+        hand_indices: (N,) array of HAND_LEFT / HAND_RIGHT / HAND_UNKNOWN
+    Returns: (N, 5) bool array [thumb, index, middle, ring, pinky]
+    """
+    tips = points[:, FINGER_TIPS, :2]
+    pips = points[:, FINGER_PIPS, :2]
+
+    # Other 4 fingers: tip above PIP
+    fingers_up = tips[:, :, 1] < pips[:, :, 1]
+
+    # Thumb: horizontal check, direction depends on hand
+    # Right hand: tip LEFT of PIP, Left (and unknown) hand: tip RIGHT of PIP
+    thumb_dx = tips[:, 0, 0] - pips[:, 0, 0]
+    fingers_up[:, 0] = np.where(hand_indices == HAND_RIGHT, thumb_dx < 0, thumb_dx > 0)
+    return fingers_up
+
+
+def finger_masks(fingers_up):
+    """(N, 5) bool finger states -> (N,) int finger bitmasks"""
+    return fingers_up.astype(np.int64) @ FINGER_BITS
+
+
+def hand_tilt_batch(points, threshold=TILT_THRESHOLD):
+    """
+    Tilt of N hands from wrist to middle finger base.
+    Returns: (N,) object array of "LEFT", "RIGHT" or "STRAIGHT"
+    """
+    x_diff = points[:, 9, 0] - points[:, 0, 0]
+    codes = np.where(x_diff > threshold, 1, np.where(x_diff < -threshold, 2, 0))
+    return TILT_NAMES[codes]
+
+
+def hand_pose_batch(points, hand_indices):
+    """
+    Continuous pose of N hands for analog control.
+
+    Args:
+        points: (N, 21, 3) landmark array
+        hand_indices: (N,) array of HAND_LEFT / HAND_RIGHT / HAND_UNKNOWN
+    Returns: (N, 8) float32 array, columns as in POSE_FIELDS:
+        wrist position (normalized image coordinates), unit palm normal
+        (pointing out of the palm for both hands), thumb-index pinch distance
+        in palm lengths, and tilt (the wrist to middle finger base x offset
+        that hand_tilt_batch thresholds)
+    """
+    wrist = points[:, WRIST]
+    normal = np.cross(points[:, INDEX_MCP] - wrist, points[:, PINKY_MCP] - wrist)
+    # The cross product flips with handedness; mirror the left hand so both point out of the palm
+    normal[np.asarray(hand_indices) != HAND_RIGHT] *= -1
+    normal /= np.linalg.norm(normal, axis=1, keepdims=True) + 1e-6
+
+    palm_length = np.linalg.norm(points[:, MIDDLE_MCP, :2] - wrist[:, :2], axis=1) + 1e-6
+    pinch = np.linalg.norm(points[:, THUMB_TIP, :2] - points[:, INDEX_TIP, :2], axis=1) / palm_length
+    tilt = points[:, MIDDLE_MCP, 0] - wrist[:, 0]
+
+    return np.concatenate([wrist, normal, pinch[:, None], tilt[:, None]], axis=1).astype(np.float32)
+
+
+def classify_batch(points, hand_indices, table=DEFAULT_GESTURE_TABLE):
+    """
+    Classify N hands at once.
+
+    Args:
+        points: (N, 21, 3) landmark array
+        hand_indices: (N,) array of HAND_LEFT / HAND_RIGHT / HAND_UNKNOWN
+        table: [hand index, finger mask] gesture lookup table
+    Returns: (gestures, finger_states) - (N,) object array (None = no gesture)
+             and (N, 5) bool array
+    """
+    hand_indices = np.asarray(hand_indices)
+    fingers_up = finger_states_batch(points, hand_indices)
+    gestures = table[hand_indices, finger_masks(fingers_up)]
+    return gestures, fingers_up
+
+
+class HandAnalysis:
+    """Features of one detected hand, computed once per frame"""
+    __slots__ = ('label', 'score', 'points', 'fingers_up', 'finger_count', 'tilt', 'gesture')
+
+    def __init__(self, label, points, fingers_up, tilt, gesture, score=1.0):
+        self.label = label
+        self.score = score
+        self.points = points
+        self.fingers_up = fingers_up
+        self.finger_count = int(fingers_up.sum())
+        self.tilt = tilt
+        self.gesture = gesture
+
+    @property
+    def wrist(self):
+        return self.points[0]
+
+
+def analyze_hands(results, table=DEFAULT_GESTURE_TABLE):
+    """
+    Convert every hand in a MediaPipe Hands result to a (21, 3) array once and
+    classify them all with vectorized comparisons.
+    Returns: list of HandAnalysis (same order as results.multi_hand_landmarks)
+    """
+    if not results.multi_hand_landmarks or not results.multi_handedness:
+        return []
+
+    labels = [h.classification[0].label for h in results.multi_handedness]
+    scores = [h.classification[0].score for h in results.multi_handedness]
+    points = np.empty((len(labels), 21, 3), dtype=np.float32)
+    for i, hand_landmarks in enumerate(results.multi_hand_landmarks[:len(labels)]):
+        landmarks_to_array(hand_landmarks.landmark, out=points[i])
+
+    hand_indices = np.array([hand_index(label) for label in labels])
+    gestures, fingers_up = classify_batch(points, hand_indices, table)
+    tilts = hand_tilt_batch(points)
+
+    return [
+        HandAnalysis(labels[i], points[i], fingers_up[i], tilts[i], gestures[i], scores[i])
+        for i in range(len(labels))
+    ]
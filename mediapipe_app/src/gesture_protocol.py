@@ -0,0 +1,269 @@
+import json
+import os
+import struct
+import time
+
+# Binary gesture message (big-endian, 13 bytes):
+# [magic:2 "HG"][version:1][hand:1][seq:2][timestamp_us:4][gesture:1][confidence:1][camera:1]
+GESTURE_MAGIC = b'HG'
+GESTURE_VERSION = 2
+GESTURE_PACKET = struct.Struct('>2sBBHIBBB')
+
+# Gesture enum - index is the wire code. Keep in sync with GESTURES in
+# Godot_Project/Scripts/gesture_decoder.gd
+GESTURES = [
+    "NONE", "NO_HAND", "CENTER",
+    "FORWARD", "BACKWARD", "LEFT", "RIGHT",
+    "UP", "DOWN", "ROTATE_LEFT", "ROTATE_RIGHT",
+]
+GESTURE_CODES = {name: code for code, name in enumerate(GESTURES)}
+
+HAND_IDS = {"Left": 0, "Right": 1}
+HAND_LABELS = {code: label for label, code in HAND_IDS.items()}
+HAND_UNKNOWN = 255
+
+FORMATS = ("json", "binary")
+
+# Landmark stream message (big-endian), one per frame:
+# header [magic:2 "HL"][version:1][hand_count:1][seq:2][capture_timestamp_us:4][camera:1]
+# then per hand [hand:1][confidence:1][8 x float32: see POSE_FIELDS in gesture_features.py]
+STREAM_MAGIC = b'HL'
+STREAM_VERSION = 2
+STREAM_HEADER = struct.Struct('>2sBBHIB')
+STREAM_HAND = struct.Struct('>BB8f')
+MAX_STREAM_HANDS = 2
+
+# Face detection metadata (big-endian), one per video frame, sent to the video
+# port next to the frame so receivers get the result without decoding the JPEG:
+# header [magic:2 "HF"][version:1][face_count:1][seq:2][capture_timestamp_us:4][camera:1]
+# then per face [score:1][xmin:f32][ymin:f32][width:f32][height:f32] (relative to the frame)
+# seq is the frame sequence of the video fragments (lower 16 bits of their sequence field).
+FACE_MAGIC = b'HF'
+FACE_VERSION = 1
+FACE_HEADER = struct.Struct('>2sBBHIB')
+FACE_BOX = struct.Struct('>B4f')
+MAX_FACES = 16
+
+# Video frames carry the camera id in the upper 16 bits of the fragment
+# header's sequence field; the lower 16 bits are the frame sequence.
+MAX_CAMERAS = 256
+
+
+def video_sequence(camera_id, seq):
+    """Wire sequence number for frame seq of camera camera_id"""
+    return ((camera_id & 0xFF) << 16) | (seq & 0xFFFF)
+
+
+def split_video_sequence(value):
+    """Returns: (camera_id, seq) from a wire sequence number"""
+    return (value >> 16) & 0xFF, value & 0xFFFF
+
+
+def monotonic_us(t=None):
+    """
+    Monotonic clock in microseconds, wrapped to 32 bits (wraps every ~71 minutes).
+
+    Args:
+        t: A time.monotonic() value to convert (default: now)
+    """
+    t = time.monotonic() if t is None else t
+    return int(t * 1_000_000) & 0xFFFFFFFF
+
+
+def elapsed_us(start_us, end_us):
+    """Microseconds from start_us to end_us, across a 32-bit wrap"""
+    return (end_us - start_us) & 0xFFFFFFFF
+
+
+class GestureMessageEncoder:
+    def __init__(self, fmt=None, camera_id=0):
+        """
+        Builds gesture messages for Godot in JSON or the compact binary layout.
+
+        Args:
+            fmt: "json" or "binary" (default: $GESTURE_UDP_FORMAT or "json")
+            camera_id: Camera the gestures come from (0 - 255)
+        """
+        fmt = (fmt or os.getenv('GESTURE_UDP_FORMAT', 'json')).lower()
+        if fmt not in FORMATS:
+            print(f"⚠️ Unknown gesture format '{fmt}', using json")
+            fmt = "json"
+        self.format = fmt
+        self.camera_id = camera_id & 0xFF
+        self.sequence_number = 0
+        self._buffer = bytearray(GESTURE_PACKET.size)
+
+    def encode(self, gesture, hand_label=None, confidence=1.0, capture_time=None):
+        """
+        Encode one gesture message and advance the sequence number.
+        Gestures outside the binary enum (e.g. custom commands from the gesture
+        config) are sent as JSON so they still reach the receiver.
+
+        Args:
+            gesture: Gesture name
+            hand_label: "Left", "Right" or None
+            confidence: 0.0 - 1.0
+            capture_time: time.monotonic() of the frame the gesture came from
+                (default: now). Binary messages carry it as timestamp_us,
+                JSON as capture_us.
+        Returns: bytes ready for sendto()
+        """
+        seq = self.sequence_number
+        self.sequence_number = (seq + 1) % 65536
+
+        timestamp_us = monotonic_us(capture_time)
+        code = GESTURE_CODES.get(gesture)
+        if self.format == "binary" and code is not None:
+            GESTURE_PACKET.pack_into(
+                self._buffer, 0, GESTURE_MAGIC, GESTURE_VERSION,
+                HAND_IDS.get(hand_label, HAND_UNKNOWN), seq, timestamp_us, code,
+                max(0, min(255, int(round(confidence * 255)))), self.camera_id)
+            return bytes(self._buffer)
+
+        message = {
+            "type": "gesture",
+            "gesture": gesture,
+            "timestamp": time.time(),
+            "capture_us": timestamp_us,
+            "seq": seq,
+            "camera": self.camera_id
+        }
+        if hand_label is not None:
+            message["hand"] = hand_label
+        return json.dumps(message).encode('utf-8')
+
+
+class LandmarkStreamEncoder:
+    def __init__(self, camera_id=0):
+        """
+        Packs per-frame hand poses into landmark stream messages.
+
+        Args:
+            camera_id: Camera the poses come from (0 - 255)
+        """
+        self.camera_id = camera_id & 0xFF
+        self.sequence_number = 0
+        self._buffer = bytearray(STREAM_HEADER.size + MAX_STREAM_HANDS * STREAM_HAND.size)
+
+    def encode(self, poses, hand_labels, scores, capture_time=None):
+        """
+        Encode the hand poses of one frame and advance the sequence number.
+
+        Args:
+            poses: (N, 8) pose array from hand_pose_batch
+            hand_labels: N hand labels ("Left" / "Right")
+            scores: N handedness scores (0.0 - 1.0)
+            capture_time: time.monotonic() when the frame was captured (default: now)
+        Returns: bytes ready for sendto() (an empty hand list is sent too, so the
+                 receiver knows the hands are gone)
+        """
+        seq = self.sequence_number
+        self.sequence_number = (seq + 1) % 65536
+
+        timestamp_us = monotonic_us(capture_time)
+        count = min(len(hand_labels), MAX_STREAM_HANDS)
+        STREAM_HEADER.pack_into(self._buffer, 0, STREAM_MAGIC, STREAM_VERSION, count, seq, timestamp_us,
+                                self.camera_id)
+        offset = STREAM_HEADER.size
+        for i in range(count):
+            STREAM_HAND.pack_into(
+                self._buffer, offset, HAND_IDS.get(hand_labels[i], HAND_UNKNOWN),
+                max(0, min(255, int(round(scores[i] * 255)))), *poses[i].tolist())
+            offset += STREAM_HAND.size
+        return bytes(self._buffer[:offset])
+
+
+class FaceMetadataEncoder:
+    def __init__(self, camera_id=0):
+        """
+        Packs the face detections of one video frame into a metadata message.
+
+        Args:
+            camera_id: Camera the frame comes from (0 - 255)
+        """
+        self.camera_id = camera_id & 0xFF
+        self._buffer = bytearray(FACE_HEADER.size + MAX_FACES * FACE_BOX.size)
+
+    def encode(self, seq, faces, capture_time=None):
+        """
+        Encode the detections of one frame.
+
+        Args:
+            seq: Frame sequence number of the video frame the faces belong to
+            faces: List of (score, xmin, ymin, width, height), box relative to the frame
+            capture_time: time.monotonic() when the frame was captured (default: now)
+        Returns: bytes ready for sendto() (sent with no faces too, so the receiver
+                 knows the face is gone)
+        """
+        count = min(len(faces), MAX_FACES)
+        FACE_HEADER.pack_into(self._buffer, 0, FACE_MAGIC, FACE_VERSION, count, seq & 0xFFFF,
+                              monotonic_us(capture_time), self.camera_id)
+        offset = FACE_HEADER.size
+        for score, xmin, ymin, width, height in faces[:count]:
+            FACE_BOX.pack_into(self._buffer, offset, max(0, min(255, int(round(score * 255)))),
+                               xmin, ymin, width, height)
+            offset += FACE_BOX.size
+        return bytes(self._buffer[:offset])
+
+
+def decode_face_metadata(data):
+    """
+    Decode a face metadata message.
+    Returns: dict with seq, camera, timestamp_us and faces [{score, box: (xmin, ymin, width, height)}], or None
+    """
+    if len(data) < FACE_HEADER.size or data[:2] != FACE_MAGIC:
+        return None
+    _, version, count, seq, timestamp_us, camera = FACE_HEADER.unpack_from(data)
+    if version != FACE_VERSION or len(data) < FACE_HEADER.size + count * FACE_BOX.size:
+        return None
+    faces = []
+    for i in range(count):
+        score, *box = FACE_BOX.unpack_from(data, FACE_HEADER.size + i * FACE_BOX.size)
+        faces.append({"score": score / 255, "box": tuple(box)})
+    return {"type": "faces", "seq": seq, "camera": camera, "timestamp_us": timestamp_us, "faces": faces}
+
+
+def decode_landmark_message(data):
+    """
+    Decode a landmark stream message.
+    Returns: dict with seq, camera, timestamp_us and hands [{hand, confidence, pose}], or None
+    """
+    if len(data) < STREAM_HEADER.size or data[:2] != STREAM_MAGIC:
+        return None
+    _, version, count, seq, timestamp_us, camera = STREAM_HEADER.unpack_from(data)
+    if version != STREAM_VERSION or len(data) < STREAM_HEADER.size + count * STREAM_HAND.size:
+        return None
+    hands = []
+    for i in range(count):
+        hand, confidence, *pose = STREAM_HAND.unpack_from(data, STREAM_HEADER.size + i * STREAM_HAND.size)
+        hands.append({"hand": HAND_LABELS.get(hand), "confidence": confidence / 255, "pose": pose})
+    return {"type": "landmarks", "seq": seq, "camera": camera, "timestamp_us": timestamp_us, "hands": hands}
+
+
+def decode_gesture_message(data):
+    """
+    Decode a binary or JSON gesture message.
+    Returns: dict with type/gesture/seq/camera (and hand/confidence/timestamp_us for binary),
+             or None if the packet is not a gesture message
+    """
+    if len(data) >= GESTURE_PACKET.size and data[:2] == GESTURE_MAGIC:
+        _, version, hand, seq, timestamp_us, code, confidence, camera = GESTURE_PACKET.unpack_from(data)
+        if version != GESTURE_VERSION or code >= len(GESTURES):
+            return None
+        return {
+            "type": "gesture",
+            "gesture": GESTURES[code],
+            "seq": seq,
+            "camera": camera,
+            "hand": HAND_LABELS.get(hand),
+            "confidence": confidence / 255,
+            "timestamp_us": timestamp_us
+        }
+
+    try:
+        message = json.loads(bytes(data).decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(message, dict) or message.get("type") != "gesture":
+        return None
+    return message
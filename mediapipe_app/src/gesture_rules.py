@@ -0,0 +1,96 @@
+import json
+import os
+from itertools import product
+
+from gesture_features import FINGER_NAMES, build_gesture_table
+
+DEFAULT_GESTURE_CONFIG = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'gestures.json')
+
+HAND_LABELS = ("Left", "Right")
+FINGER_BIT = {name.lower(): 1 << i for i, name in enumerate(FINGER_NAMES)}
+
+
+def _rule_masks(rule):
+    """
+    All finger masks matched by one rule.
+
+    "fingers" lists the fingers that must be up, every other finger must be
+    down unless it is listed in "ignore" (either state matches).
+    """
+    base = 0
+    for finger in rule.get("fingers", []):
+        base |= _finger_bit(finger)
+    ignored = [_finger_bit(finger) for finger in rule.get("ignore", [])]
+    masks = []
+    for states in product((0, 1), repeat=len(ignored)):
+        mask = base & ~sum(ignored)
+        for bit, state in zip(ignored, states):
+            if state:
+                mask |= bit
+        masks.append(mask)
+    return masks
+
+
+def _finger_bit(finger):
+    try:
+        return FINGER_BIT[finger.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown finger '{finger}' (expected one of: {', '.join(FINGER_BIT)})")
+
+
+def _check_rule(rule, hand_label, path):
+    if not isinstance(rule, dict):
+        raise ValueError(f"{path}: {hand_label} rule {rule!r} must be an object")
+    if not isinstance(rule.get("command"), str) or not rule["command"]:
+        raise ValueError(f"{path}: {hand_label} rule {rule!r} has no \"command\"")
+    for key in ("fingers", "ignore"):
+        fingers = rule.get(key, [])
+        if not isinstance(fingers, list) or not all(isinstance(finger, str) for finger in fingers):
+            raise ValueError(f"{path}: \"{key}\" of {hand_label} rule {rule['command']} must be a list of finger names")
+
+
+def load_gesture_rules(path):
+    """
+    Load a gesture config file.
+    Returns: {(hand_label, finger_mask): command}
+    Raises ValueError for a malformed file (invalid JSON, wrong structure, a
+    rule without a command), unknown hands/fingers or two rules matching the
+    same mask.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: invalid JSON: {e}")
+
+    if not isinstance(config, dict) or not isinstance(config.get("gestures", {}), dict):
+        raise ValueError(f"{path}: \"gestures\" must be an object of hand -> list of rules")
+    gestures = {}
+    for hand_label, rules in config.get("gestures", {}).items():
+        if hand_label not in HAND_LABELS:
+            raise ValueError(f"Unknown hand '{hand_label}' in {path} (expected Left or Right)")
+        if not isinstance(rules, list):
+            raise ValueError(f"{path}: rules of {hand_label} must be a list")
+        for rule in rules:
+            _check_rule(rule, hand_label, path)
+            command = rule["command"]
+            for mask in _rule_masks(rule):
+                key = (hand_label, mask)
+                if key in gestures and gestures[key] != command:
+                    raise ValueError(
+                        f"{path}: {hand_label} finger mask {mask:05b} maps to both "
+                        f"{gestures[key]} and {command}")
+                gestures[key] = command
+    return gestures
+
+
+def compile_gesture_table(path=None):
+    """
+    Load a gesture config and compile it to the [hand, finger mask] lookup table.
+
+    Args:
+        path: Config file (default: $GESTURE_CONFIG or config/gestures.json)
+    """
+    path = path or os.getenv('GESTURE_CONFIG', DEFAULT_GESTURE_CONFIG)
+    return build_gesture_table(load_gesture_rules(path))
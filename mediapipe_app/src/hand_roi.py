@@ -0,0 +1,109 @@
+import cv2
+
+
+class HandRoiTracker:
+    def __init__(self, padding=0.6, input_size=256, max_coverage=0.7, refresh_interval=30):
+        """
+        Keeps a padded region of interest around the hands found in the previous
+        frame, so only that crop has to be converted and run through MediaPipe.
+
+        Args:
+            padding: Extra margin around the landmark bounding box, as a fraction
+                of the box size on each side
+            input_size: Crops whose longer side exceeds this are downscaled to it
+            max_coverage: If the ROI would cover more than this fraction of the
+                frame, full-frame detection is used instead
+            refresh_interval: Force a full-frame pass every N inferences so hands
+                entering outside the ROI are still picked up
+        """
+        self.padding = padding
+        self.input_size = input_size
+        self.max_coverage = max_coverage
+        self.refresh_interval = refresh_interval
+
+        self.box = None  # (x0, y0, x1, y1) in pixels
+        self._inferences_since_refresh = 0
+
+        # Statistics
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost_count = 0
+
+    def crop(self, frame):
+        """
+        Crop (and downscale) the frame to the current ROI.
+        Returns: (crop, box) or (None, None) when full-frame detection is needed
+        """
+        self._inferences_since_refresh += 1
+        if self.box is None or self._inferences_since_refresh >= self.refresh_interval:
+            self._inferences_since_refresh = 0
+            return None, None
+
+        x0, y0, x1, y1 = self.box
+        crop = frame[y0:y1, x0:x1]
+        crop_h, crop_w = crop.shape[:2]
+        longest = max(crop_w, crop_h)
+        if longest > self.input_size:
+            scale = self.input_size / longest
+            crop = cv2.resize(crop, (max(1, int(crop_w * scale)), max(1, int(crop_h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        return crop, self.box
+
+    def to_full_frame(self, results, box, frame_width, frame_height):
+        """Map landmarks normalized to the crop back to full-frame normalized coordinates (in place)"""
+        x0, y0, x1, y1 = box
+        sx = (x1 - x0) / frame_width
+        sy = (y1 - y0) / frame_height
+        ox = x0 / frame_width
+        oy = y0 / frame_height
+        for hand_landmarks in results.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = lm.x * sx + ox
+                lm.y = lm.y * sy + oy
+                # z uses roughly the same scale as x
+                lm.z = lm.z * sx
+        return results
+
+    def update(self, results, frame_width, frame_height, from_roi):
+        """Recompute the ROI from full-frame normalized landmarks"""
+        if from_roi:
+            self.roi_frames += 1
+        else:
+            self.full_frames += 1
+
+        if not results.multi_hand_landmarks:
+            self.box = None
+            return
+
+        xs = []
+        ys = []
+        for hand_landmarks in results.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                xs.append(lm.x)
+                ys.append(lm.y)
+
+        min_x = min(xs) * frame_width
+        max_x = max(xs) * frame_width
+        min_y = min(ys) * frame_height
+        max_y = max(ys) * frame_height
+
+        # Square box around the hands, padded on every side
+        size = max(max_x - min_x, max_y - min_y) * (1 + 2 * self.padding)
+        cx = (min_x + max_x) / 2
+        cy = (min_y + max_y) / 2
+        x0 = int(max(0, cx - size / 2))
+        y0 = int(max(0, cy - size / 2))
+        x1 = int(min(frame_width, cx + size / 2))
+        y1 = int(min(frame_height, cy + size / 2))
+
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            self.box = None
+        elif (x1 - x0) * (y1 - y0) > self.max_coverage * frame_width * frame_height:
+            self.box = None
+        else:
+            self.box = (x0, y0, x1, y1)
+
+    def lost(self):
+        """Tracking was lost inside the ROI; next detection runs on the full frame"""
+        self.box = None
+        self.lost_count += 1
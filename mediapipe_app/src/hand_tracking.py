@@ -2,15 +2,51 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import socket
-import json
 import time
 import os
 
+from landmark_predictor import LandmarkPredictor
+from hand_roi import HandRoiTracker
+from gesture_features import (
+    DEFAULT_GESTURE_TABLE, FINGER_NAMES, analyze_hands, classify_batch,
+    finger_states_batch, hand_index, hand_pose_batch, hand_tilt_batch, landmarks_to_array
+)
+from gesture_rules import compile_gesture_table
+from gesture_protocol import GestureMessageEncoder, LandmarkStreamEncoder
+from annotations import FrameAnnotations, CYAN, GREEN, RED, WHITE, YELLOW
+from frame import Frame, FrameBuffers, FramePool, as_frame, frame_array
+from inference_pool import InferencePool
+from frame_scheduler import scheduler_for_source
+from frame_source import open_source
+
 class HandTracker:
-    def __init__(self):
-        """Initialize MediaPipe Hand Tracking"""
+    def __init__(self, inference_interval=1, motion_threshold=None, roi_tracking=False,
+                 gesture_config=None, stream_landmarks=False, camera_id=0, inference_workers=0):
+        """
+        Initialize MediaPipe Hand Tracking
+        
+        Args:
+            inference_interval: Run the MediaPipe graph every N frames and
+                extrapolate landmarks in between (1 = every frame, 0 = only
+                when motion passes motion_threshold, with a refresh every
+                LandmarkPredictor.max_gap frames)
+            motion_threshold: Also run the graph when frame motion exceeds this
+                mean pixel difference (None = interval only)
+            roi_tracking: Run MediaPipe only on a padded crop around the hands
+                found in the previous frame, falling back to the full frame
+                when tracking is lost
+            gesture_config: Gesture mapping file (default: $GESTURE_CONFIG or
+                config/gestures.json)
+            stream_landmarks: Also send every frame's hand pose (wrist, palm
+                normal, pinch, tilt) for analog control in Godot
+            camera_id: Camera id carried in gesture and landmark messages
+                (several cameras can feed one Godot instance)
+            inference_workers: Run the hand graph in this many worker processes
+                (0 = in this process). Frames are pipelined through the pool by
+                gesture_control_system; skip-frame and ROI inference do not
+                apply in that mode.
+        """
         self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=2,  # Detect 2 hands (left and right)
@@ -18,9 +54,44 @@ class HandTracker:
             min_tracking_confidence=0.7
         )
         
+        # Process-pool inference (shared memory ring, results in capture order)
+        self.inference_pool = None
+        if inference_workers:
+            self.inference_pool = InferencePool('hands', inference_workers)
+        
+        # Skip-frame inference: constant-velocity landmark extrapolation between graph runs
+        self.landmark_predictor = LandmarkPredictor(inference_interval, motion_threshold)
+        
+        # ROI-cropped inference uses its own graph. The crop window moves and
+        # rescales with the hands on every inference, so tracking state from
+        # the previous crop would be in the wrong coordinates: the graph runs
+        # detection on each crop and HandRoiTracker does the tracking.
+        self.roi_tracker = None
+        self.roi_hands = None
+        if roi_tracking:
+            self.roi_tracker = HandRoiTracker()
+            self.roi_hands = self.mp_hands.Hands(
+                static_image_mode=True,
+                max_num_hands=2,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.7
+            )
+        
+        # Gesture lookup table (compiled from the gesture config) and per-frame analysis cache
+        try:
+            self.gesture_table = compile_gesture_table(gesture_config)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Failed to load gesture config, using built-in gestures: {e}")
+            self.gesture_table = DEFAULT_GESTURE_TABLE
+        self._analysis_results = None
+        self._analysis = []
+        
         # UDP Configuration for Godot communication
         self.udp_host = os.getenv('GESTURE_UDP_HOST', '127.0.0.1')
         self.udp_port = int(os.getenv('GESTURE_UDP_PORT', '9999'))
+        self.camera_id = camera_id
+        self.gesture_encoder = GestureMessageEncoder(camera_id=camera_id)  # $GESTURE_UDP_FORMAT: json | binary
+        self.stream_encoder = LandmarkStreamEncoder(camera_id) if stream_landmarks else None
         self.udp_socket = None
         self.last_sent_gesture = None
         self.last_sent_time = 0.0
@@ -29,29 +100,84 @@ class HandTracker:
         try:
             self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.udp_socket.settimeout(0.1)
-            print(f"✅ UDP gesture sender initialized: {self.udp_host}:{self.udp_port}")
+            print(f"✅ UDP gesture sender initialized: {self.udp_host}:{self.udp_port} "
+                  f"({self.gesture_encoder.format})")
         except Exception as e:
             print(f"⚠️ Failed to initialize UDP socket: {e}")
             self.udp_socket = None
         
-    def detect_hands(self, frame):
+    def detect_hands(self, frame, timestamp=None):
         """
-        Detect hands in frame
-        Returns: (results, processed_frame) - results contains multi_hand_landmarks and multi_handedness
+        Detect hands in frame (BGR array or Frame; a Frame's cached RGB view is reused)
+        Returns: (results, annotations) - results contains multi_hand_landmarks and multi_handedness,
+        annotations the hand skeletons to draw (the frame itself is not modified)
+        
+        With skip-frame inference enabled, frames between graph runs get
+        extrapolated landmarks (results.predicted is True for those).
         """
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame = as_frame(frame, timestamp)
+        if timestamp is None:
+            timestamp = frame.timestamp
+        predictor = self.landmark_predictor
+        if predictor.should_infer(frame):
+            results = self._run_inference(frame)
+            if predictor.enabled:
+                predictor.update(results, frame, timestamp)
+        else:
+            results = predictor.predict(timestamp)
         
-        # Process the frame
-        results = self.hands.process(rgb_frame)
+        return results, self.hand_annotations(results)
+    
+    def hand_annotations(self, results):
+        """Hand skeletons of results as FrameAnnotations"""
+        annotations = FrameAnnotations()
+        for hand_landmark in results.multi_hand_landmarks or ():
+            annotations.hand_landmarks(hand_landmark)
+        return annotations
+    
+    def detect_hands_pipelined(self, frame, timestamp=None):
+        """
+        Submit a frame to the inference pool and collect the frames that are done.
+        Keeps one frame in flight per worker, so the latency grows by the pool
+        depth while throughput scales with the workers.
+        Returns: list of (results, frame, annotations, timestamp) in capture order
+        """
+        if timestamp is None:
+            timestamp = as_frame(frame).timestamp
+        frame = frame_array(frame)
+        done = []
+        for results, (done_frame, done_timestamp) in self.inference_pool.pipeline(frame, (frame, timestamp)):
+            done.append((results, done_frame, self.hand_annotations(results), done_timestamp))
+        return done
+    
+    def drain_pipelined(self):
+        """
+        Wait for the frames still in the inference pool
+        Returns: list of (results, frame, annotations, timestamp) in capture order
+        """
+        return [(results, done_frame, self.hand_annotations(results), done_timestamp)
+                for results, (done_frame, done_timestamp) in self.inference_pool.drain()]
+    
+    def _run_inference(self, frame):
+        """Run the MediaPipe graph on the hand ROI if there is one, else on the full frame"""
+        frame_height, frame_width = frame.shape[:2]
+        roi = self.roi_tracker
         
-        if results.multi_hand_landmarks:
-            # Draw hand landmarks for all detected hands
-            for hand_landmark in results.multi_hand_landmarks:
-                self.mp_drawing.draw_landmarks(
-                    frame, hand_landmark, self.mp_hands.HAND_CONNECTIONS)
-                
-        return results, frame
+        if roi is not None:
+            crop, box = roi.crop(frame.bgr)
+            if crop is not None:
+                results = self.roi_hands.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+                if results.multi_hand_landmarks:
+                    roi.to_full_frame(results, box, frame_width, frame_height)
+                    roi.update(results, frame_width, frame_height, from_roi=True)
+                    return results
+                roi.lost()
+        
+        # Process the frame (RGB view, converted once per frame)
+        results = self.hands.process(frame.rgb)
+        if roi is not None:
+            roi.update(results, frame_width, frame_height, from_roi=False)
+        return results
     
     def count_fingers(self, landmarks, hand_label):
         """
@@ -61,69 +187,30 @@ class HandTracker:
         
         hand_label: "Left" or "Right" - needed for correct thumb detection
         """
-        # Finger tip and PIP landmark indices
-        finger_tips = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky
-        finger_pips = [3, 6, 10, 14, 18]  # PIP joints
-        
-        fingers_up_list = []
-        
-        # Thumb (special case - check horizontal distance, direction depends on hand)
-        # For Right hand: thumb is up if tip is to the LEFT of PIP (x < pip_x)
-        # For Left hand: thumb is up if tip is to the RIGHT of PIP (x > pip_x)
-        if hand_label == "Right":
-            if landmarks[finger_tips[0]].x < landmarks[finger_pips[0]].x:
-                fingers_up_list.append(True)
-            else:
-                fingers_up_list.append(False)
-        else:  # Left hand
-            if landmarks[finger_tips[0]].x > landmarks[finger_pips[0]].x:
-                fingers_up_list.append(True)
-            else:
-                fingers_up_list.append(False)
-        
-        # Other 4 fingers (check if tip is above PIP)
-        for i in range(1, 5):
-            if landmarks[finger_tips[i]].y < landmarks[finger_pips[i]].y:
-                fingers_up_list.append(True)
-            else:
-                fingers_up_list.append(False)
-        
-        finger_count = sum(fingers_up_list)
-        
-        return finger_count, fingers_up_list
+        points = landmarks_to_array(landmarks)
+        fingers_up = finger_states_batch(points[None], np.array([hand_index(hand_label)]))[0]
+        return int(fingers_up.sum()), fingers_up.tolist()
     
     def get_hand_tilt(self, landmarks):
         """
         Detect if hand is tilted left or right based on wrist and middle finger base
         Returns: "LEFT", "RIGHT", or "STRAIGHT"
         """
-        wrist = landmarks[0]
-        middle_base = landmarks[9]
-        
-        # Calculate horizontal distance
-        x_diff = middle_base.x - wrist.x
-        
-        # Threshold for tilt detection
-        tilt_threshold = 0.05
-        
-        if x_diff > tilt_threshold:
-            return "RIGHT"
-        elif x_diff < -tilt_threshold:
-            return "LEFT"
-        else:
-            return "STRAIGHT"
+        return hand_tilt_batch(landmarks_to_array(landmarks)[None])[0]
     
     def detect_gesture(self, landmarks, hand_label):
         """
-        Detect gesture based on specific finger combinations
+        Detect gesture based on specific finger combinations.
+        The mapping comes from the gesture config (config/gestures.json by
+        default) and is a single lookup in the compiled [hand, finger mask] table.
         
-        Left hand gestures (WASD movement):
+        Default left hand gestures (WASD movement):
         - Fist (0 fingers): FORWARD (W)
         - All 5 fingers: BACKWARD (S)
         - Index + Thumb (2 fingers): RIGHT (D)
         - Index + Middle (2 fingers): LEFT (A)
         
-        Right hand gestures (Vertical + Rotation):
+        Default right hand gestures (Vertical + Rotation):
         - Fist (0 fingers): UP
         - All 5 fingers: DOWN
         - Index + Middle (2 fingers): ROTATE_RIGHT
@@ -131,52 +218,47 @@ class HandTracker:
         
         Returns: gesture command string
         """
-        finger_count, fingers_up = self.count_fingers(landmarks, hand_label)
-        # fingers_up = [thumb, index, middle, ring, pinky]
-        
-        thumb_up = fingers_up[0]
-        index_up = fingers_up[1]
-        middle_up = fingers_up[2]
-        ring_up = fingers_up[3]
-        pinky_up = fingers_up[4]
-        
-        if hand_label == "Left":  # Left hand = WASD
-            if finger_count == 0:
-                # Fist = FORWARD
-                return "FORWARD"
-            elif finger_count == 5:
-                # All 5 fingers = BACKWARD
-                return "BACKWARD"
-            elif finger_count == 2:
-                if thumb_up and index_up and not middle_up:
-                    # Index + Thumb ONLY = RIGHT
-                    return "RIGHT"
-                elif index_up and middle_up and not thumb_up:
-                    # Index + Middle ONLY = LEFT
-                    return "LEFT"
-        
-        elif hand_label == "Right":  # Right hand = Up/Down + Rotation
-            if finger_count == 0:
-                # Fist = UP
-                return "UP"
-            elif finger_count == 5:
-                # All fingers = DOWN
-                return "DOWN"
-            elif finger_count == 2:
-                if index_up and middle_up and not thumb_up:
-                    # Index + Middle ONLY = ROTATE_RIGHT
-                    return "ROTATE_RIGHT"
-                elif thumb_up and index_up and not middle_up:
-                    # Index + Thumb ONLY = ROTATE_LEFT
-                    return "ROTATE_LEFT"
-        
-        return None
+        points = landmarks_to_array(landmarks)
+        gestures, _ = classify_batch(points[None], np.array([hand_index(hand_label)]), self.gesture_table)
+        return gestures[0]
     
-    def gesture_control_system(self):
+    def analyze_hands(self, results):
+        """
+        Finger states, tilt and gesture for every hand in results.
+        Landmarks are converted to arrays once and the analysis is cached
+        for the current frame's results.
+        Returns: list of HandAnalysis
+        """
+        if self._analysis_results is not results:
+            self._analysis = analyze_hands(results, self.gesture_table)
+            self._analysis_results = results
+        return self._analysis
+    
+    def classify_landmark_batch(self, points, hand_labels):
+        """
+        Classify many hands at once, e.g. for offline replays
+        
+        Args:
+            points: (N, 21, 3) landmark array
+            hand_labels: N hand labels ("Left" / "Right")
+        Returns: (N,) array of gesture strings (None = no gesture)
+        """
+        hand_indices = np.array([hand_index(label) for label in hand_labels])
+        gestures, _ = classify_batch(np.asarray(points, dtype=np.float32), hand_indices, self.gesture_table)
+        return gestures
+    
+    def gesture_control_system(self, source=None, show_preview=True, face_login=None):
         """
         Hand tracking gesture control system with 2 hands
+        
+        Args:
+            source: FrameSource or source spec (default: camera 0)
+            show_preview: Show the annotated preview window. Headless runs
+                send gestures only and never draw (stop with Ctrl+C).
+            face_login: FaceLoginGate; gestures only count while a face is
+                logged in (None = no login, hands only)
         """
-        cap = cv2.VideoCapture(0)
+        cap = open_source(source)
         
         if not cap.isOpened():
             print("Error: Tidak dapat mengakses kamera")
@@ -194,91 +276,126 @@ class HandTracker:
         print("   - 🖐️  5 Jari: TURUN (DOWN)")
         print("   - ✌️  Telunjuk + Tengah: ROTASI KANAN")
         print("   - 👍 Telunjuk + Jempol: ROTASI KIRI")
-        print("\nTekan 'q' untuk keluar")
+        print("\nTekan 'q' untuk keluar" if show_preview else "\nTekan Ctrl+C untuk keluar")
         print("=" * 50)
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Error: Tidak dapat membaca frame dari kamera")
-                break
-            
-            # Flip frame horizontally for mirror effect
-            frame = cv2.flip(frame, 1)
-            frame_height, frame_width = frame.shape[:2]
-            
-            # Detect hands
-            results, processed_frame = self.detect_hands(frame)
-            
-            # Process each detected hand
-            left_gesture = None
-            right_gesture = None
-            
-            if results.multi_hand_landmarks and results.multi_handedness:
-                for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                    # Get hand label (Left or Right)
-                    hand_label = handedness.classification[0].label
-                    
-                    # Detect gesture for this hand
-                    gesture = self.detect_gesture(hand_landmarks.landmark, hand_label)
-                    
-                    if hand_label == "Left":
-                        left_gesture = gesture
-                    else:
-                        right_gesture = gesture
-                    
-                    # Draw hand label on screen
-                    wrist = hand_landmarks.landmark[0]
-                    x = int(wrist.x * frame_width)
-                    y = int(wrist.y * frame_height)
-                    
-                    # Draw finger count and which fingers are up for debugging
-                    finger_count, fingers_up = self.count_fingers(hand_landmarks.landmark, hand_label)
-                    finger_names = ["Thumb", "Index", "Middle", "Ring", "Pinky"]
-                    fingers_up_str = ", ".join([finger_names[i] for i in range(5) if fingers_up[i]])
-                    
-                    cv2.putText(processed_frame, f"{hand_label}: {finger_count} fingers", 
-                               (x - 50, y - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 2)
-                    if fingers_up_str:
-                        cv2.putText(processed_frame, fingers_up_str, 
-                                   (x - 50, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
-                    else:
-                        cv2.putText(processed_frame, "Fist", 
-                                   (x - 50, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
-            
-            # Display detected gestures
-            y_offset = 30
-            if left_gesture:
-                cv2.putText(processed_frame, f"LEFT HAND: {left_gesture}", 
-                           (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                self.send_gesture_to_godot(left_gesture)
-                y_offset += 35
-            
-            if right_gesture:
-                cv2.putText(processed_frame, f"RIGHT HAND: {right_gesture}", 
-                           (10, y_offset), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-                self.send_gesture_to_godot(right_gesture)
-                y_offset += 35
-            
-            if not left_gesture and not right_gesture:
-                cv2.putText(processed_frame, "Tunjukkan tangan Anda", 
-                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+        scheduler = scheduler_for_source(cap)
+        # Pooled frames stay in flight for several captures, so they get their own arrays
+        buffers = None if self.inference_pool else FrameBuffers()
+        pool = FramePool(1)  # the capture is done with once it is mirrored
+        frame_count = 0
+        try:
+            while True:
+                ret, frame = pool.read(cap, scheduler)
+                capture_time = time.monotonic()
+                if not ret:
+                    print("Error: Tidak dapat membaca frame dari kamera")
+                    if self.inference_pool:
+                        # The frames still in the workers are the end of the stream, not lost
+                        for detection in self.drain_pipelined():
+                            if self._control_frame(*detection, show_preview=show_preview):
+                                break
+                    break
+                frame_count += 1
+                
+                # Flip frame horizontally for mirror effect
+                frame = Frame(frame, frame_count, capture_time, buffers).mirrored()
+                
+                # Detect hands (pipelined through the worker pool if there is one)
+                if self.inference_pool:
+                    detections = self.detect_hands_pipelined(frame)
+                else:
+                    detect = face_login.detect_hands if face_login else self.detect_hands
+                    results, annotations = detect(frame)
+                    detections = [(results, frame.bgr, annotations, capture_time)]
+                
+                if any(self._control_frame(*detection, show_preview=show_preview)
+                       for detection in detections):
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            cap.release()
+            if self.inference_pool:
+                self.inference_pool.close()
+            if face_login:
+                face_login.close()
+            if show_preview:
+                cv2.destroyAllWindows()
+        print(f"⏱️  {scheduler.summary()}")
+        if face_login:
+            print(f"🔐 Login: {face_login.logins}x | {face_login.detector.summary()}")
+    
+    def _control_frame(self, results, frame, annotations, capture_time, show_preview=True):
+        """
+        Send the gestures of one processed frame and display it
+        Returns: True when the user pressed 'q'
+        """
+        frame_height, frame_width = frame.shape[:2]
+        
+        # Analog control: hand pose every frame, no rate limit
+        if self.stream_encoder:
+            self.send_landmarks_to_godot(self.analyze_hands(results), capture_time)
+        
+        # Process each detected hand
+        left_gesture = None
+        right_gesture = None
+        left_score = right_score = 1.0
+        
+        for hand in self.analyze_hands(results):
+            if hand.label == "Left":
+                left_gesture = hand.gesture
+                left_score = hand.score
+            else:
+                right_gesture = hand.gesture
+                right_score = hand.score
             
-            # Draw instruction overlay
-            cv2.putText(processed_frame, "L: WASD | R: UP/DOWN/Rotation", 
-                       (10, frame_height - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            # Hand label on screen
+            x = int(hand.wrist[0] * frame_width)
+            y = int(hand.wrist[1] * frame_height)
             
-            cv2.imshow('Hand Gesture Control', processed_frame)
+            # Finger count and which fingers are up for debugging
+            fingers_up_str = ", ".join([FINGER_NAMES[i] for i in range(5) if hand.fingers_up[i]])
             
-            # Exit on 'q' key press
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+            annotations.text(f"{hand.label}: {hand.finger_count} fingers", (x - 50, y - 30), CYAN, 0.5)
+            annotations.text(fingers_up_str or "Fist", (x - 50, y - 10), CYAN, 0.4, 1)
+        
+        # Detected gestures
+        y_offset = 30
+        if left_gesture:
+            annotations.text(f"LEFT HAND: {left_gesture}", (10, y_offset), GREEN, 0.8)
+            self.send_gesture_to_godot(left_gesture, "Left", left_score, capture_time)
+            y_offset += 35
         
-        cap.release()
-        cv2.destroyAllWindows()
+        if right_gesture:
+            annotations.text(f"RIGHT HAND: {right_gesture}", (10, y_offset), YELLOW, 0.8)
+            self.send_gesture_to_godot(right_gesture, "Right", right_score, capture_time)
+            y_offset += 35
+        
+        if not show_preview:
+            return False
+        
+        if not left_gesture and not right_gesture:
+            annotations.text("Tunjukkan tangan Anda", (10, 30), RED, 0.8)
+        
+        # Instruction overlay
+        annotations.text("L: WASD | R: UP/DOWN/Rotation", (10, frame_height - 10), WHITE, 0.6)
+        
+        cv2.imshow('Hand Gesture Control', annotations.draw(frame))
+        
+        # Exit on 'q' key press
+        return cv2.waitKey(1) & 0xFF == ord('q')
     
-    def send_gesture_to_godot(self, gesture):
-        """Send gesture command to Godot via UDP"""
+    def send_gesture_to_godot(self, gesture, hand_label=None, confidence=1.0, capture_time=None):
+        """
+        Send gesture command to Godot via UDP
+        
+        Args:
+            gesture: Gesture name
+            hand_label: "Left" / "Right" hand that made the gesture (optional)
+            confidence: Handedness score of that hand (0.0 - 1.0)
+            capture_time: time.monotonic() when the frame was captured
+        """
         if not self.udp_socket:
             return
         
@@ -288,15 +405,10 @@ class HandTracker:
             return
         
         try:
-            # Create JSON message
-            message = {
-                "type": "gesture",
-                "gesture": gesture,
-                "timestamp": current_time
-            }
+            # JSON or binary message, depending on GESTURE_UDP_FORMAT
+            data = self.gesture_encoder.encode(gesture, hand_label, confidence, capture_time)
             
             # Send to Godot
-            data = json.dumps(message).encode('utf-8')
             self.udp_socket.sendto(data, (self.udp_host, self.udp_port))
             
             self.last_sent_gesture = gesture
@@ -309,6 +421,30 @@ class HandTracker:
         except Exception as e:
             print(f"⚠️ Failed to send gesture: {e}")
 
+    def send_landmarks_to_godot(self, hands, capture_time=None):
+        """
+        Send the continuous pose of every hand in one landmark stream packet
+        
+        Args:
+            hands: list of HandAnalysis (from analyze_hands)
+            capture_time: time.monotonic() when the frame was captured
+        """
+        if not self.udp_socket or not self.stream_encoder:
+            return
+        
+        labels = [hand.label for hand in hands]
+        if hands:
+            points = np.stack([hand.points for hand in hands])
+            poses = hand_pose_batch(points, np.array([hand_index(label) for label in labels]))
+        else:
+            poses = np.empty((0, 8), dtype=np.float32)
+        
+        try:
+            data = self.stream_encoder.encode(poses, labels, [hand.score for hand in hands], capture_time)
+            self.udp_socket.sendto(data, (self.udp_host, self.udp_port))
+        except Exception as e:
+            print(f"⚠️ Failed to send landmarks: {e}")
+
 # Test function
 if __name__ == "__main__":
     tracker = HandTracker()
@@ -0,0 +1,277 @@
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+TASKS = ('hands', 'faces')
+WORKER_POLL_INTERVAL = 0.5  # seconds between worker liveness checks while waiting
+
+
+class SharedFrameRing:
+    def __init__(self, slots, slot_bytes, name=None):
+        """
+        Fixed-size frame slots in one shared memory block.
+
+        The creating process writes a frame into a free slot; worker processes
+        attach by name and read it in place, so only the slot index crosses
+        the process boundary.
+
+        Args:
+            slots: Number of frame slots
+            slot_bytes: Size of one slot (largest frame in bytes)
+            name: Attach to an existing block instead of creating one
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    def view(self, slot, shape, dtype=np.uint8):
+        """ndarray over a slot (no copy)"""
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def write(self, slot, frame):
+        """Copy frame into a slot; returns the slot view"""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit a {self.slot_bytes} byte slot")
+        view = self.view(slot, frame.shape, frame.dtype)
+        np.copyto(view, frame)
+        return view
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class PoolResults:
+    """Picklable subset of a MediaPipe solution output"""
+    __slots__ = ('multi_hand_landmarks', 'multi_handedness', 'detections')
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None, detections=None):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+        self.detections = detections
+
+    def __getstate__(self):
+        return (self.multi_hand_landmarks, self.multi_handedness, self.detections)
+
+    def __setstate__(self, state):
+        self.multi_hand_landmarks, self.multi_handedness, self.detections = state
+
+
+def _create_graph(task, options):
+    import mediapipe as mp
+    if task == 'hands':
+        return mp.solutions.hands.Hands(
+            static_image_mode=options.get('static_image_mode', True),
+            max_num_hands=options.get('max_num_hands', 2),
+            min_detection_confidence=options.get('min_detection_confidence', 0.7),
+            min_tracking_confidence=options.get('min_tracking_confidence', 0.7))
+    return mp.solutions.face_detection.FaceDetection(
+        model_selection=options.get('model_selection', 0),
+        min_detection_confidence=options.get('min_detection_confidence', 0.5))
+
+
+def _worker_main(task, options, ring_name, slots, slot_bytes, tasks, results):
+    """
+    Worker process loop: read the BGR frame from its ring slot, convert it
+    into a reused RGB buffer and run the graph. A None task stops the worker.
+    """
+    ring = SharedFrameRing(slots, slot_bytes, name=ring_name)
+    graph = _create_graph(task, options)
+    rgb = None
+    try:
+        while True:
+            item = tasks.get()
+            if item is None:
+                break
+            seq, slot, shape = item
+            frame = ring.view(slot, shape)
+            if rgb is None or rgb.shape != frame.shape:
+                rgb = np.empty(shape, dtype=np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            output = graph.process(rgb)
+            if task == 'hands':
+                result = PoolResults(output.multi_hand_landmarks, output.multi_handedness)
+            else:
+                result = PoolResults(detections=output.detections)
+            results.put((seq, slot, result))
+    finally:
+        graph.close()
+        ring.close()
+
+
+class InferencePool:
+    def __init__(self, task='hands', workers=None, slots=None, graph_options=None):
+        """
+        MediaPipe graphs in worker processes, fed through a shared memory ring.
+
+        Frames are copied once into a ring slot; workers read them in place
+        (no pickling), and results are handed back in submission order. Each
+        worker holds its own graph and takes the next frame when it is idle,
+        so throughput scales with the number of cores. A graph therefore sees
+        an interleaved subset of the stream, and hand graphs run with
+        static_image_mode=True (detection on every frame) by default: tracking
+        state carried over from a frame another worker handled would be stale.
+
+        The ring is created on the first submit, sized to that frame.
+
+        Args:
+            task: 'hands' or 'faces'
+            workers: Worker processes (default: CPU count)
+            slots: Ring slots, i.e. frames in flight at most (default: 2 per worker)
+            graph_options: Graph settings (static_image_mode, min_detection_confidence, ...)
+        """
+        if task not in TASKS:
+            raise ValueError(f"Unknown task '{task}', expected one of {TASKS}")
+        self.task = task
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.slots = slots or 2 * self.workers
+        self.graph_options = dict(graph_options or {})
+
+        self.ring = None
+        self._context = multiprocessing.get_context('spawn')
+        self._tasks = None
+        self._results = None
+        self._processes = []
+        self._free_slots = list(range(self.slots))
+        self._next_submit = 0
+        self._next_result = 0
+        self._finished = {}  # seq -> result, waiting for earlier frames
+        self._tags = {}  # seq -> caller data returned with the result
+
+    @property
+    def pending(self):
+        """Frames submitted whose results have not been returned yet"""
+        return self._next_submit - self._next_result
+
+    @property
+    def worker_pids(self):
+        """Process ids of the running workers (empty before the first submit)"""
+        return [process.pid for process in self._processes]
+
+    def _start(self, slot_bytes):
+        self.ring = SharedFrameRing(self.slots, slot_bytes)
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        for _ in range(self.workers):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(self.task, self.graph_options, self.ring.name, self.slots, slot_bytes,
+                      self._tasks, self._results),
+                daemon=True)
+            process.start()
+            self._processes.append(process)
+        print(f"✅ Inference pool: {self.workers} {self.task} worker(s), {self.slots} frame slots")
+
+    def submit(self, frame, tag=None):
+        """
+        Queue a BGR frame for inference. Blocks while every slot is in flight.
+
+        Args:
+            frame: BGR uint8 frame
+            tag: Anything to get back with this frame's result
+        Returns: sequence number of the frame
+        """
+        if self.ring is None:
+            self._start(frame.nbytes)
+        while not self._free_slots:
+            self._collect(block=True)
+
+        slot = self._free_slots.pop()
+        self.ring.write(slot, frame)
+        seq = self._next_submit
+        self._next_submit += 1
+        self._tags[seq] = tag
+        self._tasks.put((seq, slot, frame.shape))
+        return seq
+
+    def _check_workers(self):
+        """Raise RuntimeError if a worker process has died (its frame would never come back)"""
+        for process in self._processes:
+            if process.exitcode is not None:
+                raise RuntimeError(f"{self.task} inference worker {process.pid} exited with code {process.exitcode}")
+
+    def _collect(self, block, timeout=None):
+        """Move one finished result into the reorder buffer and free its slot"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = WORKER_POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, max(0.0, deadline - time.monotonic()))
+            try:
+                seq, slot, result = self._results.get(block=block, timeout=wait)
+                break
+            except queue.Empty:
+                self._check_workers()
+                if not block or (deadline is not None and time.monotonic() >= deadline):
+                    return False
+        self._free_slots.append(slot)
+        self._finished[seq] = result
+        return True
+
+    def get(self, block=True, timeout=None):
+        """
+        Next result in submission order.
+        Returns: (results, tag), or None if it is not ready (block=False / timeout)
+        Raises RuntimeError when a worker process died instead of waiting forever
+        """
+        if self.pending == 0:
+            return None
+        while self._next_result not in self._finished:
+            if not self._collect(block, timeout):
+                return None
+        seq = self._next_result
+        self._next_result += 1
+        return self._finished.pop(seq), self._tags.pop(seq)
+
+    def pipeline(self, frame, tag=None, depth=None):
+        """
+        Submit a frame and return every result that is ready, in order, keeping
+        up to depth frames in flight (default: one per worker).
+        Returns: list of (results, tag)
+        """
+        depth = depth or self.workers
+        self.submit(frame, tag)
+        ready = []
+        while self.pending > depth:
+            ready.append(self.get())
+        while True:
+            item = self.get(block=False)
+            if item is None:
+                break
+            ready.append(item)
+        return ready
+
+    def drain(self):
+        """Wait for and return every outstanding result, in order"""
+        ready = []
+        while self.pending:
+            ready.append(self.get())
+        return ready
+
+    def process(self, frame):
+        """Synchronous inference of one frame (earlier pipelined results must be drained first)"""
+        self.submit(frame)
+        return self.get()[0]
+
+    def close(self):
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
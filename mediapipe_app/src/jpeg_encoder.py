@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+
+# TurboJPEG is optional: pip install PyTurboJPEG (needs libturbojpeg)
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+except ImportError:
+    TurboJPEG = None
+
+
+class JpegEncoder:
+    """
+    Base class for JPEG encoders.
+
+    encode() returns a flat uint8 buffer (anything supporting len() and the
+    buffer protocol). Encoders may reuse their output buffer, so the result
+    is only valid until the next encode() call on the same encoder.
+    """
+    name = 'base'
+
+    def encode(self, frame, quality=80):
+        raise NotImplementedError
+
+
+class OpenCVJpegEncoder(JpegEncoder):
+    name = 'opencv'
+
+    def __init__(self):
+        self._params = [int(cv2.IMWRITE_JPEG_QUALITY), 80]
+
+    def encode(self, frame, quality=80):
+        self._params[1] = int(quality)
+        ok, jpeg_buffer = cv2.imencode('.jpg', frame, self._params)
+        if not ok:
+            return None
+        return jpeg_buffer.reshape(-1)
+
+
+class TurboJpegEncoder(JpegEncoder):
+    name = 'turbojpeg'
+
+    def __init__(self):
+        """Raises RuntimeError if PyTurboJPEG or libturbojpeg is not available"""
+        if TurboJPEG is None:
+            raise RuntimeError("PyTurboJPEG is not installed")
+        self._jpeg = TurboJPEG()
+        self._buffer = None
+        self._supports_dst = True
+
+    def _output_buffer(self, frame):
+        """Output buffer sized for the worst-case JPEG of this frame size"""
+        h, w = frame.shape[:2]
+        required = ((w + 15) // 16 * 16) * ((h + 15) // 16 * 16) * 4 + 65536
+        if self._buffer is None or len(self._buffer) < required:
+            self._buffer = bytearray(required)
+        return self._buffer
+
+    def encode(self, frame, quality=80):
+        if self._supports_dst:
+            buffer = self._output_buffer(frame)
+            try:
+                _, size = self._jpeg.encode(frame, quality=int(quality), pixel_format=TJPF_BGR,
+                                            jpeg_subsample=TJSAMP_420, dst=buffer)
+                return memoryview(buffer)[:size]
+            except TypeError:
+                # Older PyTurboJPEG without dst= support
+                self._supports_dst = False
+        jpeg_bytes = self._jpeg.encode(frame, quality=int(quality), pixel_format=TJPF_BGR,
+                                       jpeg_subsample=TJSAMP_420)
+        return np.frombuffer(jpeg_bytes, dtype=np.uint8)
+
+
+ENCODERS = {
+    TurboJpegEncoder.name: TurboJpegEncoder,
+    OpenCVJpegEncoder.name: OpenCVJpegEncoder,
+}
+
+
+def available_encoders():
+    """Names of the encoders that can be created on this machine"""
+    names = []
+    for name, encoder_class in ENCODERS.items():
+        try:
+            encoder_class()
+            names.append(name)
+        except Exception:
+            pass
+    return names
+
+
+def create_encoder(name='auto'):
+    """
+    Create a JPEG encoder.
+
+    Args:
+        name: 'auto' (TurboJPEG if available, else OpenCV), 'turbojpeg' or 'opencv'
+    """
+    if name == 'auto':
+        try:
+            return TurboJpegEncoder()
+        except Exception:
+            return OpenCVJpegEncoder()
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown JPEG encoder '{name}' (choose from: auto, {', '.join(ENCODERS)})")
+    return ENCODERS[name]()
@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from frame import as_frame
+
+
+class PredictedHandResults:
+    """Stand-in for MediaPipe Hands results on frames where inference was skipped"""
+
+    def __init__(self, multi_hand_landmarks, multi_handedness):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+        self.multi_hand_world_landmarks = None
+        self.predicted = True
+
+
+class LandmarkPredictor:
+    def __init__(self, inference_interval=1, motion_threshold=None, max_horizon=0.25, max_gap=15):
+        """
+        Decides when to run the full MediaPipe graph and extrapolates landmarks
+        with a constant-velocity model on the frames in between.
+
+        Args:
+            inference_interval: Run inference at least every N frames
+                (0 = only when motion passes motion_threshold, and at least
+                every max_gap frames)
+            motion_threshold: Also run inference when the mean absolute pixel
+                difference (0-255, on a small grayscale thumbnail) since the last
+                inference frame exceeds this value. None disables the motion check.
+            max_horizon: Maximum seconds to extrapolate past the last inference
+            max_gap: Safety refresh of the motion-only mode (frames)
+        """
+        self.inference_interval = max(0, int(inference_interval))
+        self.motion_threshold = motion_threshold
+        self.max_horizon = max_horizon
+        self.max_gap = max(1, int(max_gap))
+
+        self._frames_since_inference = self.gap
+        self._reference_thumb = None
+        self._hands = []  # [(handedness, positions (21,3), velocity (21,3))]
+        self._last_time = None
+
+        # Statistics
+        self.inference_frames = 0
+        self.predicted_frames = 0
+
+    @property
+    def gap(self):
+        """Most frames between two inference frames"""
+        return self.inference_interval or self.max_gap
+
+    @property
+    def enabled(self):
+        return self.gap > 1 or self.motion_threshold is not None
+
+    def _thumbnail(self, frame):
+        return as_frame(frame).scaled((32, 24), gray=True).astype(np.int16)
+
+    def should_infer(self, frame):
+        """True if the full graph must run on this frame"""
+        if not self.enabled or self._last_time is None:
+            return True
+        if self._frames_since_inference + 1 >= self.gap:
+            return True
+        if self.motion_threshold is not None and self._reference_thumb is not None:
+            motion = np.abs(self._thumbnail(frame) - self._reference_thumb).mean()
+            if motion > self.motion_threshold:
+                return True
+        return False
+
+    def update(self, results, frame=None, timestamp=None):
+        """
+        Store the landmarks of an inference frame and estimate their velocity.
+
+        Args:
+            results: MediaPipe Hands results
+            frame: The BGR frame or Frame (used as motion reference)
+            timestamp: Capture time in seconds (default: time.monotonic())
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        previous = {label: positions for label, positions in
+                    ((h.classification[0].label, p) for h, p, _ in self._hands)}
+        dt = timestamp - self._last_time if self._last_time is not None else 0.0
+
+        hands = []
+        if results.multi_hand_landmarks and results.multi_handedness:
+            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                positions = np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+                label = handedness.classification[0].label
+                if label in previous and dt > 0:
+                    velocity = (positions - previous[label]) / dt
+                else:
+                    velocity = np.zeros_like(positions)
+                hands.append((handedness, positions, velocity))
+
+        self._hands = hands
+        self._last_time = timestamp
+        self._frames_since_inference = 0
+        if frame is not None and self.motion_threshold is not None:
+            self._reference_thumb = self._thumbnail(frame)
+        self.inference_frames += 1
+
+    def predict(self, timestamp=None):
+        """Extrapolated results for a frame where inference is skipped"""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        dt = min(max(0.0, timestamp - self._last_time), self.max_horizon)
+        self._frames_since_inference += 1
+        self.predicted_frames += 1
+
+        if not self._hands:
+            return PredictedHandResults(None, None)
+
+        multi_hand_landmarks = []
+        multi_handedness = []
+        for handedness, positions, velocity in self._hands:
+            predicted = positions + velocity * dt
+            landmark_list = landmark_pb2.NormalizedLandmarkList()
+            for x, y, z in predicted:
+                landmark_list.landmark.add(x=float(x), y=float(y), z=float(z))
+            multi_hand_landmarks.append(landmark_list)
+            multi_handedness.append(handedness)
+        return PredictedHandResults(multi_hand_landmarks, multi_handedness)
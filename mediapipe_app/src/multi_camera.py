@@ -0,0 +1,390 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from annotations import WHITE
+from frame import Frame, FrameBuffers
+from frame_scheduler import scheduler_for_source
+from frame_source import open_source
+from gesture_protocol import (
+    MAX_CAMERAS, GestureMessageEncoder, LandmarkStreamEncoder, video_sequence
+)
+from inference_pool import TASKS, SharedFrameRing
+from jpeg_encoder import create_encoder
+from pipeline import LatencyHistogram
+from udp_sender import FragmentedFrameSender, create_udp_socket
+
+
+class HandWorkerGraph:
+    def __init__(self, camera_id, options):
+        """
+        Hand tracking graph for one camera, living in a worker process.
+
+        Args:
+            camera_id: Camera this graph serves (tracking state is per camera)
+            options: dict with inference_interval, roi_tracking, gesture_config
+        """
+        from hand_tracking import HandTracker
+        self.tracker = HandTracker(options.get('inference_interval', 1),
+                                   roi_tracking=options.get('roi_tracking', False),
+                                   gesture_config=options.get('gesture_config'),
+                                   camera_id=camera_id)
+        self.buffers = FrameBuffers()
+        # Results go back to the main process, which owns the sockets
+        if self.tracker.udp_socket:
+            self.tracker.udp_socket.close()
+            self.tracker.udp_socket = None
+
+    def process(self, frame, capture_time):
+        """Returns: (result dict, mirrored frame, annotations)"""
+        from gesture_features import hand_index, hand_pose_batch
+        frame = Frame(frame, timestamp=capture_time, buffers=self.buffers).mirrored()
+        results, annotations = self.tracker.detect_hands(frame)
+        hands = self.tracker.analyze_hands(results)
+        labels = [hand.label for hand in hands]
+        if hands:
+            poses = hand_pose_batch(np.stack([hand.points for hand in hands]),
+                                    np.array([hand_index(label) for label in labels]))
+        else:
+            poses = np.empty((0, 8), dtype=np.float32)
+        return {
+            'labels': labels,
+            'scores': [hand.score for hand in hands],
+            'gestures': [hand.gesture for hand in hands],
+            'poses': poses,
+        }, frame.bgr, annotations
+
+
+class FaceWorkerGraph:
+    def __init__(self, camera_id, options):
+        """Face detection graph for one camera, living in a worker process"""
+        from face_detection import FaceDetector
+        self.detector = FaceDetector()
+
+    def process(self, frame, capture_time):
+        """Returns: (result dict, frame, annotations)"""
+        has_face, annotations = self.detector.detect_face(frame)
+        return {'has_face': has_face}, frame, annotations
+
+
+WORKER_GRAPHS = {'hands': HandWorkerGraph, 'faces': FaceWorkerGraph}
+
+
+def _worker_main(task, options, rings, tasks, results):
+    """
+    Worker process loop: one graph per camera, created on the camera's first
+    frame, which it reads in place from the camera's SharedFrameRing slot.
+    The slot is handed back with the result. A None task stops the worker.
+    """
+    rings = {camera_id: SharedFrameRing(slots, slot_bytes, name=name)
+             for camera_id, (name, slots, slot_bytes) in rings.items()}
+    graphs = {}
+    send_video = options.get('send_video', True)
+    quality = options.get('jpeg_quality', 80)
+    encoder = create_encoder(options.get('encoder', 'auto')) if send_video else None
+    try:
+        while True:
+            item = tasks.get()
+            if item is None:
+                break
+            camera_id, seq, slot, shape, capture_time = item
+            graph = graphs.get(camera_id)
+            if graph is None:
+                graph = graphs[camera_id] = WORKER_GRAPHS[task](camera_id, options)
+
+            result, frame, annotations = graph.process(rings[camera_id].view(slot, shape), capture_time)
+            if send_video:
+                # Only the video stream is drawn on; gesture-only runs skip rendering
+                annotations.text(f"CAM {camera_id}", (10, frame.shape[0] - 10), WHITE)
+                jpeg_buffer = encoder.encode(annotations.draw(frame), quality)
+                # Pickled straight from the encoder's buffer, no intermediate bytes copy
+                result['jpeg'] = None if jpeg_buffer is None else np.frombuffer(jpeg_buffer, dtype=np.uint8)
+            results.put((camera_id, seq, slot, capture_time, time.monotonic(), result))
+    finally:
+        for ring in rings.values():
+            ring.close()
+
+
+class CameraOutput:
+    def __init__(self, camera_id, udp_socket, gesture_address, frame_sender=None, stream_landmarks=False):
+        """
+        Per-camera UDP output in the main process: gesture and landmark encoders
+        carrying the camera id, and video frames tagged in the sequence number.
+        """
+        self.camera_id = camera_id
+        self.udp_socket = udp_socket
+        self.gesture_address = gesture_address
+        self.frame_sender = frame_sender
+        self.gesture_encoder = GestureMessageEncoder(camera_id=camera_id)
+        self.stream_encoder = LandmarkStreamEncoder(camera_id) if stream_landmarks else None
+        self.video_sequence = 0
+        self.last_sent = {}  # hand label -> (gesture, time)
+
+    def send(self, result, capture_time):
+        try:
+            if 'gestures' in result:
+                self.send_hands(result, capture_time)
+            if self.frame_sender and result.get('jpeg') is not None:
+                self.frame_sender.send_frame(result['jpeg'], video_sequence(self.camera_id, self.video_sequence))
+                self.video_sequence = (self.video_sequence + 1) % 65536
+        except OSError as e:
+            print(f"⚠️ Camera {self.camera_id}: failed to send: {e}")
+
+    def send_hands(self, result, capture_time):
+        if self.stream_encoder:
+            data = self.stream_encoder.encode(result['poses'], result['labels'], result['scores'], capture_time)
+            self.udp_socket.sendto(data, self.gesture_address)
+
+        # Same rate limit as HandTracker.send_gesture_to_godot, per hand
+        now = time.time()
+        for label, gesture, score in zip(result['labels'], result['gestures'], result['scores']):
+            if not gesture:
+                continue
+            last_gesture, last_time = self.last_sent.get(label, (None, 0.0))
+            if gesture == last_gesture and now - last_time < 0.1:
+                continue
+            data = self.gesture_encoder.encode(gesture, label, score, capture_time)
+            self.udp_socket.sendto(data, self.gesture_address)
+            self.last_sent[label] = (gesture, now)
+
+
+class CameraStats:
+    def __init__(self, camera_id):
+        self.camera_id = camera_id
+        self.captured = 0
+        self.dropped = 0
+        self.processed = 0
+        self.latency = LatencyHistogram(f"camera {camera_id}")
+        self.capture = None  # FrameScheduler measuring the capture thread
+
+    def summary(self, elapsed):
+        fps = self.processed / elapsed if elapsed > 0 else 0.0
+        capture = f" | capture {self.capture.summary()}" if self.capture else ""
+        return (f"📷 Camera {self.camera_id}: {fps:5.1f} FPS | captured {self.captured} | "
+                f"dropped {self.dropped} | p95 {self.latency.percentile(95):.1f} ms{capture}")
+
+
+class MultiCameraRunner:
+    def __init__(self, sources, task='hands', workers=None, udp_host='127.0.0.1', gesture_port=9999,
+                 video_port=5000, send_video=True, stream_landmarks=False, realtime=True, loop=False,
+                 worker_options=None, queue_size=2):
+        """
+        Serve several cameras from one process.
+
+        Every camera gets its own capture thread. Frames are handed to a pool of
+        worker processes, each holding MediaPipe graphs; a camera always goes to
+        the same worker (camera_id % workers) so its tracking state stays in one
+        graph. Each camera has a SharedFrameRing sized to its first frame: the
+        capture thread copies a frame into a free slot and only the slot index
+        crosses to the worker. Results come back to the main process, which
+        frees the slot and sends gestures, landmark streams and video for every
+        camera tagged with its camera id.
+
+        Args:
+            sources: Source specs or opened FrameSources (see frame_source.open_source);
+                camera id = index
+            task: 'hands' (gestures + landmark stream) or 'faces'
+            workers: Worker processes (default: min(cameras, CPU count))
+            udp_host: Godot host
+            gesture_port: Port for gesture and landmark messages
+            video_port: Port for video frames (all cameras share it)
+            send_video: Encode and send annotated frames
+            stream_landmarks: Also send per-frame hand poses
+            realtime: Pace file and synthetic sources at their frame rate
+            loop: Restart file sources at the end
+            worker_options: dict passed to the worker graphs (inference_interval,
+                roi_tracking, gesture_config, jpeg_quality, encoder)
+            queue_size: Frames waiting per worker before new frames are dropped
+                (each camera's ring has queue_size + 2 slots)
+        """
+        if task not in TASKS:
+            raise ValueError(f"Unknown task '{task}', expected one of {TASKS}")
+        if not sources:
+            raise ValueError("At least one source is required")
+        if len(sources) > MAX_CAMERAS:
+            raise ValueError(f"At most {MAX_CAMERAS} cameras are supported")
+
+        self.sources = list(sources)
+        self.task = task
+        self.worker_count = max(1, min(workers or os.cpu_count() or 1, len(self.sources)))
+        self.realtime = realtime
+        self.loop = loop
+        self.worker_options = dict(worker_options or {})
+        self.worker_options['send_video'] = send_video
+        self.queue_size = queue_size
+
+        self.udp_socket = create_udp_socket()
+        frame_sender = None
+        if send_video:
+            frame_sender = FragmentedFrameSender(self.udp_socket, (udp_host, video_port))
+        self.outputs = [
+            CameraOutput(camera_id, self.udp_socket, (udp_host, gesture_port), frame_sender,
+                         stream_landmarks and task == 'hands')
+            for camera_id in range(len(self.sources))
+        ]
+        self.stats = [CameraStats(camera_id) for camera_id in range(len(self.sources))]
+
+        self._context = multiprocessing.get_context('spawn')
+        self._tasks = []
+        self._results = None
+        self._processes = []
+        self._threads = []
+        self._rings = []
+        self._free_slots = []  # per camera, slots the capture thread may write
+        self._stop = threading.Event()
+
+    def worker_for(self, camera_id):
+        return camera_id % self.worker_count
+
+    def start_workers(self):
+        self._results = self._context.Queue()
+        for worker in range(self.worker_count):
+            rings = {camera_id: (ring.name, ring.slots, ring.slot_bytes)
+                     for camera_id, ring in enumerate(self._rings) if self.worker_for(camera_id) == worker}
+            tasks = self._context.Queue(maxsize=self.queue_size)
+            process = self._context.Process(
+                target=_worker_main, args=(self.task, self.worker_options, rings, tasks, self._results),
+                daemon=True)
+            process.start()
+            self._tasks.append(tasks)
+            self._processes.append(process)
+
+    def capture_loop(self, camera_id, cap, frame):
+        """Capture thread: copy frames into the camera's ring and hand the slot to its worker"""
+        tasks = self._tasks[self.worker_for(camera_id)]
+        ring = self._rings[camera_id]
+        free_slots = self._free_slots[camera_id]
+        stats = self.stats[camera_id]
+        # The source paces itself (camera clock / realtime file); the scheduler
+        # measures and holds the loop to --fps if given
+        stats.capture = scheduler_for_source(cap, skip_stale=False)
+        capture_time = time.monotonic()  # frame: the first one, read by run()
+        seq = 0
+        while not self._stop.is_set():
+            if frame is None:
+                ret, frame = stats.capture.read(cap)
+                capture_time = time.monotonic()
+                if not ret:
+                    print(f"⚠️ Camera {camera_id}: no more frames")
+                    break
+            stats.captured += 1
+            try:
+                slot = free_slots.get_nowait()
+            except queue.Empty:
+                slot = None
+            if slot is None or frame.nbytes > ring.slot_bytes:
+                # Every slot in flight (or a frame larger than the first one): drop
+                if slot is not None:
+                    free_slots.put(slot)
+                stats.dropped += 1
+            else:
+                ring.write(slot, frame)
+                try:
+                    tasks.put_nowait((camera_id, seq, slot, frame.shape, capture_time))
+                except queue.Full:
+                    free_slots.put(slot)
+                    stats.dropped += 1  # worker busy: drop rather than queue up latency
+            frame = None
+            seq += 1
+        cap.release()
+
+    def run(self, duration=0, report_interval=2.0):
+        """
+        Capture and process until every source ends, duration seconds pass
+        (0 = no limit) or Ctrl+C.
+        """
+        captures = []
+        first_frames = []
+        for camera_id, spec in enumerate(self.sources):
+            cap = open_source(spec, realtime=self.realtime, loop=self.loop)
+            # The first frame sizes the camera's ring slots
+            ret, frame = cap.read() if cap.isOpened() else (False, None)
+            if not ret:
+                print(f"❌ Camera {camera_id}: cannot open source {spec}")
+                cap.release()
+                for opened in captures:
+                    opened.release()
+                self._close_rings()
+                return False
+            captures.append(cap)
+            first_frames.append(frame)
+            self._rings.append(SharedFrameRing(self.queue_size + 2, frame.nbytes))
+            free_slots = queue.SimpleQueue()
+            for slot in range(self.queue_size + 2):
+                free_slots.put(slot)
+            self._free_slots.append(free_slots)
+            print(f"🎥 Camera {camera_id}: {cap.describe() if hasattr(cap, 'describe') else spec} "
+                  f"-> worker {self.worker_for(camera_id)}")
+
+        self.start_workers()
+        for camera_id, (cap, frame) in enumerate(zip(captures, first_frames)):
+            thread = threading.Thread(target=self.capture_loop, args=(camera_id, cap, frame), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        start = last_report = time.monotonic()
+        try:
+            while True:
+                now = time.monotonic()
+                if duration and now - start >= duration:
+                    break
+                if now - last_report >= report_interval:
+                    self.report(now - start)
+                    last_report = now
+                try:
+                    camera_id, _, slot, capture_time, done_time, result = self._results.get(timeout=0.1)
+                except queue.Empty:
+                    if not any(thread.is_alive() for thread in self._threads) and self._all_idle():
+                        break
+                    continue
+                self._free_slots[camera_id].put(slot)
+                stats = self.stats[camera_id]
+                stats.processed += 1
+                stats.latency.record(done_time - capture_time)
+                self.outputs[camera_id].send(result, capture_time)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+        self.report(time.monotonic() - start)
+        return True
+
+    def _all_idle(self):
+        processed = sum(s.processed for s in self.stats)
+        queued = sum(s.captured - s.dropped for s in self.stats)
+        return processed >= queued
+
+    def report(self, elapsed):
+        for stats in self.stats:
+            print(stats.summary(elapsed))
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        for tasks in self._tasks:
+            try:
+                tasks.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+        for process in self._processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self._tasks = []
+        self._processes = []
+        self._threads = []
+        self._close_rings()
+        if self.udp_socket:
+            self.udp_socket.close()
+            self.udp_socket = None
+
+    def _close_rings(self):
+        for ring in self._rings:
+            ring.close()
+        self._rings = []
+        self._free_slots = []
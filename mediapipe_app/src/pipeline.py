@@ -0,0 +1,197 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class LatestFrameQueue:
+    def __init__(self, maxsize=1, on_drop=None):
+        """
+        Bounded queue between pipeline stages where the newest item wins.
+
+        put() never blocks: when the queue is full the oldest item is
+        discarded (and counted in `dropped`) so a slow consumer always
+        sees the most recent frame instead of working through a backlog.
+
+        Args:
+            maxsize: Number of items kept before old ones are dropped
+            on_drop: Called with each discarded item (e.g. to release its frame)
+        """
+        self.on_drop = on_drop
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """Add item, dropping the oldest one if the queue is full"""
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(self._items[0])
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Take the oldest queued item.
+        Returns None on timeout or once the queue is closed and empty.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        """Wake up any waiting consumer; get() returns None from now on once drained"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class StageStats:
+    def __init__(self, name):
+        """
+        Timing counters for one pipeline stage.
+
+        Args:
+            name: Stage name used in reports
+        """
+        self.name = name
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_time = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, duration):
+        """Record the duration (seconds) of one processed item"""
+        with self._lock:
+            self.count += 1
+            self.total_time += duration
+            self.last_time = duration
+            if duration > self.max_time:
+                self.max_time = duration
+
+    def measure(self):
+        """Context manager that records the duration of its block"""
+        return _StageTimer(self)
+
+    @property
+    def avg_ms(self):
+        return (self.total_time / self.count) * 1000 if self.count else 0.0
+
+    @property
+    def max_fps(self):
+        """Throughput this stage could sustain on its own"""
+        return self.count / self.total_time if self.total_time > 0 else 0.0
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.total_time = 0.0
+            self.max_time = 0.0
+            self.last_time = 0.0
+
+    def summary(self):
+        return f"{self.name}: {self.avg_ms:.1f}ms avg / {self.max_time * 1000:.1f}ms max"
+
+
+class _StageTimer:
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats.record(time.perf_counter() - self.start)
+        return False
+
+
+class LatencyHistogram:
+    def __init__(self, name):
+        """
+        Keeps every latency sample of one stage for percentiles and histograms.
+
+        Args:
+            name: Stage name used in reports
+        """
+        self.name = name
+        self.samples = []  # milliseconds
+
+    def record(self, duration):
+        """Record one latency (seconds)"""
+        self.samples.append(duration * 1000)
+
+    @property
+    def count(self):
+        return len(self.samples)
+
+    def percentile(self, p):
+        """p-th percentile in milliseconds (nearest rank)"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def as_dict(self):
+        if not self.samples:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_ms': round(sum(self.samples) / self.count, 3),
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(max(self.samples), 3),
+        }
+
+    def summary(self):
+        if not self.samples:
+            return f"{self.name:>12}: no samples"
+        d = self.as_dict()
+        return (f"{self.name:>12}: n={d['count']:<5} mean {d['mean_ms']:7.2f} | p50 {d['p50_ms']:7.2f} | "
+                f"p95 {d['p95_ms']:7.2f} | p99 {d['p99_ms']:7.2f} | max {d['max_ms']:7.2f} ms")
+
+    def histogram(self, bins=10, width=40):
+        """Text histogram, one line per bin"""
+        if not self.samples:
+            return []
+        low, high = min(self.samples), max(self.samples)
+        step = (high - low) / bins or 1.0
+        counts = [0] * bins
+        for sample in self.samples:
+            counts[min(bins - 1, int((sample - low) / step))] += 1
+        peak = max(counts)
+        return [
+            f"{low + i * step:8.2f} - {low + (i + 1) * step:8.2f} ms | {'█' * int(width * c / peak):<{width}} {c}"
+            for i, c in enumerate(counts)
+        ]
+
+
+def format_stage_report(stages):
+    """
+    One-line report of all stages, marking the slowest one as the bottleneck.
+
+    Args:
+        stages: Iterable of StageStats
+    """
+    stages = [s for s in stages if s.count]
+    if not stages:
+        return "no samples"
+    slowest = max(stages, key=lambda s: s.avg_ms)
+    parts = []
+    for stage in stages:
+        marker = " ⏳" if stage is slowest else ""
+        parts.append(stage.summary() + marker)
+    return " | ".join(parts)
@@ -0,0 +1,260 @@
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from frame import FramePool
+from frame_scheduler import scheduler_for_source
+
+# Named shared memory frame ring, written by one capture daemon and read by
+# any number of processes (hand tracker, login streamer, GUI previews).
+#
+# Layout (little-endian, 64-byte aligned blocks):
+#   header  [magic:4 "FRNG"][version:2][slots:2][width:4][height:4][channels:4][pad:4]
+#           [fps:f64][latest_seq:u64][state:u32]
+#   slot i  [seq_begin:u64][capture_time:f64][seq_end:u64] + frame (height x width x channels, uint8)
+#
+# Frame n (n >= 1) goes to slot n % slots. The writer sets seq_begin before
+# copying the frame and seq_end after, so a reader sees a complete frame when
+# both equal n, and a frame that is being overwritten when they differ.
+RING_MAGIC = b'FRNG'
+RING_VERSION = 1
+RING_HEADER = struct.Struct('<4sHHIII4xdQI')
+SLOT_HEADER = struct.Struct('<QdQ')
+STATE_STOPPED = 0
+STATE_RUNNING = 1
+DEFAULT_RING_NAME = 'mediapipe_frames'
+ALIGN = 64
+
+_LATEST_OFFSET = 32  # offset of latest_seq in RING_HEADER
+_STATE_OFFSET = 40
+
+
+def _aligned(size):
+    return (size + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _attach(name):
+    """Attach to an existing block without letting this process's resource tracker unlink it at exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+
+class _FrameRing:
+    def _layout(self, slots, width, height, channels):
+        self.slots = slots
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.shape = (height, width, channels) if channels > 1 else (height, width)
+        self.frame_bytes = width * height * channels
+        self.header_size = _aligned(RING_HEADER.size)
+        self.slot_header_size = _aligned(SLOT_HEADER.size)
+        self.slot_stride = self.slot_header_size + _aligned(self.frame_bytes)
+        return self.header_size + slots * self.slot_stride
+
+    def _slot_offset(self, seq):
+        return self.header_size + (seq % self.slots) * self.slot_stride
+
+    def _frame_view(self, seq):
+        return np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf,
+                          offset=self._slot_offset(seq) + self.slot_header_size)
+
+    def latest_seq(self):
+        return struct.unpack_from('<Q', self.shm.buf, _LATEST_OFFSET)[0]
+
+    def running(self):
+        return struct.unpack_from('<I', self.shm.buf, _STATE_OFFSET)[0] == STATE_RUNNING
+
+
+class SharedFrameWriter(_FrameRing):
+    def __init__(self, name=DEFAULT_RING_NAME, width=640, height=480, channels=3, slots=8, fps=30.0,
+                 replace=False):
+        """
+        Create a named frame ring and publish frames into it.
+
+        Args:
+            name: Shared memory name readers attach to
+            width, height, channels: Frame shape (every frame must match)
+            slots: Frames kept; a reader holding a frame view has slots - 1
+                frame times before it is overwritten
+            fps: Nominal frame rate, published for readers
+            replace: Take over a ring that is still marked running (left by a
+                daemon that crashed). Without it a running ring is refused.
+
+        Raises: FileExistsError if a ring with this name is still marked running
+        """
+        size = self._layout(slots, width, height, channels)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            existing = _attach(name)
+            in_use = (bytes(existing.buf[:4]) == RING_MAGIC and
+                      struct.unpack_from('<I', existing.buf, _STATE_OFFSET)[0] == STATE_RUNNING)
+            existing.close()
+            if in_use and not replace:
+                raise FileExistsError(f"Frame ring '{name}' is in use by a running capture daemon "
+                                      f"(stop it first, or use --replace if that daemon crashed)")
+            # Left over from a daemon that did not shut down cleanly (attached
+            # tracked, so the resource tracker sees the unlink it is told about)
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = name
+        self.seq = 0
+        RING_HEADER.pack_into(self.shm.buf, 0, RING_MAGIC, RING_VERSION, slots, width, height, channels,
+                              float(fps), 0, STATE_RUNNING)
+
+    def write(self, frame, capture_time=None):
+        """
+        Copy a frame into the next slot and publish it.
+        Returns: the frame's sequence number
+        """
+        seq = self.seq + 1
+        offset = self._slot_offset(seq)
+        buf = self.shm.buf
+        SLOT_HEADER.pack_into(buf, offset, seq, 0.0, 0)
+        np.copyto(self._frame_view(seq), frame.reshape(self.shape))
+        SLOT_HEADER.pack_into(buf, offset, seq, time.monotonic() if capture_time is None else capture_time, seq)
+        struct.pack_into('<Q', buf, _LATEST_OFFSET, seq)
+        self.seq = seq
+        return seq
+
+    def close(self):
+        """Mark the ring stopped (readers return end of stream) and remove it"""
+        struct.pack_into('<I', self.shm.buf, _STATE_OFFSET, STATE_STOPPED)
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedFrameReader(_FrameRing):
+    def __init__(self, name=DEFAULT_RING_NAME):
+        """
+        Attach to a frame ring published by SharedFrameWriter.
+
+        Raises: FileNotFoundError if no ring with this name exists,
+                ValueError if the block is not a frame ring
+        """
+        self.shm = _attach(name)
+        self.name = name
+        magic, version, slots, width, height, channels, fps, _, _ = RING_HEADER.unpack_from(self.shm.buf, 0)
+        if magic != RING_MAGIC or version != RING_VERSION:
+            self.shm.close()
+            raise ValueError(f"Shared memory '{name}' is not a frame ring")
+        self._layout(slots, width, height, channels)
+        self.fps = fps
+        self.last_seq = 0
+        self.dropped = 0
+
+    def read(self, timeout=1.0):
+        """
+        Wait for a frame newer than the last one read and return the newest.
+
+        Returns: (seq, capture_time, frame) with frame a read-only view into
+                 shared memory (valid until the writer wraps around to its
+                 slot, see is_current), or None on timeout / writer stopped
+        """
+        deadline = time.monotonic() + timeout
+        poll = min(0.002, 0.25 / max(self.fps, 1.0))
+        while True:
+            seq = self.latest_seq()
+            if seq > self.last_seq:
+                begin, capture_time, end = SLOT_HEADER.unpack_from(self.shm.buf, self._slot_offset(seq))
+                if begin == seq and end == seq:
+                    if self.last_seq:
+                        self.dropped += seq - self.last_seq - 1
+                    self.last_seq = seq
+                    frame = self._frame_view(seq)
+                    frame.flags.writeable = False
+                    return seq, capture_time, frame
+                # Slot is being written; the next poll sees it complete (or a newer frame)
+            if not self.running() or time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+
+    def is_current(self, seq):
+        """True while the frame seq has not been overwritten by the writer"""
+        begin, _, end = SLOT_HEADER.unpack_from(self.shm.buf, self._slot_offset(seq))
+        return begin == seq and end == seq
+
+    def close(self):
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # a frame view is still referenced; the mapping goes away with it
+
+
+class CaptureDaemon:
+    def __init__(self, source, name=DEFAULT_RING_NAME, slots=8, replace=False):
+        """
+        Own the capture device and publish every frame into a named ring.
+
+        Args:
+            source: Opened FrameSource / cv2.VideoCapture
+            name: Ring name (readers use --source shm:<name>)
+            slots: Ring slots
+            replace: Take over a ring still marked running (see SharedFrameWriter)
+        """
+        self.source = source
+        self.name = name
+        self.slots = slots
+        self.replace = replace
+        self.writer = None
+
+    def run(self, report_interval=5.0):
+        """Capture until the source ends or Ctrl+C"""
+        import cv2
+        ret, frame = self.source.read()
+        if not ret:
+            print("❌ Tidak dapat membaca frame dari sumber")
+            return False
+
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        fps = self.source.get(cv2.CAP_PROP_FPS) or 30.0
+        try:
+            self.writer = SharedFrameWriter(self.name, width, height, channels, self.slots, fps, self.replace)
+        except FileExistsError as e:
+            print(f"❌ {e}")
+            self.source.release()
+            return False
+        print(f"✅ Capture daemon: {width}x{height} @ {fps:g} FPS -> shm:{self.name} ({self.slots} slots)")
+
+        # The source paces itself (the scheduler only measures rate and jitter,
+        # and drops frames above --fps)
+        scheduler = scheduler_for_source(self.source, skip_stale=False)
+        scheduler.wait()
+        pool = FramePool(1)  # each frame is copied into the ring before the next read
+        frames = 0
+        last_report = time.monotonic()
+        try:
+            while ret:
+                if frame.shape[:2] != (height, width):
+                    frame = cv2.resize(frame, (width, height))
+                self.writer.write(frame)
+                frames += 1
+                now = time.monotonic()
+                if now - last_report >= report_interval:
+                    print(f"📹 {scheduler.summary()} | frame {self.writer.seq}")
+                    last_report = now
+                ret, frame = pool.read(self.source, scheduler)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.writer.close()
+            self.source.release()
+        print(f"✅ Capture daemon stopped after {frames} frames")
+        return True
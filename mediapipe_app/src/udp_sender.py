@@ -0,0 +1,273 @@
+import socket
+import struct
+import time
+
+import numpy as np
+
+
+# [sequence_number:4][total_packets:4][packet_index:4]
+FRAGMENT_HEADER = struct.Struct('>III')
+
+# FEC mode: bit 31 of total_packets is set on every fragment of the frame and
+# one XOR parity fragment follows the data fragments, with packet_index ==
+# total_packets & FEC_COUNT_MASK and payload [frame_size:4][xor of all data
+# fragments, each zero-padded to the first fragment's length]. Any single lost
+# fragment of the frame can be rebuilt from the others.
+FEC_FLAG = 0x80000000
+FEC_COUNT_MASK = 0x7FFFFFFF
+PARITY_HEADER = struct.Struct('>I')
+
+
+class TokenBucket:
+    def __init__(self, rate_bps, burst_bytes):
+        """
+        Token bucket rate limiter.
+
+        Args:
+            rate_bps: Sustained rate in bits per second (0 or None = unlimited)
+            burst_bytes: Bucket size, the largest burst sent without waiting
+        """
+        self.rate = (rate_bps or 0) / 8.0  # bytes per second
+        self.capacity = float(burst_bytes)
+        self.tokens = float(burst_bytes)
+        self.last_refill = time.monotonic()
+        self.throttled_time = 0.0
+
+    @property
+    def unlimited(self):
+        return self.rate <= 0
+
+    def set_rate(self, rate_bps):
+        """Change the sustained rate without resetting the bucket"""
+        self._refill()
+        self.rate = (rate_bps or 0) / 8.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def try_consume(self, nbytes):
+        """
+        Take nbytes if the bucket has them, without sleeping. A full bucket
+        admits a burst larger than itself (the debt is paid off before the
+        next one), so large frames are not refused forever.
+        Returns: False when over budget (nothing is taken)
+        """
+        if self.unlimited:
+            return True
+        self._refill()
+        if self.tokens < min(nbytes, self.capacity):
+            return False
+        self.tokens -= nbytes
+        return True
+
+    def consume(self, nbytes):
+        """Take nbytes from the bucket, sleeping until enough tokens have accumulated"""
+        if self.unlimited:
+            return
+        self._refill()
+        self.tokens -= nbytes
+        if self.tokens < 0:
+            wait = -self.tokens / self.rate
+            self.throttled_time += wait
+            time.sleep(wait)
+            self._refill()
+
+
+class FragmentedFrameSender:
+    def __init__(self, udp_socket, address, max_payload=60000, bitrate=0, burst_bytes=None, fec=False,
+                 skip_over_budget=False):
+        """
+        Sends encoded frames as [seq][total][index]-prefixed UDP fragments.
+
+        Fragments are sent with sendmsg() scatter/gather: the 12-byte header and
+        a memoryview slice of the encoded buffer go out as one datagram without
+        the payload ever being copied in Python. Pacing is done by a token bucket
+        instead of fixed sleeps between fragments.
+
+        Args:
+            udp_socket: Bound or unbound UDP socket
+            address: (host, port) destination
+            max_payload: Maximum JPEG bytes per datagram
+            bitrate: Bitrate limit in bits per second (0 = unlimited)
+            burst_bytes: Token bucket size (default: two full datagrams)
+            fec: Send an XOR parity fragment after every frame (see FEC_FLAG)
+            skip_over_budget: Skip a whole frame when it does not fit the
+                bitrate budget instead of sleeping until it does (for one
+                sender among several on one thread, see FanoutServer)
+        """
+        self.udp_socket = udp_socket
+        self.skip_over_budget = skip_over_budget
+        self.address = address
+        self.max_payload = max_payload
+        if burst_bytes is None:
+            burst_bytes = 2 * (max_payload + FRAGMENT_HEADER.size)
+        self.bucket = TokenBucket(bitrate, burst_bytes)
+        self._header = bytearray(FRAGMENT_HEADER.size)
+        self.fec = fec
+        self._parity = np.zeros(PARITY_HEADER.size + max_payload, dtype=np.uint8) if fec else None
+        # sendmsg is not available on Windows
+        self._use_sendmsg = hasattr(udp_socket, 'sendmsg')
+
+        # Statistics
+        self.frames_sent = 0
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.parity_packets_sent = 0
+        self.frames_skipped = 0
+
+    def fragment_count(self, frame_size):
+        return max(1, (frame_size + self.max_payload - 1) // self.max_payload)
+
+    def send_frame(self, buffer, sequence_number, address=None):
+        """
+        Fragment and send one encoded frame.
+
+        Args:
+            buffer: Encoded frame (bytes, bytearray or contiguous uint8 numpy array)
+            sequence_number: Frame sequence number written in every fragment header
+            address: Override destination for this frame
+        Returns: number of datagrams sent (0 = skipped over budget)
+        """
+        address = address or self.address
+        view = memoryview(buffer).cast('B')
+        frame_size = view.nbytes
+        total_packets = self.fragment_count(frame_size)
+        total_field = total_packets | FEC_FLAG if self.fec else total_packets
+
+        pace = not self.skip_over_budget
+        if self.skip_over_budget:
+            frame_bytes = frame_size + total_packets * FRAGMENT_HEADER.size
+            if self.fec:
+                frame_bytes += FRAGMENT_HEADER.size + PARITY_HEADER.size + min(self.max_payload, frame_size)
+            if not self.bucket.try_consume(frame_bytes):
+                self.frames_skipped += 1
+                return 0
+
+        for packet_index in range(total_packets):
+            start = packet_index * self.max_payload
+            self._send(view[start:start + self.max_payload], sequence_number, total_field, packet_index,
+                       address, pace)
+        bytes_sent = frame_size + total_packets * FRAGMENT_HEADER.size
+
+        if self.fec:
+            parity = self._build_parity(view, frame_size, total_packets)
+            self._send(parity, sequence_number, total_field, total_packets, address, pace)
+            bytes_sent += len(parity) + FRAGMENT_HEADER.size
+            self.parity_packets_sent += 1
+            total_packets += 1
+
+        self.frames_sent += 1
+        self.packets_sent += total_packets
+        self.bytes_sent += bytes_sent
+        return total_packets
+
+    def _send(self, chunk, sequence_number, total_field, packet_index, address, pace=True):
+        header = self._header
+        FRAGMENT_HEADER.pack_into(header, 0, sequence_number, total_field, packet_index)
+        if pace:
+            self.bucket.consume(len(header) + len(chunk))
+        if self._use_sendmsg:
+            self.udp_socket.sendmsg((header, chunk), (), 0, address)
+        else:
+            self.udp_socket.sendto(bytes(header) + chunk, address)
+
+    def _build_parity(self, view, frame_size, total_packets):
+        """XOR of all data fragments into the reused parity buffer; returns a view of it"""
+        chunk_size = min(self.max_payload, frame_size)
+        PARITY_HEADER.pack_into(self._parity, 0, frame_size)
+        xor = self._parity[PARITY_HEADER.size:PARITY_HEADER.size + chunk_size]
+        data = np.frombuffer(view, dtype=np.uint8)
+        np.copyto(xor, data[:chunk_size])
+        for start in range(chunk_size, frame_size, chunk_size):
+            chunk = data[start:start + chunk_size]
+            np.bitwise_xor(xor[:len(chunk)], chunk, out=xor[:len(chunk)])
+        return memoryview(self._parity)[:PARITY_HEADER.size + chunk_size]
+
+
+def _sequence_age(sequence_number, reference):
+    """How many frames sequence_number is behind reference (16-bit sequence numbers wrap around)"""
+    return (reference - sequence_number) & 0xFFFF
+
+
+class FrameReassembler:
+    def __init__(self, max_pending=4):
+        """
+        Rebuilds frames from [seq][total][index] fragments of one camera,
+        recovering one lost fragment per frame from the parity fragment in FEC
+        mode. Fragments of a frame that already completed (or is older, by
+        16-bit wrapping frame sequence) are ignored. Reference for the GDScript
+        receivers (login.gd, webcam_client_udp.gd, frame_fec.gd).
+
+        Args:
+            max_pending: Incomplete frames kept at most; the oldest is dropped
+                when the fragments of a newer one arrive
+        """
+        self.max_pending = max(1, max_pending)
+        self.frames = {}  # sequence_number -> {index: payload}
+        self.last_completed = None
+        self.frames_completed = 0
+        self.frames_recovered = 0
+
+    def add(self, packet):
+        """
+        Add one datagram.
+        Returns: (sequence_number, frame bytes) when a frame completes, else None
+        """
+        if len(packet) < FRAGMENT_HEADER.size:
+            return None
+        sequence_number, total_field, packet_index = FRAGMENT_HEADER.unpack_from(packet)
+        fec = bool(total_field & FEC_FLAG)
+        total_packets = total_field & FEC_COUNT_MASK
+        if total_packets == 0 or packet_index > total_packets or (packet_index == total_packets and not fec):
+            return None
+        if self.last_completed is not None and _sequence_age(sequence_number, self.last_completed) < 0x8000:
+            return None  # stale, e.g. the parity of a frame that arrived complete
+
+        parts = self.frames.get(sequence_number)
+        if parts is None:
+            if len(self.frames) >= self.max_pending:
+                # Frames that lost more fragments than FEC can recover never complete
+                del self.frames[max(self.frames, key=lambda seq: _sequence_age(seq, sequence_number))]
+            parts = self.frames[sequence_number] = {}
+        parts[packet_index] = bytes(packet[FRAGMENT_HEADER.size:])
+        received = sum(1 for index in parts if index < total_packets)
+        if received == total_packets:
+            frame = b''.join(parts[index] for index in range(total_packets))
+        elif fec and received == total_packets - 1 and total_packets in parts:
+            frame = self._recover(parts, total_packets)
+            self.frames_recovered += 1
+        else:
+            return None
+        del self.frames[sequence_number]
+        self.last_completed = sequence_number
+        self.frames_completed += 1
+        return sequence_number, frame
+
+    @staticmethod
+    def _recover(parts, total_packets):
+        parity = parts[total_packets]
+        frame_size = PARITY_HEADER.unpack_from(parity)[0]
+        xor = np.frombuffer(parity, dtype=np.uint8, offset=PARITY_HEADER.size).copy()
+        chunk_size = len(xor)
+        missing = next(index for index in range(total_packets) if index not in parts)
+        for index in range(total_packets):
+            if index != missing:
+                chunk = np.frombuffer(parts[index], dtype=np.uint8)
+                xor[:len(chunk)] ^= chunk
+        missing_size = chunk_size if missing < total_packets - 1 else frame_size - chunk_size * (total_packets - 1)
+        parts[missing] = xor[:missing_size].tobytes()
+        return b''.join(parts[index] for index in range(total_packets))
+
+    def discard_before(self, sequence_number):
+        """Forget incomplete frames older than sequence_number (across the 16-bit wrap)"""
+        for seq in [seq for seq in self.frames if 0 < _sequence_age(seq, sequence_number) < 0x8000]:
+            del self.frames[seq]
+
+
+def create_udp_socket(send_buffer=1 << 20):
+    """UDP socket with a send buffer large enough for a few full-size fragments"""
+    udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, send_buffer)
+    return udp_socket
@@ -0,0 +1,27 @@
+"""
+Steady-state frames of the streaming loops allocate no frame-sized buffers
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.alloc_check import LOOPS, create_path, measure
+from src.frame_source import open_source
+
+
+@pytest.mark.parametrize('loop', LOOPS)
+def test_per_frame_allocations_within_limit(loop):
+    source = open_source('synthetic:640x480', realtime=False)
+    path = create_path(loop, source)
+    try:
+        allocated, _ = measure(path, frames=30, warmup=10)
+    finally:
+        path.close()
+        source.release()
+    assert allocated is not None and len(allocated) == 30
+    # Same default as benchmarks/alloc_check.py: a tenth of one frame
+    assert allocated.max() <= path.frame_bytes / 10
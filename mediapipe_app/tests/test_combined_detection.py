@@ -0,0 +1,94 @@
+"""
+Deadline, missed graphs and slot reuse of the concurrent face + hand detector
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from annotations import FrameAnnotations
+from combined_detection import CombinedDetector, FaceLoginGate
+
+
+class StubFaceDetector:
+    def __init__(self, has_face=True):
+        self.has_face = has_face
+        self.frames = []
+
+    def detect_face(self, frame):
+        self.frames.append(frame.seq)
+        annotations = FrameAnnotations()
+        annotations.text('face', (0, 0))
+        return self.has_face, annotations
+
+
+class SlowHandTracker:
+    def __init__(self):
+        """Blocks in detect_hands until release is set"""
+        self.release = threading.Event()
+        self.frames = []
+
+    def detect_hands(self, frame):
+        self.frames.append(frame.seq)
+        self.release.wait(5)
+        annotations = FrameAnnotations()
+        annotations.text('hands', (0, 0))
+        return f"hands {frame.seq}", annotations
+
+
+def test_late_graph_is_missed_and_keeps_its_slot():
+    from frame import Frame
+
+    face, hands = StubFaceDetector(), SlowHandTracker()
+    detector = CombinedDetector(face, hands, deadline=0.05)
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    try:
+        result = detector.detect(Frame(image, seq=1))
+        assert result.has_face is True and result.hand_results is None
+        assert result.missed == ['hands']
+        assert [item[1] for item in result.annotations.items] == ['face']
+        busy = detector._slots[0]
+        assert not busy.free
+
+        # The hand graph still reads frame 1: frame 2 gets another slot and
+        # skips the busy graph instead of queueing behind it
+        result = detector.detect(Frame(image, seq=2))
+        assert result.missed == ['hands']
+        assert detector._slots[1] is not busy and len(detector._slots) == 2
+        assert detector.missed == {'face': 0, 'hands': 2}
+        assert hands.frames == [1]
+
+        hands.release.set()
+        result = detector.detect(Frame(image, seq=3))
+        assert result.complete and result.hand_results == "hands 3"
+        assert sorted(item[1] for item in result.annotations.items) == ['face', 'hands']
+        # Both slots were free again, no third one was needed
+        assert len(detector._slots) == 2
+        assert face.frames == [1, 2, 3]
+    finally:
+        hands.release.set()
+        detector.close()
+
+
+def test_login_gate_needs_consecutive_faces():
+    face, hands = StubFaceDetector(), SlowHandTracker()
+    hands.release.set()
+    gate = FaceLoginGate(CombinedDetector(face, hands), login_frames=3, logout_frames=2)
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    try:
+        for _ in range(2):
+            results, _ = gate.detect_hands(image)
+            assert results.multi_hand_landmarks is None
+        results, _ = gate.detect_hands(image)
+        assert gate.logged_in and results.startswith("hands")
+
+        # A frame without a face result does not count towards the logout
+        assert gate.update(None) and gate.update(False) and gate.update(None)
+        assert not gate.update(False)
+        assert gate.logins == 1
+    finally:
+        gate.close()
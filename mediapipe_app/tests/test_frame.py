@@ -0,0 +1,90 @@
+"""
+Capture array reuse across pipeline threads
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from frame import FrameFreeList
+from pipeline import LatestFrameQueue
+
+
+class CountingCapture:
+    def __init__(self, shape=(4, 4, 3)):
+        """Writes the frame number into every pixel, in place when given an array"""
+        self.shape = shape
+        self.count = 0
+
+    def read(self, image=None):
+        self.count += 1
+        if image is None or image.shape != self.shape:
+            image = np.empty(self.shape, dtype=np.uint8)
+        image[:] = self.count
+        return True, image
+
+
+def test_held_frames_are_never_overwritten():
+    cap = CountingCapture()
+    pool = FrameFreeList(3)
+    held = [pool.read(cap)[1] for _ in range(5)]
+    # Every read past the limit still got its own array
+    assert [int(frame[0, 0, 0]) for frame in held] == [1, 2, 3, 4, 5]
+    assert pool.in_use == 3
+
+    for frame in held:
+        pool.release(frame)
+    assert pool.in_use == 0
+    _, frame = pool.read(cap)
+    assert any(frame is kept for kept in held[:3])
+    assert pool.allocations == 5
+
+
+def test_dropped_queue_items_are_released():
+    cap = CountingCapture()
+    pool = FrameFreeList(2)
+    queue = LatestFrameQueue(maxsize=1, on_drop=pool.release)
+    for _ in range(10):
+        queue.put(pool.read(cap)[1])
+    # The queued frame is the newest and the only one still held
+    assert int(queue.get()[0, 0, 0]) == 10
+    assert pool.in_use == 1
+    assert pool.allocations == 2
+
+
+def test_format_change_drops_old_arrays():
+    cap = CountingCapture()
+    pool = FrameFreeList(2)
+    _, frame = pool.read(cap)
+    pool.release(frame)
+    cap.shape = (8, 8, 3)
+    _, frame = pool.read(cap)
+    assert frame.shape == (8, 8, 3)
+    pool.release(frame)
+    assert pool.read(cap)[1] is frame
+    assert pool.in_use == 1
+
+
+def test_shared_memory_frames_are_owned_copies():
+    from frame_source import SharedMemorySource
+    from shared_frames import SharedFrameWriter
+
+    writer = SharedFrameWriter(f"test_ring_{os.getpid()}", width=4, height=4, slots=2)
+    source = SharedMemorySource(writer.name, timeout=0.1)
+    pool = FrameFreeList(3)
+    try:
+        writer.write(np.full((4, 4, 3), 1, dtype=np.uint8))
+        _, held = pool.read(source)
+        assert held.flags.writeable
+        # The writer wraps around the ring while the frame is held by a later stage
+        for value in range(2, 6):
+            writer.write(np.full((4, 4, 3), value, dtype=np.uint8))
+        assert (held == 1).all()
+        _, frame = pool.read(source)
+        assert (frame == 5).all() and frame is not held
+    finally:
+        source.release()
+        writer.close()
@@ -0,0 +1,102 @@
+"""
+Vectorized gesture classification against the original per-landmark rules
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from gesture_features import (
+    DEFAULT_GESTURE_TABLE, HAND_UNKNOWN, classify_batch, finger_states_batch, hand_index, hand_tilt_batch
+)
+from gesture_rules import compile_gesture_table, DEFAULT_GESTURE_CONFIG
+
+LABELS = ["Left", "Right", "Unknown", ""]
+
+
+class Landmark:
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+# Scalar rules as HandTracker had them before the vectorized rewrite
+def scalar_count_fingers(landmarks, hand_label):
+    finger_tips = [4, 8, 12, 16, 20]
+    finger_pips = [3, 6, 10, 14, 18]
+    if hand_label == "Right":
+        fingers_up = [landmarks[finger_tips[0]].x < landmarks[finger_pips[0]].x]
+    else:
+        fingers_up = [landmarks[finger_tips[0]].x > landmarks[finger_pips[0]].x]
+    for i in range(1, 5):
+        fingers_up.append(landmarks[finger_tips[i]].y < landmarks[finger_pips[i]].y)
+    return sum(fingers_up), fingers_up
+
+
+def scalar_tilt(landmarks):
+    x_diff = landmarks[9].x - landmarks[0].x
+    if x_diff > 0.05:
+        return "RIGHT"
+    elif x_diff < -0.05:
+        return "LEFT"
+    return "STRAIGHT"
+
+
+def scalar_gesture(landmarks, hand_label):
+    finger_count, (thumb_up, index_up, middle_up, _, _) = scalar_count_fingers(landmarks, hand_label)
+    if hand_label == "Left":
+        if finger_count == 0:
+            return "FORWARD"
+        elif finger_count == 5:
+            return "BACKWARD"
+        elif finger_count == 2:
+            if thumb_up and index_up and not middle_up:
+                return "RIGHT"
+            elif index_up and middle_up and not thumb_up:
+                return "LEFT"
+    elif hand_label == "Right":
+        if finger_count == 0:
+            return "UP"
+        elif finger_count == 5:
+            return "DOWN"
+        elif finger_count == 2:
+            if index_up and middle_up and not thumb_up:
+                return "ROTATE_RIGHT"
+            elif thumb_up and index_up and not middle_up:
+                return "ROTATE_LEFT"
+    return None
+
+
+@pytest.fixture(scope='module')
+def hands():
+    rng = np.random.default_rng(7)
+    points = rng.random((5000, 21, 3), dtype=np.float32)
+    labels = [LABELS[i] for i in rng.integers(0, len(LABELS), len(points))]
+    return points, labels
+
+
+@pytest.mark.parametrize('table', [DEFAULT_GESTURE_TABLE, compile_gesture_table(DEFAULT_GESTURE_CONFIG)],
+                         ids=['builtin', 'config'])
+def test_matches_scalar_rules(hands, table):
+    points, labels = hands
+    hand_indices = np.array([hand_index(label) for label in labels])
+    gestures, fingers_up = classify_batch(points, hand_indices, table)
+    tilts = hand_tilt_batch(points)
+
+    for i, label in enumerate(labels):
+        landmarks = [Landmark(*p) for p in points[i].tolist()]
+        assert fingers_up[i].tolist() == scalar_count_fingers(landmarks, label)[1]
+        assert gestures[i] == scalar_gesture(landmarks, label)
+        assert tilts[i] == scalar_tilt(landmarks)
+
+
+def test_unknown_label_has_no_gesture():
+    fist = np.zeros((1, 21, 3), dtype=np.float32)
+    assert hand_index("Unknown") == HAND_UNKNOWN
+    assert classify_batch(fist, np.array([HAND_UNKNOWN]))[0][0] is None
+    # Finger states still follow the left-hand thumb rule
+    assert (finger_states_batch(fist, np.array([HAND_UNKNOWN])) ==
+            finger_states_batch(fist, np.array([hand_index("Left")]))).all()
@@ -0,0 +1,31 @@
+"""
+Frame reassembly across the 16-bit sequence wrap
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from udp_sender import FRAGMENT_HEADER, FrameReassembler
+
+
+def fragment(sequence_number, index, total=2, payload=b'x'):
+    return FRAGMENT_HEADER.pack(sequence_number, total, index) + payload
+
+
+def test_discard_before_wraps_around():
+    reassembler = FrameReassembler()
+    for seq in (0xFFFE, 0xFFFF, 0, 1):
+        reassembler.add(fragment(seq, 0))
+    # 0xFFFE and 0xFFFF are older than 1, not 65000 frames ahead of it
+    reassembler.discard_before(1)
+    assert sorted(reassembler.frames) == [1]
+
+
+def test_incomplete_frames_are_capped():
+    reassembler = FrameReassembler(max_pending=3)
+    for seq in (0xFFFD, 0xFFFE, 0xFFFF, 0, 1):
+        reassembler.add(fragment(seq, 0))
+    assert sorted(reassembler.frames) == [0, 1, 0xFFFF]
+    assert reassembler.add(fragment(0xFFFF, 1, payload=b'y')) == (0xFFFF, b'xy')